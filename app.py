@@ -1,46 +1,103 @@
 from flask import Flask
-from dotenv import load_dotenv
 import os
+import time
 
-# 1. Nạp biến môi trường từ file .env
-load_dotenv()
 
-# 2. Khởi tạo Flask app
-app = Flask(__name__)
+def create_app(config_name=None):
+    """App factory: create_app("development" | "testing" | "production").
 
-# 3. Cấu hình app từ biến môi trường
-app.config['SQLALCHEMY_DATABASE_URI'] = (
-    f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}"
-    f"@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
-)
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['JWT_SECRET_KEY'] = os.getenv("JWT_SECRET_KEY", "dev-jwt-secret")
+    `flask --app app ...` tự gọi hàm này; production dùng wsgi.py (gunicorn), ASGI dùng asgi.py.
+    """
+    started = time.perf_counter()
+    # 1. Nạp cấu hình theo môi trường (config.py tự nạp .env)
+    from config import config_by_name
+    config_name = config_name or os.getenv("FLASK_CONFIG", "development")
 
-# 4. Khởi tạo các extension (db, bcrypt, jwt, migrate)
-from extensions import db, bcrypt, jwt
-from flask_migrate import Migrate
+    # 2. Khởi tạo Flask app (jsonify dùng orjson nếu có cài)
+    from utils.serializers import FastJSONProvider
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
 
-db.init_app(app)
-bcrypt.init_app(app)
-jwt.init_app(app)
-migrate = Migrate(app, db)
+    # 3. Cấu hình app (DB, JWT, pool, cache, ...)
+    app.config.from_object(config_by_name[config_name])
 
-# 5. Import models để migrate nhận diện các bảng
-import models
+    # 4. Khởi tạo các extension (db, bcrypt, jwt, migrate, cache, hasher)
+    from extensions import db, bcrypt, jwt, migrate, cache, hasher
+    from utils import db_routing
 
-# 6. Đăng ký blueprint chính (api) - mọi route đều nằm dưới /api
-from routes import api as api_bp
-app.register_blueprint(api_bp, url_prefix="/api")
+    db_routing.init_app(app)   # thêm replica vào SQLALCHEMY_BINDS trước khi tạo engine
+    db.init_app(app)
+    bcrypt.init_app(app)
+    jwt.init_app(app)
+    cache.init_app(app)
+    hasher.init_app(app)
+    migrate.init_app(app, db)
 
-# 7. Route test đơn giản
-@app.route("/")
-def home():
-    return "Flask app đang chạy ngon lành 🚀"
+    # Đo thời gian chờ pool, statement timeout kiểu PgBouncer
+    from utils import compression, db_pool, profiling
+    with app.app_context():
+        db_pool.install(app, db.engine)
+        profiling.init_app(app, db.engines.values())   # chỉ gắn khi SQL_PROFILING bật
+    compression.init_app(app)   # gzip/brotli theo Accept-Encoding
 
-@app.route("/home")
-def trang_chu():
-    return "Trang chủ"
+    # 5. Import models để migrate nhận diện các bảng
+    import models
 
-# 8. Chạy app
+    # Job nền: worker chạy kèm web process nếu JOBS_EMBEDDED_WORKER bật (dev)
+    from services import tasks
+    tasks.init_app(app)
+
+    # 6. Đăng ký blueprint chính (api) - mọi route đều nằm dưới /api
+    from routes import api as api_bp
+    app.register_blueprint(api_bp, url_prefix="/api")
+
+    # Lệnh CLI (flask search-reindex, ...)
+    from commands import register_commands
+    register_commands(app)
+
+    # 7. Route test đơn giản
+    @app.route("/")
+    def home():
+        return "Flask app đang chạy ngon lành 🚀"
+
+    @app.route("/home")
+    def trang_chu():
+        return "Trang chủ"
+
+    # thời gian khởi động (GET /api/metrics -> startup)
+    app.extensions["startup"] = {"create_app_ms": round((time.perf_counter() - started) * 1000, 1)}
+    return app
+
+
+def warm_up(app):
+    """Làm trước các việc vốn chạy lười ở request đầu tiên.
+
+    Với gunicorn preload (wsgi.py) việc này chạy 1 lần ở master trước khi fork: worker dùng chung
+    bộ nhớ (copy-on-write), khởi động/restart worker gần như tức thì. Không mở connection DB nào -
+    engine chỉ mở connection khi worker dùng lần đầu (sau fork).
+    """
+    started = time.perf_counter()
+    from sqlalchemy.orm import configure_mappers
+    from services import tasks
+
+    configure_mappers()         # relationship/backref của mọi model
+    app.url_map.update()        # biên dịch bảng route (werkzeug mặc định làm ở request đầu)
+    tasks.load_tasks()          # các module khai báo task
+
+    app.extensions["startup"]["warm_up_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return app
+
+
+def after_fork(app):
+    """Gọi trong worker ngay sau fork (gunicorn post_fork): bỏ pool connection kế thừa từ master."""
+    from extensions import db
+
+    with app.app_context():
+        for engine in db.engines.values():
+            # close=False: không đóng socket đang thuộc master, worker tự mở pool mới
+            engine.dispose(close=False)
+
+
+# 8. Chạy app (dev)
 if __name__ == "__main__":
-    app.run(debug=True, host="0.0.0.0", port=9000)
+    create_app().run(debug=True, host="0.0.0.0", port=9000)
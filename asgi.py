@@ -0,0 +1,6 @@
+# Chạy API ở chế độ ASGI (utils/asgi.py): uvicorn asgi:application --workers 4
+# Cần driver asyncio: pip install uvicorn asyncpg (SQLite: aiosqlite)
+from app import create_app, warm_up
+from utils.asgi import AsgiApp
+
+application = AsgiApp(warm_up(create_app()))
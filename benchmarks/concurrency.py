@@ -0,0 +1,204 @@
+# benchmarks/concurrency.py
+# So sánh khi có nhiều request đồng thời: WSGI (thread pool cố định, như gunicorn --threads N)
+# với ASGI (utils/asgi.py, route đọc chạy trên engine asyncio).
+# - Gọi thẳng WSGI/ASGI callable trong process (không qua socket), cùng kịch bản với bench-run
+# - C client đồng thời, mỗi client gửi request kế tiếp khi nhận xong request trước; latency tính cả
+#   thời gian xếp hàng chờ thread (như client thật thấy)
+# - db_latency_ms: cộng độ trễ giả lập vào MỖI câu SQL (DB ở máy khác). WSGI bị chặn ở
+#   khoảng threads / latency request/giây, ASGI chỉ bị chặn bởi pool connection
+import asyncio
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import event
+from werkzeug.test import EnvironBuilder
+
+from benchmarks.scenarios import SCENARIOS, Context, _percentile
+from extensions import cache, db
+from utils.asgi import AsgiApp
+
+
+def _specs(app, name, count, seed):
+    build, _ = SCENARIOS[name]
+    with app.app_context():
+        ctx = Context()
+    rng = random.Random(seed)
+    state = {}
+    return [build(rng, ctx, state) for _ in range(count)]
+
+
+def _environ(spec):
+    method, url, kwargs = spec
+    return EnvironBuilder(path=url, method=method, **kwargs).get_environ()
+
+
+def _scope(environ):
+    headers = [
+        (key[5:].replace("_", "-").lower().encode("latin-1"), value.encode("latin-1"))
+        for key, value in environ.items() if key.startswith("HTTP_")
+    ]
+    if environ.get("CONTENT_TYPE"):
+        headers.append((b"content-type", environ["CONTENT_TYPE"].encode("latin-1")))
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": environ["REQUEST_METHOD"],
+        "scheme": "http",
+        "path": environ["PATH_INFO"],
+        "query_string": environ["QUERY_STRING"].encode("latin-1"),
+        "root_path": "",
+        "headers": headers,
+        "server": ("localhost", 80),
+        "client": ("127.0.0.1", 0),
+    }
+
+
+def _add_latency(engine, seconds, asynchronous=False):
+    """Chờ thêm `seconds` trước mỗi câu SQL. Trả về hàm gỡ listener."""
+    if asynchronous:
+        from sqlalchemy.util import await_only
+
+        def wait(*args):
+            await_only(asyncio.sleep(seconds))    # trong greenlet: nhường event loop như chờ mạng thật
+    else:
+        def wait(*args):
+            time.sleep(seconds)
+
+    event.listen(engine, "before_cursor_execute", wait)
+    return lambda: event.remove(engine, "before_cursor_execute", wait)
+
+
+def _result(mode, name, concurrency, latencies, statuses, elapsed, **extra):
+    latencies.sort()
+    return {
+        "mode": mode,
+        "scenario": name,
+        "concurrency": concurrency,
+        **extra,
+        "requests": len(latencies),
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "latency_ms": {
+            "p50": _percentile(latencies, 0.50),
+            "p95": _percentile(latencies, 0.95),
+            "p99": _percentile(latencies, 0.99),
+            "max": round(latencies[-1], 2) if latencies else None,
+        },
+        "status": {str(code): n for code, n in sorted(statuses.items())},
+        "errors": sum(n for code, n in statuses.items() if code >= 500),
+    }
+
+
+def run_wsgi(app, name, specs, concurrency, threads, db_latency_ms=0):
+    """C client gửi vào WSGI app có `threads` thread xử lý."""
+    latencies = []
+    statuses = Counter()
+    slots = threading.Semaphore(concurrency)
+    lock = threading.Lock()
+
+    def one(spec, submitted):
+        status = []
+        try:
+            body = app(_environ(spec), lambda s, h, exc_info=None: status.append(int(s.split(" ", 1)[0])))
+            try:
+                for _ in body:
+                    pass
+            finally:
+                getattr(body, "close", lambda: None)()
+            with lock:
+                latencies.append((time.perf_counter() - submitted) * 1000)
+                statuses[status[0]] += 1
+        finally:
+            slots.release()
+
+    with app.app_context():
+        remove = _add_latency(db.engine, db_latency_ms / 1000) if db_latency_ms else None
+    try:
+        with ThreadPoolExecutor(threads) as pool:
+            began = time.perf_counter()
+            for spec in specs:
+                slots.acquire()
+                pool.submit(one, spec, time.perf_counter())
+        elapsed = time.perf_counter() - began
+    finally:
+        if remove:
+            remove()
+    return _result("wsgi", name, concurrency, latencies, statuses, elapsed, threads=threads)
+
+
+async def _asgi_request(application, spec):
+    environ = _environ(spec)
+    body = environ["wsgi.input"].read()
+    sent = False
+    status = []
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": body}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await application(_scope(environ), receive, send)
+    return status[0]
+
+
+def run_asgi(app, name, specs, concurrency, db_latency_ms=0):
+    """C client (coroutine) gửi vào AsgiApp trên 1 event loop."""
+    application = AsgiApp(app)
+    latencies = []
+    statuses = Counter()
+
+    async def client(queue):
+        while queue:
+            spec = queue.pop()
+            started = time.perf_counter()
+            statuses[await _asgi_request(application, spec)] += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    async def main():
+        remove = None
+        if db_latency_ms:
+            remove = _add_latency(application.engine.sync_engine, db_latency_ms / 1000, asynchronous=True)
+        queue = list(reversed(specs))
+        try:
+            began = time.perf_counter()
+            await asyncio.gather(*[client(queue) for _ in range(concurrency)])
+            return time.perf_counter() - began
+        finally:
+            if remove:
+                remove()
+            await application.aclose()
+
+    try:
+        elapsed = asyncio.run(main())
+    finally:
+        application.threads.shutdown()
+    return _result("asgi", name, concurrency, latencies, statuses, elapsed)
+
+
+def _reset_cache(app):
+    # 2 chế độ bắt đầu cùng cache rỗng (không để chế độ chạy sau hưởng cache của chế độ trước)
+    with app.app_context():
+        for namespace in ("tutor", "tutors:list"):
+            cache.bump(namespace)
+
+
+def run_levels(app, name, levels, requests=1000, threads=16, db_latency_ms=0, seed=1):
+    """Chạy cả 2 chế độ ở từng mức đồng thời, trả về list kết quả."""
+    results = []
+    for concurrency in levels:
+        specs = _specs(app, name, max(requests, concurrency), seed)
+        _reset_cache(app)
+        results.append(run_wsgi(app, name, specs, concurrency, threads, db_latency_ms))
+        _reset_cache(app)
+        results.append(run_asgi(app, name, specs, concurrency, db_latency_ms))
+    return results
@@ -0,0 +1,277 @@
+# benchmarks/datagen.py
+# Sinh dữ liệu giả có seed (cùng seed + cùng scale -> cùng dữ liệu) để benchmark so sánh giữa các commit.
+# - scale ~ tổng số dòng: "10k", "100k", "1m", "10m" hoặc số nguyên
+# - Ghi bằng Core insert theo lô (executemany), commit mỗi lô -> bộ nhớ không đổi theo scale
+# - id gán sẵn để khóa ngoại tính được mà không cần đọc lại DB => chỉ chạy trên DB rỗng
+import random
+from datetime import datetime, time, timedelta
+from types import SimpleNamespace
+
+from sqlalchemy import func, insert, select, text
+
+from extensions import db, hasher
+from models import (
+    AvailabilitySlot, Booking, BookingStatus, Customer, Feedback, Gender, Student, Subject,
+    Tutor, TutorSubject, User, minute_of_week,
+)
+from services.search import build_document, normalize
+
+BENCH_PASSWORD = "bench-password"      # mật khẩu chung của user benchmark (scenario login)
+BENCH_EMAIL_DOMAIN = "bench.local"
+
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+
+# tỉ lệ mỗi bảng trên tổng số dòng
+RATIOS = {
+    "customers": 0.08,      # mỗi customer có 1 user
+    "students": 0.12,
+    "tutors": 0.04,         # mỗi tutor dạy 2 môn, có 3 slot rảnh
+    "bookings": 0.30,
+    "feedbacks": 0.18,      # chỉ cho booking completed (60% booking)
+}
+
+LAST_NAMES = ["Nguyễn", "Trần", "Lê", "Phạm", "Hoàng", "Huỳnh", "Phan", "Vũ", "Võ", "Đặng", "Bùi", "Đỗ"]
+MIDDLE_NAMES = ["Văn", "Thị", "Minh", "Ngọc", "Thanh", "Quốc", "Hữu", "Thu", "Gia", "Đức"]
+FIRST_NAMES = [
+    "An", "Bình", "Châu", "Dũng", "Giang", "Hà", "Hải", "Hạnh", "Hiếu", "Hòa", "Huy", "Khánh",
+    "Lan", "Linh", "Long", "Mai", "Nam", "Nga", "Phong", "Phúc", "Quân", "Quyên", "Sơn", "Tâm",
+    "Thảo", "Trang", "Trung", "Tuấn", "Vy", "Yến",
+]
+CITIES = [
+    "Hà Nội", "Hồ Chí Minh", "Đà Nẵng", "Hải Phòng", "Cần Thơ", "Huế", "Nha Trang",
+    "Biên Hòa", "Vũng Tàu", "Quy Nhơn", "Đà Lạt", "Buôn Ma Thuột",
+]
+SUBJECTS = [
+    ("MATH", "Toán"), ("PHYS", "Vật lý"), ("CHEM", "Hóa học"), ("BIO", "Sinh học"),
+    ("LIT", "Ngữ văn"), ("ENG", "Tiếng Anh"), ("HIST", "Lịch sử"), ("GEO", "Địa lý"),
+    ("IT", "Tin học"), ("JPN", "Tiếng Nhật"), ("KOR", "Tiếng Hàn"), ("CHN", "Tiếng Trung"),
+    ("FRA", "Tiếng Pháp"), ("GER", "Tiếng Đức"), ("PIANO", "Piano"), ("GUITAR", "Guitar"),
+    ("DRAW", "Vẽ"), ("IELTS", "IELTS"), ("TOEIC", "TOEIC"), ("SAT", "SAT"),
+    ("CODE", "Lập trình"), ("ROBOT", "Robotics"), ("CHESS", "Cờ vua"), ("SWIM", "Bơi lội"),
+    ("ECON", "Kinh tế"), ("ACC", "Kế toán"), ("CIVIC", "Giáo dục công dân"), ("MUSIC", "Âm nhạc"),
+    ("MATH-ADV", "Toán chuyên"), ("ENG-KID", "Tiếng Anh thiếu nhi"),
+]
+SLOT_TIMES = [(time(8, 0), time(11, 0)), (time(17, 0), time(19, 0)), (time(19, 0), time(21, 0))]
+STATUS_CYCLE = [BookingStatus.completed] * 6 + [
+    BookingStatus.accepted, BookingStatus.accepted, BookingStatus.pending, BookingStatus.canceled,
+]
+BASE_TIME = datetime(2025, 1, 6, 8, 0)     # thứ 2
+
+
+def parse_scale(value):
+    """"10k" | "1m" | "250000" -> số dòng."""
+    value = str(value).lower().replace("_", "")
+    if value in SCALES:
+        return SCALES[value]
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"scale không hợp lệ: {value} (dùng {', '.join(SCALES)} hoặc số)")
+
+
+def plan(total_rows):
+    """Số dòng mỗi bảng cho 1 scale."""
+    counts = {name: max(1, int(total_rows * ratio)) for name, ratio in RATIOS.items()}
+    counts["subjects"] = len(SUBJECTS)
+    counts["users"] = counts["customers"]
+    counts["tutor_subjects"] = counts["tutors"] * 2
+    counts["availability_slots"] = counts["tutors"] * len(SLOT_TIMES)
+    completed = (counts["bookings"] // 10) * 6 + min(counts["bookings"] % 10, 6)
+    counts["feedbacks"] = min(counts["feedbacks"], completed)
+    return counts
+
+
+def _name(rng):
+    return f"{rng.choice(LAST_NAMES)} {rng.choice(MIDDLE_NAMES)} {rng.choice(FIRST_NAMES)}"
+
+
+def tutor_subject_ids(tutor_id):
+    """2 môn cố định theo id (không cần random -> booking biết môn của gia sư)."""
+    first = (tutor_id * 7) % len(SUBJECTS) + 1
+    second = (tutor_id * 7 + 3) % len(SUBJECTS) + 1
+    return first, second
+
+
+def _customers(rng, n):
+    for i in range(1, n + 1):
+        yield {
+            "id": i,
+            "full_name": _name(rng),
+            "email": f"customer{i}@{BENCH_EMAIL_DOMAIN}",
+            "phone": f"09{i:08d}",
+            "address": f"{rng.randint(1, 500)} đường số {rng.randint(1, 99)}, {rng.choice(CITIES)}",
+            "created_at": BASE_TIME + timedelta(seconds=i),
+        }
+
+
+def _users(n, password_hash):
+    for i in range(1, n + 1):
+        yield {
+            "id": i,
+            "email": f"customer{i}@{BENCH_EMAIL_DOMAIN}",
+            "password_hash": password_hash,
+            "role": "customer",
+            "customer_id": i,
+            "created_at": BASE_TIME,
+        }
+
+
+def _students(rng, n, customers):
+    genders = list(Gender)
+    for i in range(1, n + 1):
+        yield {
+            "id": i,
+            "customer_id": (i - 1) % customers + 1,
+            "full_name": _name(rng),
+            "birth_year": rng.randint(2006, 2018),
+            "grade": f"Lớp {rng.randint(1, 12)}",
+            "gender": rng.choice(genders),
+        }
+
+
+def _tutors(rng, n):
+    subject_names = [name for _, name in SUBJECTS]
+    for i in range(1, n + 1):
+        city = rng.choice(CITIES)
+        row = {
+            "id": i,
+            "full_name": _name(rng),
+            "email": f"tutor{i}@{BENCH_EMAIL_DOMAIN}",
+            "phone": f"08{i:08d}",
+            "years_experience": rng.randint(0, 20),
+            "hourly_rate": rng.randrange(100_000, 500_001, 10_000),
+            "bio": f"Gia sư {rng.choice(subject_names)} {rng.randint(1, 15)} năm kinh nghiệm",
+            "city": city,
+            "city_norm": normalize(city) or None,
+            "rating_avg": 0,
+            "rating_count": 0,
+            "rating_sum": 0,
+        }
+        names = [subject_names[s - 1] for s in tutor_subject_ids(i)]
+        row["search_text"] = build_document(SimpleNamespace(**row), names)
+        yield row
+
+
+def _tutor_subjects(n):
+    for tutor_id in range(1, n + 1):
+        for subject_id in tutor_subject_ids(tutor_id):
+            yield {"tutor_id": tutor_id, "subject_id": subject_id}
+
+
+def _slots(n):
+    slot_id = 0
+    for tutor_id in range(1, n + 1):
+        for j, (start, end) in enumerate(SLOT_TIMES):
+            slot_id += 1
+            weekday = (tutor_id + j * 2) % 7
+            yield {
+                "id": slot_id,
+                "tutor_id": tutor_id,
+                "weekday": weekday,
+                "start_time": start,
+                "end_time": end,
+                "week_start": minute_of_week(weekday, start),
+                "week_end": minute_of_week(weekday, end),
+            }
+
+
+def _bookings(rng, n, tutors, students):
+    # booking i -> gia sư i % tutors, lần thứ k của gia sư bắt đầu sau 3h*k => không bao giờ trùng giờ
+    for i in range(1, n + 1):
+        tutor_id = (i - 1) % tutors + 1
+        start = BASE_TIME + timedelta(hours=3 * ((i - 1) // tutors))
+        hours = rng.choice((1, 1.5, 2))
+        rate = 200_000
+        yield {
+            "id": i,
+            "student_id": rng.randint(1, students),
+            "tutor_id": tutor_id,
+            "subject_id": tutor_subject_ids(tutor_id)[i % 2],
+            "start_at": start,
+            "hours": hours,
+            "end_at": start + timedelta(hours=hours),
+            "total_price": int(hours * rate),
+            "status": STATUS_CYCLE[(i - 1) % 10],
+        }
+
+
+def _feedbacks(rng, n):
+    feedback_id = 0
+    booking_id = 0
+    while feedback_id < n:
+        booking_id += 1
+        if STATUS_CYCLE[(booking_id - 1) % 10] is not BookingStatus.completed:
+            continue
+        feedback_id += 1
+        yield {
+            "id": feedback_id,
+            "booking_id": booking_id,
+            "rating": rng.choices((1, 2, 3, 4, 5), weights=(2, 3, 10, 35, 50))[0],
+            "comment": rng.choice((None, "Dạy dễ hiểu", "Đúng giờ", "Con tiến bộ nhiều")),
+        }
+
+
+def _insert_chunks(model, rows, chunk_size, progress):
+    table = model.__table__
+    chunk = []
+    written = 0
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            db.session.execute(insert(table), chunk)
+            db.session.commit()
+            written += len(chunk)
+            chunk = []
+            progress(table.name, written)
+    if chunk:
+        db.session.execute(insert(table), chunk)
+        db.session.commit()
+        written += len(chunk)
+        progress(table.name, written)
+    return written
+
+
+def _reset_sequences(tables):
+    # id gán tay -> sequence của Postgres đứng yên, đẩy lên max(id) để insert sau không trùng
+    if db.engine.dialect.name != "postgresql":
+        return
+    for table in tables:
+        db.session.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {table}), 1))"
+        ))
+    db.session.commit()
+
+
+def seed(total_rows, seed_value=42, chunk_size=5000, progress=None):
+    """Sinh dữ liệu vào DB rỗng. Trả về dict số dòng mỗi bảng."""
+    from services.ratings import recompute_ratings
+
+    progress = progress or (lambda table, written: None)
+    if db.session.scalar(select(func.count()).select_from(Tutor)):
+        raise RuntimeError("DB đã có dữ liệu gia sư, dùng DB rỗng (hoặc --reset)")
+
+    counts = plan(total_rows)
+    rng = random.Random(seed_value)
+    password_hash = hasher.hash(BENCH_PASSWORD)     # hash 1 lần, dùng chung cho mọi user
+
+    steps = [
+        (Subject, ({"id": i, "code": code, "name": name} for i, (code, name) in enumerate(SUBJECTS, 1))),
+        (Customer, _customers(rng, counts["customers"])),
+        (User, _users(counts["users"], password_hash)),
+        (Student, _students(rng, counts["students"], counts["customers"])),
+        (Tutor, _tutors(rng, counts["tutors"])),
+        (TutorSubject, _tutor_subjects(counts["tutors"])),
+        (AvailabilitySlot, _slots(counts["tutors"])),
+        (Booking, _bookings(rng, counts["bookings"], counts["tutors"], counts["students"])),
+        (Feedback, _feedbacks(rng, counts["feedbacks"])),
+    ]
+    for model, rows in steps:
+        _insert_chunks(model, rows, chunk_size, progress)
+
+    _reset_sequences([
+        "subjects", "customers", "users", "students", "tutors",
+        "availability_slots", "bookings", "feedbacks",
+    ])
+    recompute_ratings()
+    return counts
@@ -0,0 +1,175 @@
+# benchmarks/scenarios.py
+# Chạy các kịch bản tải bằng Flask test client (trong process, không cần mạng/server).
+# Mỗi kịch bản: N request, C thread; báo p50/p95/p99 + throughput; lưu JSON để so sánh giữa các commit.
+import json
+import platform
+import random
+import subprocess
+import threading
+import time
+from collections import Counter
+
+from sqlalchemy import func, select
+
+from benchmarks.datagen import BENCH_EMAIL_DOMAIN, BENCH_PASSWORD, CITIES, FIRST_NAMES, SUBJECTS
+from extensions import db
+from models import Customer, Tutor, User
+
+
+class Context:
+    """Thông tin về dữ liệu hiện có để sinh request hợp lệ (đọc 1 lần trước khi chạy)."""
+
+    def __init__(self):
+        self.max_tutor_id = db.session.scalar(select(func.max(Tutor.id))) or 1
+        self.bench_users = db.session.scalar(
+            select(func.count()).select_from(User).where(User.email.like(f"%@{BENCH_EMAIL_DOMAIN}"))
+        )
+        self.customers = db.session.scalar(select(func.count()).select_from(Customer))
+        self.terms = [name for _, name in SUBJECTS] + FIRST_NAMES + CITIES
+
+
+def _search(rng, ctx, state):
+    params = {"q": rng.choice(ctx.terms), "per_page": 20}
+    if rng.random() < 0.3:
+        params["city"] = rng.choice(CITIES)
+    return "GET", "/api/tutors", {"query_string": params}
+
+
+def _detail(rng, ctx, state):
+    return "GET", f"/api/tutors/{rng.randint(1, ctx.max_tutor_id)}", {}
+
+
+def _login(rng, ctx, state):
+    user = rng.randint(1, max(1, ctx.bench_users))
+    body = {"email": f"customer{user}@{BENCH_EMAIL_DOMAIN}", "password": BENCH_PASSWORD}
+    return "POST", "/api/auth/login", {"json": body}
+
+
+def _customers(rng, ctx, state):
+    # đi tiếp trang sau theo cursor của response trước, hết thì quay lại trang đầu
+    params = {"limit": 50}
+    if state.get("cursor"):
+        params["cursor"] = state["cursor"]
+    return "GET", "/api/customers", {"query_string": params}
+
+
+def _remember_cursor(response, state):
+    if response.status_code == 200:
+        state["cursor"] = (response.get_json().get("pagination") or {}).get("next_cursor")
+
+
+SCENARIOS = {
+    "search": (_search, None),
+    "detail": (_detail, None),
+    "login": (_login, None),
+    "customers": (_customers, _remember_cursor),
+}
+
+
+def _percentile(samples, p):
+    if not samples:
+        return None
+    return round(samples[min(len(samples) - 1, int(p * len(samples)))], 2)
+
+
+def run_scenario(app, name, requests=1000, concurrency=4, seed=1, warmup=50):
+    """Chạy 1 kịch bản, trả về dict kết quả."""
+    build, after = SCENARIOS[name]
+    with app.app_context():
+        ctx = Context()
+
+    latencies = []
+    statuses = Counter()
+    lock = threading.Lock()
+    per_thread = max(1, requests // concurrency)
+
+    def worker(index, count, record):
+        rng = random.Random(seed * 1000 + index)
+        state = {}
+        client = app.test_client()
+        for _ in range(count):
+            method, url, kwargs = build(rng, ctx, state)
+            started = time.perf_counter()
+            response = client.open(url, method=method, **kwargs)
+            elapsed = (time.perf_counter() - started) * 1000
+            if after is not None:
+                after(response, state)
+            if record:
+                with lock:
+                    latencies.append(elapsed)
+                    statuses[response.status_code] += 1
+
+    if warmup:
+        worker(-1, warmup, record=False)
+
+    threads = [threading.Thread(target=worker, args=(i, per_thread, True)) for i in range(concurrency)]
+    began = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - began
+
+    latencies.sort()
+    return {
+        "scenario": name,
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "latency_ms": {
+            "p50": _percentile(latencies, 0.50),
+            "p95": _percentile(latencies, 0.95),
+            "p99": _percentile(latencies, 0.99),
+            "max": round(latencies[-1], 2) if latencies else None,
+            "mean": round(sum(latencies) / len(latencies), 2) if latencies else None,
+        },
+        "status": {str(code): n for code, n in sorted(statuses.items())},
+        "errors": sum(n for code, n in statuses.items() if code >= 500),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment(app):
+    """Thông tin môi trường đi kèm kết quả (commit, DB, số dòng) để so sánh đúng."""
+    with app.app_context():
+        ctx = Context()
+        dialect = db.engine.dialect.name
+    return {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "database": dialect,
+        "tutors": ctx.max_tutor_id,
+        "customers": ctx.customers,
+        "cache_backend": app.config.get("CACHE_BACKEND"),
+    }
+
+
+def save_report(path, report):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def compare(before, after):
+    """So sánh 2 báo cáo -> list dòng (scenario, chỉ số, trước, sau, % thay đổi)."""
+    old = {r["scenario"]: r for r in before["results"]}
+    rows = []
+    for result in after["results"]:
+        prev = old.get(result["scenario"])
+        if prev is None:
+            continue
+        metrics = [(f"latency {p}", prev["latency_ms"][p], result["latency_ms"][p]) for p in ("p50", "p95", "p99")]
+        metrics.append(("throughput_rps", prev["throughput_rps"], result["throughput_rps"]))
+        for metric, a, b in metrics:
+            change = round((b - a) / a * 100, 1) if a and b is not None else None
+            rows.append((result["scenario"], metric, a, b, change))
+    return rows
@@ -0,0 +1,377 @@
+# Các lệnh `flask ...` dùng cho vận hành (đăng ký trong app.py)
+import click
+
+# extension Postgres mà schema cần (migration 0001: index trigram, 0005: ExcludeConstraint)
+POSTGRES_EXTENSIONS = ("pg_trgm", "btree_gist")
+
+
+def _reset_schema():
+    """Xóa và tạo lại toàn bộ bảng theo models rồi stamp alembic ở head (schema models = head)."""
+    from flask_migrate import stamp
+    from sqlalchemy import text
+
+    from extensions import db
+
+    if db.engine.dialect.name == "postgresql":
+        # create_all không chạy migration -> tự tạo extension trước khi tạo index/constraint cần nó
+        with db.engine.begin() as conn:
+            for name in POSTGRES_EXTENSIONS:
+                conn.execute(text(f"CREATE EXTENSION IF NOT EXISTS {name}"))
+    db.drop_all()
+    db.create_all()
+    stamp()
+
+
+def register_commands(app):
+    """Gắn các lệnh CLI vào app."""
+
+    @app.cli.command("search-reindex")
+    @click.option("--batch-size", default=1000, show_default=True)
+    def search_reindex(batch_size):
+        """Tính lại cột tìm kiếm (search_text, city_norm) cho toàn bộ gia sư."""
+        from extensions import cache
+        from services import search
+
+        count = search.reindex_all(batch_size=batch_size)
+        cache.bump("tutors:list")
+        click.echo(f"Đã index lại {count} gia sư")
+
+    @app.cli.command("import-tutors")
+    @click.argument("csv_path", type=click.Path(exists=True, dir_okay=False))
+    @click.option("--batch-size", default=1000, show_default=True)
+    def import_tutors(csv_path, batch_size):
+        """Import gia sư từ file CSV (cột subjects cách nhau bởi ';')."""
+        from extensions import cache
+        from services import tutor_import
+
+        report = tutor_import.import_tutors(tutor_import.read_csv(csv_path), batch_size=batch_size)
+        cache.bump("tutors:list")
+        click.echo(f"Tổng {report.total} dòng: tạo {report.created}, lỗi {len(report.errors)}")
+        for error in report.errors:
+            click.echo(f"  dòng {error['row']} ({error['email']}): {error['error']}", err=True)
+
+    @app.cli.command("ratings-recompute")
+    @click.option("--tutor-id", "tutor_ids", type=int, multiple=True, help="Chỉ tính lại các gia sư này")
+    def ratings_recompute(tutor_ids):
+        """Tính lại rating_avg/rating_count của gia sư từ bảng feedbacks."""
+        from routes.tutors import invalidate_tutor_cache
+        from services.ratings import recompute_ratings
+
+        count = recompute_ratings(list(tutor_ids) or None)
+        for tutor_id in tutor_ids or ["*"]:
+            invalidate_tutor_cache(tutor_id)
+        click.echo(f"Đã tính lại điểm cho {count} gia sư")
+
+    @app.cli.command("booking-loadtest")
+    @click.option("--tutor-id", type=int, required=True)
+    @click.option("--student-id", type=int, required=True)
+    @click.option("--subject-id", type=int, required=True)
+    @click.option("--start-at", required=True, help="VD 2030-01-07T18:00")
+    @click.option("--hours", default="2", show_default=True)
+    @click.option("--workers", default=20, show_default=True)
+    def booking_loadtest(tutor_id, student_id, subject_id, start_at, hours, workers):
+        """Bắn nhiều booking đồng thời vào CÙNG 1 khung giờ: kỳ vọng đúng 1 thành công."""
+        import threading
+        import time
+        from collections import Counter
+
+        from extensions import db
+        from services import booking as booking_service
+
+        start = booking_service.parse_start_at(start_at)
+        duration = booking_service.parse_hours(hours)
+        outcomes = Counter()
+        lock = threading.Lock()
+        barrier = threading.Barrier(workers)
+
+        def attempt():
+            with app.app_context():
+                barrier.wait()
+                try:
+                    booking_service.create_booking(student_id, tutor_id, subject_id, start, duration)
+                    db.session.commit()
+                    outcome = "created"
+                except booking_service.BookingError as exc:
+                    db.session.rollback()
+                    outcome = f"{exc.status} {exc.message}"
+                except Exception as exc:  # lỗi DB bất ngờ cũng phải thấy trong báo cáo
+                    db.session.rollback()
+                    outcome = f"error {type(exc).__name__}"
+                finally:
+                    db.session.remove()
+                with lock:
+                    outcomes[outcome] += 1
+
+        threads = [threading.Thread(target=attempt) for _ in range(workers)]
+        began = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - began
+
+        for outcome, count in outcomes.most_common():
+            click.echo(f"{count:5d}  {outcome}")
+        click.echo(f"{workers} request trong {elapsed:.3f}s")
+        if outcomes["created"] != 1:
+            raise click.ClickException(f"Kỳ vọng 1 booking, thực tế {outcomes['created']}")
+
+    @app.cli.command("bench-seed")
+    @click.option("--scale", default="10k", show_default=True, help="10k | 100k | 1m | 10m hoặc số dòng")
+    @click.option("--seed", "seed_value", default=42, show_default=True)
+    @click.option("--chunk-size", default=5000, show_default=True)
+    @click.option("--reset", is_flag=True,
+                  help="drop_all + create_all (+ extension Postgres, stamp head) trước khi sinh (XÓA dữ liệu)")
+    def bench_seed(scale, seed_value, chunk_size, reset):
+        """Sinh dữ liệu giả có seed vào DB local (DATABASE_URL) để benchmark."""
+        import time
+
+        from benchmarks import datagen
+
+        try:
+            total = datagen.parse_scale(scale)
+        except ValueError as exc:
+            raise click.BadParameter(str(exc), param_hint="--scale")
+        if reset:
+            _reset_schema()
+
+        began = time.perf_counter()
+
+        def progress(table, written):
+            click.echo(f"\r{table}: {written}", nl=False)
+
+        try:
+            counts = datagen.seed(total, seed_value=seed_value, chunk_size=chunk_size, progress=progress)
+        except RuntimeError as exc:
+            raise click.ClickException(str(exc))
+        click.echo()
+        for table, count in counts.items():
+            click.echo(f"{count:10d}  {table}")
+        click.echo(f"Xong trong {time.perf_counter() - began:.1f}s")
+
+    @app.cli.command("bench-run")
+    @click.option("--scenario", "scenarios", multiple=True,
+                  type=click.Choice(["search", "detail", "login", "customers"]),
+                  help="Mặc định chạy tất cả")
+    @click.option("--requests", default=1000, show_default=True)
+    @click.option("--concurrency", default=4, show_default=True)
+    @click.option("--seed", "seed_value", default=1, show_default=True)
+    @click.option("--warmup", default=50, show_default=True)
+    @click.option("--output", type=click.Path(dir_okay=False), help="Lưu kết quả JSON")
+    def bench_run(scenarios, requests, concurrency, seed_value, warmup, output):
+        """Chạy kịch bản tải trong process, in p50/p95/p99 + throughput."""
+        from benchmarks import scenarios as bench
+
+        report = {"environment": bench.environment(app), "results": []}
+        for name in scenarios or list(bench.SCENARIOS):
+            result = bench.run_scenario(app, name, requests, concurrency, seed_value, warmup)
+            report["results"].append(result)
+            lat = result["latency_ms"]
+            click.echo(
+                f"{name:10s} {result['requests']:6d} req  {result['throughput_rps']:8.1f} req/s  "
+                f"p50 {lat['p50']}ms  p95 {lat['p95']}ms  p99 {lat['p99']}ms  status {result['status']}"
+            )
+        if output:
+            bench.save_report(output, report)
+            click.echo(f"Đã lưu {output}")
+
+    @app.cli.command("bench-concurrency")
+    @click.option("--scenario", "scenarios", multiple=True,
+                  type=click.Choice(["search", "detail", "login", "customers"]),
+                  help="Mặc định: detail")
+    @click.option("--levels", default="10,100,1000", show_default=True, help="Các mức client đồng thời")
+    @click.option("--requests", default=1000, show_default=True, help="Số request mỗi mức")
+    @click.option("--threads", default=16, show_default=True, help="Thread của đường WSGI (gunicorn --threads)")
+    @click.option("--db-latency-ms", type=float, default=0.0, show_default=True,
+                  help="Độ trễ giả lập thêm vào mỗi câu SQL (DB ở máy khác)")
+    @click.option("--output", type=click.Path(dir_okay=False), help="Lưu kết quả JSON")
+    def bench_concurrency(scenarios, levels, requests, threads, db_latency_ms, output):
+        """So sánh WSGI (thread pool) và ASGI (engine asyncio) khi tăng số client đồng thời."""
+        from benchmarks import concurrency as bench
+        from benchmarks.scenarios import environment, save_report
+
+        try:
+            levels = [int(level) for level in levels.split(",") if level.strip()]
+        except ValueError:
+            raise click.BadParameter("VD: 10,100,1000", param_hint="--levels")
+
+        report = {"environment": environment(app), "db_latency_ms": db_latency_ms, "results": []}
+        for name in scenarios or ["detail"]:
+            for result in bench.run_levels(app, name, levels, requests, threads, db_latency_ms):
+                report["results"].append(result)
+                lat = result["latency_ms"]
+                click.echo(
+                    f"{name:10s} {result['mode']:5s} c={result['concurrency']:<5d} "
+                    f"{result['throughput_rps']:8.1f} req/s  p50 {lat['p50']}ms  p95 {lat['p95']}ms  "
+                    f"p99 {lat['p99']}ms  status {result['status']}"
+                )
+        if output:
+            save_report(output, report)
+            click.echo(f"Đã lưu {output}")
+
+    @app.cli.command("bench-compare")
+    @click.argument("before", type=click.Path(exists=True, dir_okay=False))
+    @click.argument("after", type=click.Path(exists=True, dir_okay=False))
+    def bench_compare(before, after):
+        """So sánh 2 file kết quả bench-run (VD: trước và sau 1 commit)."""
+        import json
+
+        from benchmarks import scenarios as bench
+
+        with open(before, encoding="utf-8") as f:
+            old = json.load(f)
+        with open(after, encoding="utf-8") as f:
+            new = json.load(f)
+        click.echo(f"{old['environment'].get('commit')} -> {new['environment'].get('commit')}")
+        for scenario, metric, a, b, change in bench.compare(old, new):
+            sign = "" if change is None else f"{change:+.1f}%"
+            click.echo(f"{scenario:10s} {metric:16s} {a!s:>10} -> {b!s:<10} {sign}")
+
+    @app.cli.command("worker")
+    @click.option("--threads", default=1, show_default=True, help="Số luồng worker trong process")
+    @click.option("--batch", default=10, show_default=True, help="Số job lấy mỗi lần")
+    @click.option("--poll-interval", type=float, default=None, help="Giây chờ khi hàng đợi rỗng")
+    @click.option("--once", is_flag=True, help="Chạy hết job đến hạn rồi thoát (cron, test)")
+    def worker(threads, batch, poll_interval, once):
+        """Chạy worker xử lý job nền (bảng jobs). Ctrl+C / SIGTERM để dừng sau job hiện tại."""
+        import signal
+        import threading
+
+        from flask import current_app
+        from services import tasks
+
+        registered = tasks.load_tasks()
+        click.echo(f"Worker {tasks.default_worker_id()}: {threads} luồng, task: {', '.join(sorted(registered))}")
+
+        if once:
+            count = tasks.work(once=True, batch=batch)
+            click.echo(f"Đã chạy {count} job")
+            return
+
+        stop = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        flask_app = current_app._get_current_object()
+
+        def run():
+            with flask_app.app_context():
+                tasks.work(batch=batch, poll_interval=poll_interval, stop_event=stop)
+
+        pool = [threading.Thread(target=run, name=f"worker-{i}") for i in range(threads)]
+        for thread in pool:
+            thread.start()
+        try:
+            while any(thread.is_alive() for thread in pool):
+                for thread in pool:
+                    thread.join(timeout=0.5)
+        except KeyboardInterrupt:
+            click.echo("Đang dừng, chờ job hiện tại xong...")
+            stop.set()
+            for thread in pool:
+                thread.join()
+
+    @app.cli.command("jobs")
+    @click.option("--failed", "show_failed", default=0, show_default=True, help="In N job lỗi gần nhất")
+    @click.option("--requeue-failed", is_flag=True, help="Đưa các job failed về hàng đợi")
+    def jobs(show_failed, requeue_failed):
+        """Thống kê hàng đợi job nền."""
+        from datetime import datetime
+
+        from sqlalchemy import select, update
+
+        from extensions import db
+        from models import Job, JobStatus
+        from services import tasks
+
+        if requeue_failed:
+            result = db.session.execute(
+                update(Job)
+                .where(Job.status == JobStatus.failed)
+                .values(status=JobStatus.queued, attempts=0, run_at=datetime.utcnow())
+            )
+            db.session.commit()
+            click.echo(f"Đã đưa lại {result.rowcount} job vào hàng đợi")
+
+        for status, count in sorted(tasks.stats().items()):
+            click.echo(f"{status:8s} {count}")
+        if show_failed:
+            failed = db.session.scalars(
+                select(Job).where(Job.status == JobStatus.failed).order_by(Job.id.desc()).limit(show_failed)
+            )
+            for job in failed:
+                click.echo(f"  #{job.id} {job.name} ({job.attempts} lần): {job.last_error}", err=True)
+
+    @app.cli.command("bookings-archive")
+    @click.option("--older-than-days", type=int, default=None,
+                  help="Kết thúc quá N ngày (mặc định BOOKINGS_ARCHIVE_AFTER_DAYS)")
+    @click.option("--batch-size", default=1000, show_default=True, help="Số booking mỗi transaction")
+    @click.option("--schedule", "repeat_hours", type=int, default=None,
+                  help="Không chạy ngay: xếp job chạy định kỳ mỗi N giờ (worker xử lý)")
+    def bookings_archive(older_than_days, batch_size, repeat_hours):
+        """Chuyển booking đã kết thúc lâu sang bookings_archive."""
+        from extensions import db
+        from services import archive
+
+        if repeat_hours:
+            job = archive.schedule(repeat_hours, older_than_days, delay=0)
+            db.session.commit()
+            click.echo(f"Đã xếp job #{job.id}: lưu trữ booking mỗi {repeat_hours} giờ")
+            return
+        count = archive.archive_bookings(older_than_days, batch_size)
+        click.echo(f"Đã lưu trữ {count} booking")
+
+    @app.cli.command("db-advise")
+    @click.option("--workload", "workloads", multiple=True,
+                  type=click.Choice(["search", "detail", "login", "customers"]),
+                  help="Chạy kịch bản benchmark để ghi lại câu SQL thật (cần dữ liệu, VD bench-seed)")
+    @click.option("--requests", default=200, show_default=True, help="Số request mỗi kịch bản")
+    @click.option("--explain/--no-explain", "with_explain", default=True, show_default=True)
+    @click.option("--write-migration", is_flag=True, help="Sinh migration tạo các index được gợi ý")
+    @click.option("--rev-id", help="Revision id cho migration (mặc định sinh ngẫu nhiên)")
+    def db_advise(workloads, requests, with_explain, write_migration, rev_id):
+        """Gợi ý index: khóa ngoại chưa có index + cột lọc/sắp xếp trong các câu SQL đã chạy."""
+        import os
+        import uuid
+
+        from alembic.script import ScriptDirectory
+        from flask import current_app
+
+        from extensions import db
+        from utils import index_advisor as advisor
+
+        found = advisor.unindexed_foreign_keys(db.metadata)
+        if workloads:
+            from benchmarks import scenarios as bench
+
+            with advisor.QueryRecorder(db.engines.values()) as recorder:
+                for name in workloads:
+                    bench.run_scenario(app, name, requests, concurrency=1, warmup=0)
+            click.echo(f"Đã ghi {len(recorder.patterns)} mẫu câu SELECT từ {', '.join(workloads)}")
+            found += advisor.pattern_recommendations(recorder.patterns, db.metadata)
+
+        recommendations = advisor.merge(found)
+        if not recommendations:
+            click.echo("Không có gợi ý: mọi khóa ngoại / cột lọc đã có index")
+            return
+
+        for rec in recommendations:
+            hits = f", {rec.hits} lần" if rec.hits else ""
+            click.echo(f"{rec.name}: {rec.table}({', '.join(rec.columns)}){hits}")
+            for reason in rec.reasons:
+                click.echo(f"    - {reason}")
+            if with_explain:
+                try:
+                    plan = advisor.explain(db.session, db.metadata, rec)
+                except Exception as exc:  # bảng chưa tạo, câu mẫu dùng tham số lạ, ...
+                    plan = [f"(không EXPLAIN được: {exc.__class__.__name__})"]
+                for line in plan:
+                    click.echo(f"      {line}")
+
+        if write_migration:
+            config = current_app.extensions["migrate"].migrate.get_config()
+            script = ScriptDirectory.from_config(config)
+            revision = rev_id or uuid.uuid4().hex[:12]
+            content = advisor.render_migration(recommendations, revision, script.get_current_head())
+            path = os.path.join(script.versions, f"{revision}_advised_indexes.py")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(content)
+            click.echo(f"Đã tạo {path} (kiểm tra lại rồi chạy flask db upgrade)")
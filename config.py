@@ -0,0 +1,158 @@
+# Cấu hình theo môi trường: development / testing / production
+# Chọn bằng biến FLASK_CONFIG (mặc định development) hoặc create_app("production").
+import os
+from dotenv import load_dotenv
+from sqlalchemy.pool import NullPool
+from utils.db_pool import TimedQueuePool
+
+# Nạp biến môi trường từ file .env trước khi đọc cấu hình
+load_dotenv()
+
+
+def _env_int(name, default):
+    return int(os.getenv(name, default))
+
+
+def _database_uri():
+    if os.getenv("DATABASE_URL"):
+        return os.getenv("DATABASE_URL")
+    return (
+        f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}"
+        f"@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
+    )
+
+
+class Config:
+    """Cấu hình chung"""
+    SQLALCHEMY_DATABASE_URI = _database_uri()
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "dev-jwt-secret")
+
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_pre_ping": True,
+    }
+
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+    CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+    BCRYPT_LOG_ROUNDS = _env_int("BCRYPT_LOG_ROUNDS", 12)
+    # số thread bcrypt (= số core tối đa cho hash mật khẩu); 0 -> nửa số core
+    PASSWORD_HASH_WORKERS = _env_int("PASSWORD_HASH_WORKERS", 0)
+
+    # pool: log cảnh báo khi chờ lấy connection lâu hơn ngưỡng này
+    DB_POOL_WAIT_WARN_MS = _env_int("DB_POOL_WAIT_WARN_MS", 100)
+    DB_STATEMENT_TIMEOUT_MS = _env_int("DB_STATEMENT_TIMEOUT_MS", 0)
+    DB_PGBOUNCER = os.getenv("DB_PGBOUNCER", "0") == "1"
+
+    # Read replica: DATABASE_REPLICA_URLS="postgresql://...,postgresql://..." (phân cách bằng dấu phẩy)
+    SQLALCHEMY_REPLICA_URIS = [u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+    # sau khi ghi, client/user đó đọc từ primary trong N giây (chờ replica bắt kịp)
+    DB_REPLICA_STICKY_SECONDS = _env_int("DB_REPLICA_STICKY_SECONDS", 5)
+
+    # Đo SQL theo request (header Server-Timing + log "db.profile"), mặc định tắt
+    SQL_PROFILING = os.getenv("SQL_PROFILING", "0") == "1"
+    SQL_QUERY_BUDGET = _env_int("SQL_QUERY_BUDGET", 20)
+
+    # Job nền (bảng jobs, chạy bằng `flask worker`)
+    JOBS_EMBEDDED_WORKER = os.getenv("JOBS_EMBEDDED_WORKER", "0") == "1"   # chạy worker trong web process
+    JOBS_POLL_INTERVAL = float(os.getenv("JOBS_POLL_INTERVAL", "1.0"))     # giây, khi hàng đợi rỗng
+    JOBS_MAX_ATTEMPTS = _env_int("JOBS_MAX_ATTEMPTS", 5)
+    JOBS_LOCK_TIMEOUT = _env_int("JOBS_LOCK_TIMEOUT", 300)                 # job running quá lâu -> chạy lại
+    # import gia sư nhiều hơn N dòng -> chạy nền, trả 202
+    TUTOR_IMPORT_SYNC_LIMIT = _env_int("TUTOR_IMPORT_SYNC_LIMIT", 1000)
+    # booking completed/canceled/rejected kết thúc quá N ngày -> chuyển sang bookings_archive
+    BOOKINGS_ARCHIVE_AFTER_DAYS = _env_int("BOOKINGS_ARCHIVE_AFTER_DAYS", 90)
+
+    # Chế độ ASGI (asgi.py): route đọc nhiều chạy trên engine asyncio, route còn lại trong thread pool
+    ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")      # mặc định suy từ DATABASE_URL (+asyncpg)
+    ASYNC_ENGINE_OPTIONS = {
+        "pool_pre_ping": True,
+    }
+    ASGI_THREADS = _env_int("ASGI_THREADS", 16)
+
+
+class DevelopmentConfig(Config):
+    DEBUG = True
+    # dev không cần chạy `flask worker` riêng
+    JOBS_EMBEDDED_WORKER = os.getenv("JOBS_EMBEDDED_WORKER", "1") == "1"
+
+
+class TestingConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = os.getenv("TEST_DATABASE_URL", "sqlite://")
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    ASYNC_ENGINE_OPTIONS = {}
+    JWT_SECRET_KEY = "test-jwt-secret-key-with-enough-length"
+    BCRYPT_LOG_ROUNDS = 4          # hash nhanh cho test
+    CACHE_BACKEND = "memory"
+    SQL_PROFILING = True
+    SQL_QUERY_BUDGET_STRICT = True   # route vượt ngân sách query -> test fail
+    JOBS_EMBEDDED_WORKER = False     # test tự gọi tasks.work(once=True)
+
+
+def _production_engine_options():
+    statement_timeout = _env_int("DB_STATEMENT_TIMEOUT_MS", 5000)
+    pgbouncer = os.getenv("DB_PGBOUNCER", "0") == "1"
+
+    if pgbouncer and os.getenv("DB_PGBOUNCER_NULLPOOL", "0") == "1":
+        # để PgBouncer giữ pool, app mở/đóng connection tới PgBouncer mỗi lần dùng
+        return {"poolclass": NullPool}
+
+    options = {
+        "poolclass": TimedQueuePool,
+        "pool_size": _env_int("DB_POOL_SIZE", 10),
+        "max_overflow": _env_int("DB_MAX_OVERFLOW", 5),
+        "pool_timeout": _env_int("DB_POOL_TIMEOUT", 5),        # giây chờ connection rảnh
+        "pool_recycle": _env_int("DB_POOL_RECYCLE", 1800),     # đóng connection quá 30 phút
+        "pool_pre_ping": not pgbouncer,  # PgBouncer tự kiểm tra server connection
+        "pool_use_lifo": True,           # connection dư thừa được để nguội và recycle
+        "connect_args": {
+            "connect_timeout": _env_int("DB_CONNECT_TIMEOUT", 5),
+            "application_name": os.getenv("DB_APPLICATION_NAME", "baitap-api"),
+        },
+    }
+    if statement_timeout and not pgbouncer:
+        options["connect_args"]["options"] = f"-c statement_timeout={statement_timeout}"
+    return options
+
+
+def _production_async_engine_options():
+    """Như trên cho engine asyncio (asyncpg): tham số kết nối khác tên, pool riêng của từng process."""
+    statement_timeout = _env_int("DB_STATEMENT_TIMEOUT_MS", 5000)
+    pgbouncer = os.getenv("DB_PGBOUNCER", "0") == "1"
+
+    if pgbouncer and os.getenv("DB_PGBOUNCER_NULLPOOL", "0") == "1":
+        return {"poolclass": NullPool}
+
+    server_settings = {"application_name": os.getenv("DB_APPLICATION_NAME", "baitap-api")}
+    if statement_timeout and not pgbouncer:
+        server_settings["statement_timeout"] = str(statement_timeout)
+    connect_args = {"timeout": _env_int("DB_CONNECT_TIMEOUT", 5), "server_settings": server_settings}
+    if pgbouncer:
+        # PgBouncer transaction pooling: prepared statement không sống qua các transaction
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+    return {
+        # 1 event loop giữ được nhiều request đang chờ DB hơn 1 thread pool -> pool lớn hơn
+        "pool_size": _env_int("ASYNC_DB_POOL_SIZE", 20),
+        "max_overflow": _env_int("ASYNC_DB_MAX_OVERFLOW", 10),
+        "pool_timeout": _env_int("DB_POOL_TIMEOUT", 5),
+        "pool_recycle": _env_int("DB_POOL_RECYCLE", 1800),
+        "pool_pre_ping": not pgbouncer,
+        "pool_use_lifo": True,
+        "connect_args": connect_args,
+    }
+
+
+class ProductionConfig(Config):
+    DEBUG = False
+    SQLALCHEMY_ENGINE_OPTIONS = _production_engine_options()
+    ASYNC_ENGINE_OPTIONS = _production_async_engine_options()
+    DB_STATEMENT_TIMEOUT_MS = _env_int("DB_STATEMENT_TIMEOUT_MS", 5000)
+    # nhiều worker -> cache dùng chung (đặt CACHE_BACKEND=redis)
+
+
+config_by_name = {
+    "development": DevelopmentConfig,
+    "testing": TestingConfig,
+    "production": ProductionConfig,
+}
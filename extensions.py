@@ -2,9 +2,16 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager
+from flask_migrate import Migrate
+from utils.cache import ResponseCache
+from utils.hashing import PasswordHasher
+from utils.db_routing import RoutingSession
 
-db = SQLAlchemy()        # ORM (thao tác với cơ sở dữ liệu)
+db = SQLAlchemy(session_options={"class_": RoutingSession})  # ORM; route @read_only đọc từ replica
 bcrypt = Bcrypt()        # Hash password (mã hóa mật khẩu)
 jwt = JWTManager()       # Quản lý JWT 
+migrate = Migrate()      # Alembic migrations (flask db ...)
+cache = ResponseCache()  # Cache response/entity (LRU trong bộ nhớ hoặc Redis)
+hasher = PasswordHasher(bcrypt)  # Chạy bcrypt trên thread pool có giới hạn
 
 
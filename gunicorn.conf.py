@@ -0,0 +1,51 @@
+# gunicorn -c gunicorn.conf.py wsgi:app
+# - preload_app: app tạo + warm-up 1 lần ở master (wsgi.py), fork ra worker dùng chung bộ nhớ
+# - gc.freeze() trước fork: GC của worker không chạm vào object của master -> trang nhớ không bị copy
+# - post_fork: bỏ pool DB kế thừa (connection không dùng chung được giữa các process)
+# - Worker khởi động nhanh nên có thể restart định kỳ (max_requests) để chặn rò bộ nhớ
+import gc
+import multiprocessing
+import os
+import time
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:9000")
+workers = int(os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "4"))      # <= DB_POOL_SIZE + DB_MAX_OVERFLOW
+preload_app = True
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = 30
+keepalive = 5
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "5000"))
+max_requests_jitter = max_requests // 10
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG")          # VD "-" để in ra stdout
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def when_ready(server):
+    from wsgi import app
+
+    startup = app.extensions["startup"]
+    server.log.info(
+        "App sẵn sàng sau %.0f ms (create_app %.0f ms, warm-up %.0f ms)",
+        startup["total_ms"], startup["create_app_ms"], startup["warm_up_ms"],
+    )
+
+
+def pre_fork(server, worker):
+    # object đã có ở master chuyển vào thế hệ "vĩnh viễn", GC của worker bỏ qua
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from app import after_fork
+    from wsgi import app
+
+    worker.boot_started = time.perf_counter()
+    after_fork(app)
+
+
+def post_worker_init(worker):
+    boot_ms = (time.perf_counter() - worker.boot_started) * 1000
+    worker.log.info("Worker %s sẵn sàng sau %.1f ms kể từ fork", worker.pid, boot_ms)
@@ -0,0 +1,95 @@
+"""tutor search columns (city_norm, search_text) + trigram index
+
+Revision ID: a1c3e5f70001
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+import re
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c3e5f70001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+_NON_WORD = re.compile(r'[^0-9a-z]+')
+
+
+def _normalize(text):
+    # bản sao cố định của services.search.normalize tại thời điểm viết migration
+    # (migration không import code app: code app đổi sau này thì migration cũ vẫn chạy ra đúng kết quả cũ)
+    if not text:
+        return ''
+    text = text.replace('đ', 'd').replace('Đ', 'D')
+    text = unicodedata.normalize('NFD', text)
+    text = ''.join(ch for ch in text if unicodedata.category(ch) != 'Mn')
+    return _NON_WORD.sub(' ', text.lower()).strip()
+
+
+def upgrade():
+    bind = op.get_bind()
+    is_postgres = bind.dialect.name == 'postgresql'
+
+    if is_postgres:
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    with op.batch_alter_table('tutors', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('city_norm', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('search_text', sa.Text(), nullable=True))
+
+    # backfill dữ liệu cũ (chuẩn hóa bằng Python để giống hệt lúc ghi), UPDATE theo lô bằng executemany
+    tutors = sa.table(
+        'tutors',
+        sa.column('id', sa.Integer), sa.column('full_name', sa.String),
+        sa.column('city', sa.String), sa.column('bio', sa.Text),
+        sa.column('city_norm', sa.String), sa.column('search_text', sa.Text),
+    )
+    names = {}
+    for tutor_id, name in bind.execute(sa.text(
+        'SELECT ts.tutor_id, s.name FROM tutor_subjects ts JOIN subjects s ON s.id = ts.subject_id'
+    )):
+        names.setdefault(tutor_id, []).append(name)
+
+    update = tutors.update().where(tutors.c.id == sa.bindparam('tutor_id')).values(
+        city_norm=sa.bindparam('city_norm'), search_text=sa.bindparam('search_text'),
+    )
+    rows = bind.execute(sa.select(tutors.c.id, tutors.c.full_name, tutors.c.city, tutors.c.bio)).all()
+    for start in range(0, len(rows), BATCH_SIZE):
+        params = []
+        for row in rows[start:start + BATCH_SIZE]:
+            parts = [row.full_name, row.city, *names.get(row.id, []), row.bio]
+            params.append({
+                'tutor_id': row.id,
+                'city_norm': _normalize(row.city) or None,
+                'search_text': _normalize(' '.join(p for p in parts if p)),
+            })
+        bind.execute(update, params)
+
+    op.create_index(
+        'ix_tutor_city_norm', 'tutors', ['city_norm'],
+        postgresql_ops={'city_norm': 'varchar_pattern_ops'},
+    )
+    op.create_index('ix_tutor_subjects_subject', 'tutor_subjects', ['subject_id'])
+    if is_postgres:
+        op.create_index(
+            'ix_tutor_search_text_trgm', 'tutors', ['search_text'],
+            postgresql_using='gin', postgresql_ops={'search_text': 'gin_trgm_ops'},
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_tutor_search_text_trgm', table_name='tutors')
+    op.drop_index('ix_tutor_subjects_subject', table_name='tutor_subjects')
+    op.drop_index('ix_tutor_city_norm', table_name='tutors')
+
+    with op.batch_alter_table('tutors', schema=None) as batch_op:
+        batch_op.drop_column('search_text')
+        batch_op.drop_column('city_norm')
@@ -0,0 +1,26 @@
+"""keyset pagination indexes for tutors and customers
+
+Revision ID: a1c3e5f70002
+Revises: a1c3e5f70001
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c3e5f70002'
+down_revision = 'a1c3e5f70001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_tutor_rating_id', 'tutors', ['rating_avg', 'id'])
+    op.create_index('ix_customer_created_id', 'customers', ['created_at', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_customer_created_id', table_name='customers')
+    op.drop_index('ix_tutor_rating_id', table_name='tutors')
@@ -0,0 +1,40 @@
+"""tutor rating_sum for incremental rating aggregates
+
+Revision ID: a1c3e5f70003
+Revises: a1c3e5f70002
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c3e5f70003'
+down_revision = 'a1c3e5f70002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('tutors', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('rating_sum', sa.Integer(), server_default='0', nullable=False))
+
+    # đồng bộ lại toàn bộ điểm từ feedbacks
+    op.execute("""
+        UPDATE tutors SET
+            rating_sum = COALESCE((
+                SELECT SUM(f.rating) FROM feedbacks f JOIN bookings b ON b.id = f.booking_id
+                WHERE b.tutor_id = tutors.id), 0),
+            rating_count = (
+                SELECT COUNT(f.id) FROM feedbacks f JOIN bookings b ON b.id = f.booking_id
+                WHERE b.tutor_id = tutors.id),
+            rating_avg = COALESCE((
+                SELECT AVG(f.rating) FROM feedbacks f JOIN bookings b ON b.id = f.booking_id
+                WHERE b.tutor_id = tutors.id), 0)
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('tutors', schema=None) as batch_op:
+        batch_op.drop_column('rating_sum')
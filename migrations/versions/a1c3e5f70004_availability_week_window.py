@@ -0,0 +1,102 @@
+"""availability week-minute window + booking end_at for availability search
+
+Revision ID: a1c3e5f70004
+Revises: a1c3e5f70003
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from datetime import timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c3e5f70004'
+down_revision = 'a1c3e5f70003'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def _update_in_batches(bind, table, columns, rows):
+    """rows: (id, giá trị từng cột). executemany theo lô BATCH_SIZE dòng."""
+    update = table.update().where(table.c.id == sa.bindparam('row_id')).values(
+        {name: sa.bindparam(f'new_{name}') for name in columns}
+    )
+    for start in range(0, len(rows), BATCH_SIZE):
+        bind.execute(update, [
+            {'row_id': row[0], **{f'new_{name}': value for name, value in zip(columns, row[1:])}}
+            for row in rows[start:start + BATCH_SIZE]
+        ])
+
+
+def upgrade():
+    bind = op.get_bind()
+    is_postgres = bind.dialect.name == 'postgresql'
+
+    with op.batch_alter_table('availability_slots', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('week_start', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('week_end', sa.Integer(), nullable=True))
+    with op.batch_alter_table('bookings', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('end_at', sa.DateTime(), nullable=True))
+
+    slots = sa.table(
+        'availability_slots',
+        sa.column('id', sa.Integer), sa.column('weekday', sa.SmallInteger),
+        sa.column('start_time', sa.Time), sa.column('end_time', sa.Time),
+        sa.column('week_start', sa.Integer), sa.column('week_end', sa.Integer),
+    )
+    bookings = sa.table(
+        'bookings',
+        sa.column('id', sa.Integer), sa.column('start_at', sa.DateTime),
+        sa.column('hours', sa.Numeric(3, 1)), sa.column('end_at', sa.DateTime),
+    )
+    if is_postgres:
+        # 1 câu UPDATE cho mỗi bảng, tính ngay trong DB (cùng công thức models.minute_of_week)
+        op.execute(
+            'UPDATE availability_slots SET '
+            'week_start = weekday * 1440 + EXTRACT(HOUR FROM start_time)::int * 60 + EXTRACT(MINUTE FROM start_time)::int, '
+            'week_end = weekday * 1440 + EXTRACT(HOUR FROM end_time)::int * 60 + EXTRACT(MINUTE FROM end_time)::int'
+        )
+        op.execute(
+            "UPDATE bookings SET end_at = start_at + hours * INTERVAL '1 hour' "
+            'WHERE start_at IS NOT NULL AND hours IS NOT NULL'
+        )
+    else:
+        # SQLite lưu time/datetime dạng chuỗi -> tính bằng Python, UPDATE theo lô bằng executemany
+        rows = bind.execute(sa.select(slots.c.id, slots.c.weekday, slots.c.start_time, slots.c.end_time)).all()
+        _update_in_batches(bind, slots, ('week_start', 'week_end'), [
+            (row.id, row.weekday * 1440 + row.start_time.hour * 60 + row.start_time.minute,
+             row.weekday * 1440 + row.end_time.hour * 60 + row.end_time.minute)
+            for row in rows
+        ])
+        rows = bind.execute(
+            sa.select(bookings.c.id, bookings.c.start_at, bookings.c.hours)
+            .where(bookings.c.start_at.isnot(None), bookings.c.hours.isnot(None))
+        ).all()
+        _update_in_batches(bind, bookings, ('end_at',), [
+            (row.id, row.start_at + timedelta(hours=float(row.hours))) for row in rows
+        ])
+
+    op.create_index('ix_availability_week_window', 'availability_slots', ['week_start', 'week_end', 'tutor_id'])
+    if is_postgres:
+        op.execute(
+            'CREATE INDEX ix_availability_week_range_gist ON availability_slots '
+            'USING gist (int4range(week_start, week_end))'
+        )
+    op.create_index('ix_booking_tutor_start', 'bookings', ['tutor_id', 'start_at'])
+
+
+def downgrade():
+    op.drop_index('ix_booking_tutor_start', table_name='bookings')
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_availability_week_range_gist', table_name='availability_slots')
+    op.drop_index('ix_availability_week_window', table_name='availability_slots')
+
+    with op.batch_alter_table('bookings', schema=None) as batch_op:
+        batch_op.drop_column('end_at')
+    with op.batch_alter_table('availability_slots', schema=None) as batch_op:
+        batch_op.drop_column('week_end')
+        batch_op.drop_column('week_start')
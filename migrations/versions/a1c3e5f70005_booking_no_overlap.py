@@ -0,0 +1,34 @@
+"""booking no-overlap exclusion constraint (postgres)
+
+Revision ID: a1c3e5f70005
+Revises: a1c3e5f70004
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c3e5f70005'
+down_revision = 'a1c3e5f70004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    # btree_gist cho phép dùng "tutor_id WITH =" trong index GiST
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    op.execute(
+        "ALTER TABLE bookings ADD CONSTRAINT ex_booking_no_overlap "
+        "EXCLUDE USING gist (tutor_id WITH =, tsrange(start_at, end_at) WITH &&) "
+        "WHERE (status IN ('pending', 'accepted'))"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_constraint('ex_booking_no_overlap', 'bookings', type_='exclude')
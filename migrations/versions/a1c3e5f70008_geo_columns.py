@@ -0,0 +1,46 @@
+"""latitude/longitude for tutors and customers + tutor geohash index
+
+Revision ID: a1c3e5f70008
+Revises: a1c3e5f70007
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c3e5f70008'
+down_revision = 'a1c3e5f70007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('tutors', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('latitude', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('longitude', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('geohash', sa.String(length=12), nullable=True))
+
+    with op.batch_alter_table('customers', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('latitude', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('longitude', sa.Float(), nullable=True))
+
+    # cột mới đều NULL nên không cần backfill
+    op.create_index(
+        'ix_tutor_geohash', 'tutors', ['geohash'],
+        postgresql_ops={'geohash': 'varchar_pattern_ops'},
+    )
+
+
+def downgrade():
+    op.drop_index('ix_tutor_geohash', table_name='tutors')
+
+    with op.batch_alter_table('customers', schema=None) as batch_op:
+        batch_op.drop_column('longitude')
+        batch_op.drop_column('latitude')
+
+    with op.batch_alter_table('tutors', schema=None) as batch_op:
+        batch_op.drop_column('geohash')
+        batch_op.drop_column('longitude')
+        batch_op.drop_column('latitude')
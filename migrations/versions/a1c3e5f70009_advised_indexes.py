@@ -0,0 +1,35 @@
+"""advised indexes (flask db-advise)
+
+Revision ID: a1c3e5f70009
+Revises: a1c3e5f70008
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c3e5f70009'
+down_revision = 'a1c3e5f70008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Postgres: CREATE INDEX CONCURRENTLY không khóa ghi bảng đang chạy (phải ngoài transaction)
+    with op.get_context().autocommit_block():
+        op.create_index('ix_bookings_student_id', 'bookings', ['student_id'], postgresql_concurrently=True)
+        op.create_index('ix_bookings_subject_id', 'bookings', ['subject_id'], postgresql_concurrently=True)
+        op.create_index('ix_students_customer_id', 'students', ['customer_id'], postgresql_concurrently=True)
+        op.create_index('ix_users_customer_id', 'users', ['customer_id'], postgresql_concurrently=True)
+        op.create_index('ix_users_tutor_id', 'users', ['tutor_id'], postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_users_tutor_id', table_name='users', postgresql_concurrently=True)
+        op.drop_index('ix_users_customer_id', table_name='users', postgresql_concurrently=True)
+        op.drop_index('ix_students_customer_id', table_name='students', postgresql_concurrently=True)
+        op.drop_index('ix_bookings_subject_id', table_name='bookings', postgresql_concurrently=True)
+        op.drop_index('ix_bookings_student_id', table_name='bookings', postgresql_concurrently=True)
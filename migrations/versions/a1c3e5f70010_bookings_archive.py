@@ -0,0 +1,66 @@
+"""bookings_archive (month-partitioned history) + partial index for active bookings
+
+Revision ID: a1c3e5f70010
+Revises: a1c3e5f70009
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c3e5f70010'
+down_revision = 'a1c3e5f70009'
+branch_labels = None
+depends_on = None
+
+ACTIVE = sa.text("status IN ('pending', 'accepted')")
+
+
+def upgrade():
+    # Postgres: bảng cha partition theo tháng của start_at, partition con do services/archive.py tạo
+    op.create_table(
+        'bookings_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('start_at', sa.DateTime(), nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('tutor_id', sa.Integer(), nullable=False),
+        sa.Column('subject_id', sa.Integer(), nullable=False),
+        sa.Column('hours', sa.Numeric(precision=3, scale=1), nullable=True),
+        sa.Column('end_at', sa.DateTime(), nullable=True),
+        sa.Column('total_price', sa.Integer(), nullable=True),
+        sa.Column('status', sa.Enum('pending', 'accepted', 'rejected', 'canceled', 'completed',
+                                    name='bookingstatus', native_enum=False), nullable=False),
+        sa.Column('note', sa.String(length=500), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('feedback_id', sa.Integer(), nullable=True),
+        sa.Column('rating', sa.Integer(), nullable=True),
+        sa.Column('comment', sa.String(length=1000), nullable=True),
+        sa.Column('archived_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id', 'start_at'),
+        postgresql_partition_by='RANGE (start_at)',
+    )
+    op.create_index('ix_booking_archive_tutor_start', 'bookings_archive', ['tutor_id', 'start_at'])
+    op.create_index('ix_booking_archive_student_start', 'bookings_archive', ['student_id', 'start_at'])
+
+    # index theo status (ít giá trị, phần lớn là completed) và index đầy đủ (tutor_id, start_at)
+    # -> thay bằng 1 partial index cho lịch đang hiệu lực (mỗi lần ghi booking chỉ cập nhật 1 B-tree)
+    op.drop_index('ix_booking_status', table_name='bookings', if_exists=True)
+    op.drop_index('ix_booking_tutor_start', table_name='bookings', if_exists=True)
+    op.create_index(
+        'ix_booking_active_tutor_start', 'bookings', ['tutor_id', 'start_at'],
+        postgresql_where=ACTIVE, sqlite_where=ACTIVE,
+    )
+
+
+def downgrade():
+    op.drop_index('ix_booking_active_tutor_start', table_name='bookings')
+    op.create_index('ix_booking_tutor_start', 'bookings', ['tutor_id', 'start_at'])
+    op.create_index('ix_booking_status', 'bookings', ['status'])
+
+    # dữ liệu đã lưu trữ KHÔNG được chuyển lại bookings
+    op.drop_index('ix_booking_archive_student_start', table_name='bookings_archive')
+    op.drop_index('ix_booking_archive_tutor_start', table_name='bookings_archive')
+    op.drop_table('bookings_archive')
@@ -0,0 +1,33 @@
+"""jobs.created_by (owner of a job queued through the API)
+
+Revision ID: a1c3e5f70011
+Revises: a1c3e5f70010
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c3e5f70011'
+down_revision = 'a1c3e5f70010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # job cũ không có người tạo -> NULL (chỉ admin xem được)
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('created_by', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_jobs_created_by_users', 'users', ['created_by'], ['id'], ondelete='SET NULL'
+        )
+        batch_op.create_index('ix_jobs_created_by', ['created_by'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.drop_index('ix_jobs_created_by')
+        batch_op.drop_constraint('fk_jobs_created_by_users', type_='foreignkey')
+        batch_op.drop_column('created_by')
@@ -0,0 +1,25 @@
+"""expression index on lower(tutors.email) for case-insensitive duplicate checks
+
+Revision ID: a1c3e5f70012
+Revises: a1c3e5f70011
+Create Date: 2026-10-18 22:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c3e5f70012'
+down_revision = 'a1c3e5f70011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # không UNIQUE: dữ liệu cũ có thể đã trùng khác hoa thường, gộp tay trước nếu muốn ràng buộc
+    op.create_index('ix_tutor_email_lower', 'tutors', [sa.text('lower(email)')])
+
+
+def downgrade():
+    op.drop_index('ix_tutor_email_lower', table_name='tutors')
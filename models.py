@@ -2,7 +2,9 @@
 # Mỗi class là một bảng, mỗi thuộc tính là một cột.
 from datetime import datetime, time
 import enum
-from extensions import db, bcrypt  # bcrypt từ extensions
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
+from extensions import db, hasher  # hasher: bcrypt chạy trên thread pool
+from utils.serializers import Schema
 
 # =========================
 #  ENUMS (kiểu liệt kê)
@@ -20,6 +22,12 @@ class BookingStatus(enum.Enum):
     canceled = "canceled"     # hủy (khách/hs hoặc hệ thống)
     completed = "completed"   # buổi học xong
 
+class JobStatus(enum.Enum):
+    queued = "queued"         # chờ worker (run_at <= now mới được lấy)
+    running = "running"       # worker đang chạy
+    done = "done"
+    failed = "failed"         # hết số lần thử
+
 # =========================
 #  Mixin chung
 # =========================
@@ -47,6 +55,8 @@ class Customer(TimestampMixin, db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False)     # email duy nhất
     phone = db.Column(db.String(20), unique=True, nullable=True)       # sđt (có thể trùng null)
     address = db.Column(db.String(255), nullable=True)                 # địa chỉ
+    latitude = db.Column(db.Float, nullable=True)                      # tọa độ địa chỉ (tùy chọn)
+    longitude = db.Column(db.Float, nullable=True)
 
     # 1 khách có nhiều học viên
     students = db.relationship("Student", back_populates="customer", cascade="all, delete-orphan")
@@ -54,6 +64,11 @@ class Customer(TimestampMixin, db.Model):
      # Thêm quan hệ tới User
     user = db.relationship("User", back_populates="customer", uselist=False)  
 
+    __table_args__ = (
+        # phân trang cursor theo (created_at, id)
+        db.Index("ix_customer_created_id", "created_at", "id"),
+    )
+
     def __repr__(self):
         return f"<Customer {self.full_name}>"
 
@@ -77,6 +92,11 @@ class Student(TimestampMixin, db.Model):
     # 1 học viên có nhiều booking
     bookings = db.relationship("Booking", back_populates="student", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # index cho khóa ngoại (gợi ý của flask db-advise)
+        db.Index("ix_students_customer_id", "customer_id"),
+    )
+
     def __repr__(self):
         return f"<Student {self.full_name}>"
 
@@ -115,9 +135,19 @@ class Tutor(TimestampMixin, db.Model):
 
     rating_avg = db.Column(db.Float, default=0, nullable=False)            # điểm TB
     rating_count = db.Column(db.Integer, default=0, nullable=False)        # số lượt đánh giá
+    rating_sum = db.Column(db.Integer, default=0, server_default="0", nullable=False)  # tổng điểm (để cập nhật avg O(1))
 
     city = db.Column(db.String(100), nullable=True)                        # khu vực dạy
 
+    # cột phục vụ tìm kiếm (đã bỏ dấu, chữ thường) - xem services/search.py
+    city_norm = db.Column(db.String(100), nullable=True)                   # city không dấu
+    search_text = db.Column(db.Text, nullable=True)                        # tên + city + môn + bio
+
+    # vị trí dạy (tùy chọn) + geohash để tìm theo bán kính - xem utils/geo.py
+    latitude = db.Column(db.Float, nullable=True)
+    longitude = db.Column(db.Float, nullable=True)
+    geohash = db.Column(db.String(12), nullable=True)
+
     # N-N môn học
     subjects = db.relationship("Subject", secondary="tutor_subjects", back_populates="tutors")
 
@@ -130,6 +160,22 @@ class Tutor(TimestampMixin, db.Model):
     # Thêm quan hệ tới User
     user = db.relationship("User", back_populates="tutor", uselist=False)
 
+    __table_args__ = (
+        # phân trang cursor theo (rating_avg, id)
+        db.Index("ix_tutor_rating_id", "rating_avg", "id"),
+        # lọc city theo tiền tố (LIKE 'abc%') dùng được B-tree
+        db.Index("ix_tutor_city_norm", "city_norm", postgresql_ops={"city_norm": "varchar_pattern_ops"}),
+        # tìm theo bán kính: geohash LIKE 'tiền_tố%' cho 9 ô quanh tâm
+        db.Index("ix_tutor_geohash", "geohash", postgresql_ops={"geohash": "varchar_pattern_ops"}),
+        # kiểm tra trùng email không phân biệt hoa thường (route tạo/sửa + import)
+        db.Index("ix_tutor_email_lower", db.func.lower(email)),
+        # tìm kiếm mờ (sai chính tả) bằng pg_trgm
+        db.Index(
+            "ix_tutor_search_text_trgm", "search_text",
+            postgresql_using="gin", postgresql_ops={"search_text": "gin_trgm_ops"},
+        ),
+    )
+
     def __repr__(self):
         return f"<Tutor {self.full_name}>"
 
@@ -145,6 +191,11 @@ class TutorSubject(db.Model):
 
     # composite unique là PK luôn rồi, không cần thêm UniqueConstraint nữa
 
+    # PK bắt đầu bằng tutor_id -> cần thêm index để lọc theo môn
+    __table_args__ = (
+        db.Index("ix_tutor_subjects_subject", "subject_id"),
+    )
+
 # =========================
 #  LỊCH RẢNH CỦA GIA SƯ
 # =========================
@@ -162,6 +213,11 @@ class AvailabilitySlot(TimestampMixin, db.Model):
     start_time = db.Column(db.Time, nullable=False)
     end_time = db.Column(db.Time, nullable=False)
 
+    # cùng khoảng thời gian tính theo phút trong tuần (0 .. 7*1440), tự tính khi insert/update
+    # -> truy vấn "rảnh trong khung giờ X" là so sánh số nguyên, có index
+    week_start = db.Column(db.Integer, nullable=True)
+    week_end = db.Column(db.Integer, nullable=True)
+
     tutor = db.relationship("Tutor", back_populates="availability_slots")
 
     # tránh trùng slot cùng thứ+giờ cho 1 tutor
@@ -170,8 +226,27 @@ class AvailabilitySlot(TimestampMixin, db.Model):
         db.CheckConstraint("weekday BETWEEN 0 AND 6", name="ck_weekday_range"),
         db.CheckConstraint("start_time < end_time", name="ck_time_order"),
         db.Index("ix_availability_tutor_weekday", "tutor_id", "weekday"),
+        db.Index("ix_availability_week_window", "week_start", "week_end", "tutor_id"),
+        # Postgres: GiST trên int4range -> tìm slot chứa khung giờ bằng toán tử @>
+        db.Index(
+            "ix_availability_week_range_gist",
+            db.func.int4range(week_start, week_end),
+            postgresql_using="gist",
+        ).ddl_if(dialect="postgresql"),
     )
 
+
+def minute_of_week(weekday, value):
+    """Đổi (thứ, giờ trong ngày) -> số phút tính từ 00:00 thứ Hai."""
+    return weekday * 1440 + value.hour * 60 + value.minute
+
+
+@db.event.listens_for(AvailabilitySlot, "before_insert")
+@db.event.listens_for(AvailabilitySlot, "before_update")
+def _fill_week_window(mapper, connection, slot):
+    slot.week_start = minute_of_week(slot.weekday, slot.start_time)
+    slot.week_end = minute_of_week(slot.weekday, slot.end_time)
+
 # =========================
 #  BOOKING / ĐĂNG KÝ (Student đặt gia sư)
 # =========================
@@ -191,6 +266,9 @@ class Booking(TimestampMixin, db.Model):
     # số giờ đặt (VD: 1.5 giờ)
     hours = db.Column(db.Numeric(3, 1), nullable=True)
 
+    # thời điểm kết thúc = start_at + hours (lưu sẵn để kiểm tra trùng lịch bằng index)
+    end_at = db.Column(db.DateTime, nullable=True)
+
     # tổng tiền (đồng) cho booking này (hours * hourly_rate, có thể thay đổi do khuyến mãi)
     total_price = db.Column(db.Integer, nullable=True)
 
@@ -207,7 +285,26 @@ class Booking(TimestampMixin, db.Model):
     feedback = db.relationship("Feedback", back_populates="booking", uselist=False, cascade="all, delete-orphan")
 
     __table_args__ = (
-        db.Index("ix_booking_status", "status"),
+        # index riêng cho lịch đang hiệu lực (partial): nhỏ, nằm gọn trong RAM, dùng cho kiểm tra trùng
+        # giờ + tìm gia sư rảnh. Booking đã xong/hủy lâu ngày được chuyển sang bookings_archive.
+        # Không giữ thêm index đầy đủ (tutor_id, start_at): query nóng đều lọc theo status; chỉ xóa gia sư
+        # (cascade) và ratings-recompute đọc theo tutor_id không kèm status, trên bảng đã được lưu trữ bớt.
+        db.Index(
+            "ix_booking_active_tutor_start", "tutor_id", "start_at",
+            postgresql_where=db.text("status IN ('pending', 'accepted')"),
+            sqlite_where=db.text("status IN ('pending', 'accepted')"),
+        ),
+        # index cho khóa ngoại (gợi ý của flask db-advise): xóa học viên/môn không quét cả bảng
+        db.Index("ix_bookings_student_id", "student_id"),
+        db.Index("ix_bookings_subject_id", "subject_id"),
+        # Postgres: chặn 2 booking đang hiệu lực của cùng gia sư chồng giờ nhau (cần btree_gist)
+        ExcludeConstraint(
+            ("tutor_id", "="),
+            (db.func.tsrange(start_at, end_at), "&&"),
+            using="gist",
+            where=db.text("status IN ('pending', 'accepted')"),
+            name="ex_booking_no_overlap",
+        ).ddl_if(dialect="postgresql"),
     )
 
 # =========================
@@ -232,6 +329,48 @@ class Feedback(TimestampMixin, db.Model):
 
 
 
+# =========================
+#  LỊCH SỬ BOOKING (đã lưu trữ)
+# =========================
+
+class BookingArchive(db.Model):
+    """Booking completed/canceled/rejected cũ, chuyển khỏi bảng bookings bởi job bookings.archive.
+
+    Gộp luôn feedback (1-1) vào cùng dòng. Postgres: partition theo tháng của start_at
+    (partition tạo dần khi lưu trữ - xem services/archive.py). Không có FK: dữ liệu lịch sử.
+    """
+    __tablename__ = "bookings_archive"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)     # id gốc của booking
+    start_at = db.Column(db.DateTime, primary_key=True)                    # khóa partition phải nằm trong PK
+    student_id = db.Column(db.Integer, nullable=False)
+    tutor_id = db.Column(db.Integer, nullable=False)
+    subject_id = db.Column(db.Integer, nullable=False)
+    hours = db.Column(db.Numeric(3, 1), nullable=True)
+    end_at = db.Column(db.DateTime, nullable=True)
+    total_price = db.Column(db.Integer, nullable=True)
+    status = db.Column(db.Enum(BookingStatus, native_enum=False), nullable=False)
+    note = db.Column(db.String(500), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False)
+
+    # feedback của booking (nếu có)
+    feedback_id = db.Column(db.Integer, nullable=True)
+    rating = db.Column(db.Integer, nullable=True)
+    comment = db.Column(db.String(1000), nullable=True)
+
+    archived_at = db.Column(db.DateTime, server_default=db.func.now(), nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_booking_archive_tutor_start", "tutor_id", "start_at"),
+        db.Index("ix_booking_archive_student_start", "student_id", "start_at"),
+        {"postgresql_partition_by": "RANGE (start_at)"},
+    )
+
+    def __repr__(self):
+        return f"<BookingArchive {self.id} {self.status.value}>"
+
+
 # Mới thêm vào
 class User(db.Model):
     __tablename__ = "users"
@@ -253,21 +392,69 @@ class User(db.Model):
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
+    # tăng lên để thu hồi mọi token đã cấp (token mang "ver" trong claims)
+    token_version = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+
      # Quan hệ ngược để dễ query
     customer = db.relationship("Customer", back_populates="user", uselist=False)
     tutor = db.relationship("Tutor", back_populates="user", uselist=False)
 
+    __table_args__ = (
+        # index cho khóa ngoại (gợi ý của flask db-advise): ON DELETE SET NULL khi xóa customer/tutor
+        db.Index("ix_users_customer_id", "customer_id"),
+        db.Index("ix_users_tutor_id", "tutor_id"),
+    )
 
     # helper methods
     def set_password(self, raw_password: str) -> None:
-        """Hash và lưu password (dùng bcrypt)."""
-        # bcrypt.generate_password_hash trả bytes, nên decode -> str lưu vào DB
-        self.password_hash = bcrypt.generate_password_hash(raw_password).decode("utf-8")
+        """Hash và lưu password (dùng bcrypt, chạy trên pool của hasher)."""
+        self.password_hash = hasher.hash(raw_password)
 
     def check_password(self, raw_password: str) -> bool:
         """So sánh mật khẩu raw với hash lưu DB."""
-        return bcrypt.check_password_hash(self.password_hash, raw_password)
+        return hasher.check(self.password_hash, raw_password)
+
+    def password_needs_rehash(self) -> bool:
+        """Hash cũ có cost factor thấp hơn cấu hình hiện tại."""
+        return hasher.needs_rehash(self.password_hash)
 
     def to_dict(self):
-        return {"id": self.id, "email": self.email, "role": self.role, "customer_id": self.customer_id, "tutor_id": self.tutor_id}
+        return USER_SCHEMA.dump(self)
+
+# =========================
+#  JOB NỀN (hàng đợi trong DB, chạy bởi `flask worker`)
+# =========================
+
+class Job(TimestampMixin, db.Model):
+    __tablename__ = "jobs"
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)                  # tên task đã đăng ký (VD bookings.notify)
+    payload = db.Column(db.JSON, nullable=True)                       # tham số (kwargs) của task
+    status = db.Column(db.Enum(JobStatus, native_enum=False), default=JobStatus.queued, nullable=False)
+    attempts = db.Column(db.Integer, default=0, nullable=False)      # số lần đã chạy
+    max_attempts = db.Column(db.Integer, default=5, nullable=False)
+    run_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)  # chạy sớm nhất lúc (UTC)
+    locked_at = db.Column(db.DateTime, nullable=True)                # worker lấy job lúc nào
+    locked_by = db.Column(db.String(100), nullable=True)
+    dedupe_key = db.Column(db.String(200), nullable=True)            # gộp job trùng đang chờ
+    last_error = db.Column(db.Text, nullable=True)
+    result = db.Column(db.JSON, nullable=True)
+    # user xếp job qua API (chỉ user này + admin xem được GET /api/jobs/<id>); job hệ thống -> NULL
+    created_by = db.Column(
+        db.Integer, db.ForeignKey("users.id", ondelete="SET NULL", name="fk_jobs_created_by_users"), nullable=True
+    )
+
+    __table_args__ = (
+        # worker lấy job: WHERE status='queued' AND run_at <= now ORDER BY run_at
+        db.Index("ix_jobs_status_run_at", "status", "run_at"),
+        db.Index("ix_jobs_name_dedupe", "name", "dedupe_key"),
+        db.Index("ix_jobs_created_by", "created_by"),
+    )
+
+    def __repr__(self):
+        return f"<Job {self.id} {self.name} {self.status.value}>"
+
 
+# Field của user trả ra API (register/login)
+USER_SCHEMA = Schema(User, ["id", "email", "role", "customer_id", "tutor_id"])
@@ -5,4 +5,8 @@ api = Blueprint("api", __name__)
 # Import các route để gắn vào blueprint chính
 from . import customers
 from . import tutors
-from . import auth
\ No newline at end of file
+from . import auth
+from . import feedbacks
+from . import bookings
+from . import metrics
+from . import jobs
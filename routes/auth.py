@@ -1,9 +1,23 @@
 from flask import request, jsonify
-from extensions import db
+from extensions import db, hasher, jwt
 from models import User
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token
 from routes import api
-from utils.decorators import role_required
+from utils.auth_context import auth_claims, auth_required, current_auth, is_revoked, revoke_user_tokens
+from utils.db_routing import read_only
+from utils.hashing import HasherSaturated
+
+# Route dùng @jwt_required() của flask_jwt_extended cũng tôn trọng việc thu hồi token
+@jwt.token_in_blocklist_loader
+def token_revoked(jwt_header, jwt_payload):
+    return is_revoked(jwt_payload)
+
+# Pool hash mật khẩu đang quá tải -> 429 để client thử lại, không chiếm worker
+@api.errorhandler(HasherSaturated)
+def hasher_saturated(exc):
+    response = jsonify({"error": "Hệ thống đang bận, vui lòng thử lại sau"})
+    response.headers["Retry-After"] = str(exc.retry_after)
+    return response, 429
 
 # Đăng ký
 @api.route("/auth/register", methods=["POST"])
@@ -45,34 +59,57 @@ def login():
 
     if not user or not user.check_password(data["password"]):
         return jsonify({"error": "Sai email hoặc password"}), 401
+    
+    # Hash cũ có cost thấp hơn cấu hình -> hash lại bằng mật khẩu vừa nhập đúng
+    if user.password_needs_rehash():
+        user.set_password(data["password"])
+        db.session.commit()
+        hasher.record_rehash()
 
-    access_token = create_access_token(identity=user.id)
+    # PyJWT >= 2.10 bắt buộc "sub" là chuỗi
+    # Claims mang sẵn role/customer_id/tutor_id -> các route sau không cần query users
+    access_token = create_access_token(identity=str(user.id), additional_claims=auth_claims(user))
     return jsonify({
         "message": "Đăng nhập thành công",
         "access_token": access_token,
         "user": user.to_dict()
     }), 200
 
-# Lấy thông tin user hiện tại
+# Lấy thông tin user hiện tại (đọc từ claims, không query DB)
 @api.route("/auth/me", methods=["GET"])
-@jwt_required()
+@auth_required
+@read_only
 def get_current_user():
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    auth = current_auth()
+    
+    return jsonify({
+        "user": {
+            "id": auth.user_id,
+            "email": auth.email,
+            "role": auth.role,
+            "customer_id": auth.customer_id,
+            "tutor_id": auth.tutor_id
+        }
+    })
 
+# Đăng xuất: thu hồi mọi token của user (mọi thiết bị)
+@api.route("/auth/logout", methods=["POST"])
+@auth_required
+def logout():
+    user = db.session.get(User, current_auth().user_id)
     if not user:
         return jsonify({"error": "User không tồn tại"}), 404
-
-    return jsonify({
-        "user": user.to_dict()
-    })
+    
+    revoke_user_tokens(user)
+    db.session.commit()
+    
+    return jsonify({"message": "Đã đăng xuất"})
 
 # Test route protected (chỉ user đã login mới vào được)
 @api.route("/auth/protected", methods=["GET"])
-@jwt_required()
+@auth_required
 def protected():
-    current_user_id = get_jwt_identity()
     return jsonify({
         "message": "Bạn đã đăng nhập thành công!",
-        "user_id": current_user_id
+        "user_id": current_auth().user_id
     })
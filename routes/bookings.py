@@ -0,0 +1,149 @@
+# API cho Bookings (đặt lịch gia sư)
+from flask import request, jsonify
+from extensions import db
+from models import Booking, Student
+from routes import api
+from services import archive as archive_service
+from services import booking as booking_service
+from services.booking import BookingError
+from utils.auth_context import auth_required, current_auth
+
+def _booking_to_dict(booking):
+    return {
+        "id": booking.id,
+        "student_id": booking.student_id,
+        "tutor_id": booking.tutor_id,
+        "subject_id": booking.subject_id,
+        "start_at": booking.start_at.isoformat() if booking.start_at else None,
+        "end_at": booking.end_at.isoformat() if booking.end_at else None,
+        "hours": float(booking.hours) if booking.hours is not None else None,
+        "total_price": booking.total_price,
+        "status": booking.status.value,
+        "note": booking.note
+    }
+
+def _owns_student(user, student_id):
+    if user.role == "admin":
+        return True
+    student = db.session.get(Student, student_id)
+    return student is not None and user.customer_id is not None and student.customer_id == user.customer_id
+
+# ai được làm action nào: tutor của booking, customer sở hữu học viên, admin
+# (user là AuthContext lấy từ claims của token)
+def _can(user, booking, action):
+    if user.role == "admin":
+        return True
+    if action == "feedback":
+        # chỉ chủ học viên đánh giá; gia sư (kể cả gia sư của booking) không tự chấm điểm
+        if user.role == "tutor" or user.tutor_id is not None:
+            return False
+        return _owns_student(user, booking.student_id)
+    if action in ("accept", "reject", "complete"):
+        return user.tutor_id is not None and user.tutor_id == booking.tutor_id
+    if action == "cancel":
+        return (user.tutor_id is not None and user.tutor_id == booking.tutor_id) or _owns_student(user, booking.student_id)
+    return False
+
+# POST /api/bookings - Đặt lịch
+@api.route("/bookings", methods=["POST"])
+@auth_required
+def create_booking():
+    """Tạo booking (pending); 409 nếu gia sư đã có lịch trùng giờ"""
+    data = request.get_json() or {}
+
+    required_fields = ["student_id", "tutor_id", "subject_id", "start_at", "hours"]
+    if not all(field in data for field in required_fields):
+        return jsonify({
+            "error": f"Các trường bắt buộc: {', '.join(required_fields)}"
+        }), 400
+
+    user = current_auth()
+    if not _owns_student(user, data["student_id"]):
+        return jsonify({"error": "Forbidden: không phải học viên của bạn"}), 403
+
+    try:
+        booking = booking_service.create_booking(
+            student_id=data["student_id"],
+            tutor_id=data["tutor_id"],
+            subject_id=data["subject_id"],
+            start_at=booking_service.parse_start_at(data["start_at"]),
+            hours=booking_service.parse_hours(data["hours"]),
+            note=data.get("note")
+        )
+    except BookingError as exc:
+        db.session.rollback()
+        return jsonify({"error": exc.message}), exc.status
+
+    db.session.commit()
+
+    return jsonify({
+        "message": "Đặt lịch thành công, chờ gia sư xác nhận",
+        "booking": _booking_to_dict(booking)
+    }), 201
+
+# GET /api/bookings/<id> - Chi tiết booking
+@api.route("/bookings/<int:booking_id>", methods=["GET"])
+@auth_required
+def get_booking(booking_id):
+    """Xem booking (tutor của booking, chủ học viên hoặc admin)"""
+    booking = db.session.get(Booking, booking_id)
+    archived = booking is None
+    if archived:
+        # booking cũ đã chuyển sang bookings_archive (services/archive.py)
+        booking = archive_service.archived_booking(booking_id)
+        if booking is None:
+            return jsonify({"error": "Không tìm thấy booking"}), 404
+    user = current_auth()
+    if not _can(user, booking, "cancel"):
+        return jsonify({"error": "Forbidden"}), 403
+    data = _booking_to_dict(booking)
+    if archived:
+        data.update(archived=True, rating=booking.rating, comment=booking.comment)
+    return jsonify(data)
+
+def _transition(booking_id, action, message):
+    user = current_auth()
+    try:
+        booking = booking_service.get_booking_for_update(booking_id)
+        if not _can(user, booking, action):
+            db.session.rollback()
+            return jsonify({"error": "Forbidden"}), 403
+        booking_service.transition(booking, action)
+    except BookingError as exc:
+        db.session.rollback()
+        return jsonify({"error": exc.message}), exc.status
+
+    db.session.commit()
+
+    return jsonify({
+        "message": message,
+        "booking": _booking_to_dict(booking)
+    })
+
+# POST /api/bookings/<id>/accept - Gia sư nhận lịch
+@api.route("/bookings/<int:booking_id>/accept", methods=["POST"])
+@auth_required
+def accept_booking(booking_id):
+    """Gia sư nhận booking"""
+    return _transition(booking_id, "accept", "Đã nhận lịch")
+
+# POST /api/bookings/<id>/reject - Gia sư từ chối
+@api.route("/bookings/<int:booking_id>/reject", methods=["POST"])
+@auth_required
+def reject_booking(booking_id):
+    """Gia sư từ chối booking"""
+    return _transition(booking_id, "reject", "Đã từ chối lịch")
+
+# POST /api/bookings/<id>/cancel - Hủy lịch
+@api.route("/bookings/<int:booking_id>/cancel", methods=["POST"])
+@auth_required
+def cancel_booking(booking_id):
+    """Khách hoặc gia sư hủy booking"""
+    return _transition(booking_id, "cancel", "Đã hủy lịch")
+
+# POST /api/bookings/<id>/complete - Hoàn thành buổi học
+@api.route("/bookings/<int:booking_id>/complete", methods=["POST"])
+@auth_required
+def complete_booking(booking_id):
+    """Gia sư đánh dấu buổi học đã xong (sau đó khách mới đánh giá được)"""
+    return _transition(booking_id, "complete", "Buổi học đã hoàn thành")
@@ -1,27 +1,96 @@
 # API cho Customers
+from urllib.parse import urlencode
 from flask import request, jsonify
+from sqlalchemy import func, select
 from extensions import db
 from models import Customer, User
 from routes import api
+from services import dashboard, nearby
+from utils.auth_context import auth_required, current_auth
+from utils.db_routing import read_only
+from utils.http_cache import conditional_json, etag_for, to_timestamp, validators_for_rows
+from utils.pagination import InvalidCursor, keyset_page, total_for
+from utils.profiling import query_budget
+from utils.serializers import InvalidFields, Schema
+from utils.streaming import stream_rows
+
+def _format_created(value):
+    return value.strftime("%Y-%m-%d %H:%M:%S") if value else None
+
+# Danh sách mặc định không có created_at (giữ như API cũ), chi tiết trả đủ
+CUSTOMER_SCHEMA = Schema(
+    Customer,
+    ["id", "full_name", "email", "phone", "address", "created_at"],
+    formats={"created_at": _format_created},
+    default=["id", "full_name", "email", "phone", "address"],
+    always=["created_at", "id", "updated_at"],     # khóa cursor + ETag
+)
+
+# Thứ tự cho phân trang cursor: mới tạo trước
+CUSTOMER_CURSOR_KEYS = [(Customer.created_at, True), (Customer.id, True)]
 
 # Lấy danh sách customers
 @api.route("/customers", methods=["GET"])
+@read_only
+@query_budget(2)
 def get_customers():
-    """Lấy tất cả customers"""
-    customers = Customer.query.all()
+    """Lấy tất cả customers.
+
+    Có `cursor` hoặc `limit` -> phân trang keyset, trả về object thay vì list; ETag theo
+    (id, updated_at) của các dòng trong trang.
+    `?stream=1` hoặc `?format=ndjson` -> stream toàn bộ, bộ nhớ không đổi theo số dòng.
+    Không phân trang: ETag theo max(updated_at) + count, If-None-Match khớp -> 304, không serialize.
+    """
+    try:
+        fields = CUSTOMER_SCHEMA.parse_fields(request.args.get('fields'))
+    except InvalidFields as exc:
+        return jsonify({"error": str(exc)}), 400
+    
+    fmt = request.args.get('format', '')
+    if fmt == 'ndjson' or request.args.get('stream', type=int):
+        stmt = select(*CUSTOMER_SCHEMA.columns(fields, with_always=False)).order_by(Customer.id)
+        return stream_rows(stmt, fmt='ndjson' if fmt == 'ndjson' else 'json')
+    
+    key = urlencode(sorted(request.args.items(multi=True)))
+    if 'cursor' in request.args or 'limit' in request.args:
+        # trang keyset: validator lấy từ chính các dòng của trang, không quét cả bảng
+        try:
+            rows, body = _customer_page(fields)
+        except InvalidCursor:
+            return jsonify({"error": "cursor không hợp lệ"}), 400
+        etag, modified = validators_for_rows(rows, body, "customers", key)
+        return conditional_json(etag, modified, lambda: body)
+    
+    # Dump toàn bộ: đằng nào cũng quét cả bảng, 1 query tổng hợp cho phép trả 304 mà không serialize
+    last_updated, count = db.session.execute(
+        select(func.max(Customer.updated_at), func.count(Customer.id))
+    ).one()
+    etag = etag_for("customers", key, last_updated, count)
+    return conditional_json(etag, to_timestamp(last_updated), lambda: _all_customers(fields))
+
+def _all_customers(fields):
+    customers = db.session.execute(select(*CUSTOMER_SCHEMA.columns(fields))).all()
     
     # Chuyển thành list để trả về JSON
-    result = []
-    for customer in customers:
-        result.append({
-            "id": customer.id,
-            "full_name": customer.full_name,
-            "email": customer.email,
-            "phone": customer.phone,
-            "address": customer.address
-        })
+    return CUSTOMER_SCHEMA.dump_many(customers, fields)
+
+def _customer_page(fields):
+    """(rows, body) của 1 trang keyset."""
+    limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+    query = Customer.query
+    customers, next_cursor = keyset_page(
+        CUSTOMER_SCHEMA.select(query, fields), CUSTOMER_CURSOR_KEYS, request.args.get('cursor'), limit
+    )
     
-    return jsonify(result)
+    return customers, {
+        "customers": CUSTOMER_SCHEMA.dump_many(customers, fields),
+        "pagination": {
+            "limit": limit,
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None,
+            "total": total_for(query, request.args.get('total'))
+        }
+    }
 
 # Tạo customer mới
 @api.route("/customers", methods=["POST"])
@@ -42,6 +111,12 @@ def create_customer():
     if existing_customer:
         return jsonify({"error": "Email đã được sử dụng"}), 400
     
+    # Tọa độ địa chỉ (tùy chọn) - dùng cho /api/tutors/nearby?customer_id=
+    try:
+        location = nearby.location_from(data)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    
     # Tạo customer mới
     customer = Customer(
         full_name=data["full_name"],
@@ -49,6 +124,7 @@ def create_customer():
         phone=data.get("phone", ""),  # Không bắt buộc
         address=data.get("address", "")  # Không bắt buộc
     )
+    nearby.set_location(customer, location)
     
     # Lưu vào database
     db.session.add(customer)
@@ -65,19 +141,88 @@ def create_customer():
 
 # Lấy thông tin 1 customer
 @api.route("/customers/<int:customer_id>", methods=["GET"])
+@read_only
 def get_customer(customer_id):
     """Lấy thông tin chi tiết 1 customer"""
-    customer = Customer.query.get(customer_id)
+    try:
+        fields = CUSTOMER_SCHEMA.parse_fields(request.args.get('fields'), default=CUSTOMER_SCHEMA.fields)
+    except InvalidFields as exc:
+        return jsonify({"error": str(exc)}), 400
+    
+    customer = db.session.execute(
+        select(*CUSTOMER_SCHEMA.columns(fields)).where(Customer.id == customer_id)
+    ).first()
     
     # Kiểm tra customer có tồn tại không
     if not customer:
         return jsonify({"error": "Không tìm thấy khách hàng"}), 404
     
+    etag = etag_for("customer", customer_id, customer.updated_at, *fields)
+    return conditional_json(
+        etag, to_timestamp(customer.updated_at), lambda: CUSTOMER_SCHEMA.dump(customer, fields)
+    )
+
+def _dashboard_booking(booking):
+    tutor, subject, feedback = booking.tutor, booking.subject, booking.feedback
+    return {
+        "id": booking.id,
+        "start_at": booking.start_at.isoformat() if booking.start_at else None,
+        "end_at": booking.end_at.isoformat() if booking.end_at else None,
+        "hours": float(booking.hours) if booking.hours is not None else None,
+        "total_price": booking.total_price,
+        "status": booking.status.value,
+        "note": booking.note,
+        "tutor": {
+            "id": tutor.id,
+            "full_name": tutor.full_name,
+            "hourly_rate": tutor.hourly_rate,
+            "rating_avg": tutor.rating_avg,
+            "rating_count": tutor.rating_count,
+        },
+        "subject": {"id": subject.id, "code": subject.code, "name": subject.name},
+        "feedback": {"rating": feedback.rating, "comment": feedback.comment} if feedback else None,
+    }
+
+# GET /api/customers/<id>/dashboard - Khách + học viên + booking gần nhất (kèm gia sư, môn, đánh giá)
+@api.route("/customers/<int:customer_id>/dashboard", methods=["GET"])
+@auth_required
+@read_only
+@query_budget(5)      # 4 query dữ liệu + 1 khi bảng thu hồi token làm mới (30s/lần)
+def get_customer_dashboard(customer_id):
+    """Dashboard của khách (chính khách hoặc admin). ?bookings=N: số booking gần nhất mỗi học viên
+    (mặc định 5, tối đa 20). Luôn <= 4 query dù khách có bao nhiêu học viên / booking.
+    """
+    user = current_auth()
+    if user.role != "admin" and user.customer_id != customer_id:
+        return jsonify({"error": "Forbidden"}), 403
+    
+    recent = request.args.get('bookings', dashboard.RECENT_BOOKINGS_DEFAULT, type=int)
+    recent = max(1, min(recent, dashboard.RECENT_BOOKINGS_MAX))
+    customer, bookings = dashboard.load_dashboard(customer_id, recent)
+    if customer is None:
+        return jsonify({"error": "Không tìm thấy khách hàng"}), 404
+    
+    students = []
+    for student in sorted(customer.students, key=lambda s: s.id):
+        items, total = bookings[student.id]
+        students.append({
+            "id": student.id,
+            "full_name": student.full_name,
+            "birth_year": student.birth_year,
+            "grade": student.grade,
+            "gender": student.gender.value if student.gender else None,
+            "bookings": [_dashboard_booking(booking) for booking in items],
+            "bookings_total": total,
+        })
+    
     return jsonify({
-        "id": customer.id,
-        "full_name": customer.full_name,
-        "email": customer.email,
-        "phone": customer.phone,
-        "address": customer.address,
-        "created_at": customer.created_at.strftime("%Y-%m-%d %H:%M:%S") if customer.created_at else None
+        "customer": {
+            "id": customer.id,
+            "full_name": customer.full_name,
+            "email": customer.email,
+            "phone": customer.phone,
+            "address": customer.address,
+            "created_at": _format_created(customer.created_at),
+        },
+        "students": students,
     })
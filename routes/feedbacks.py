@@ -0,0 +1,41 @@
+# API cho Feedbacks (đánh giá sau buổi học)
+from flask import request, jsonify
+from extensions import db
+from models import Booking
+from routes import api
+from routes.bookings import _can
+from routes.tutors import invalidate_tutor_cache
+from services.ratings import FeedbackError, submit_feedback
+from utils.auth_context import auth_required, current_auth
+
+# POST /api/bookings/<id>/feedback - Gửi (hoặc sửa) đánh giá cho booking
+@api.route("/bookings/<int:booking_id>/feedback", methods=["POST"])
+@auth_required
+def post_feedback(booking_id):
+    """Gửi đánh giá (chủ học viên hoặc admin), điểm TB của gia sư được cập nhật ngay trong cùng transaction"""
+    booking = db.session.get(Booking, booking_id)
+    if booking is None:
+        return jsonify({"error": "Không tìm thấy booking"}), 404
+    if not _can(current_auth(), booking, "feedback"):
+        return jsonify({"error": "Forbidden: không phải học viên của bạn"}), 403
+
+    data = request.get_json() or {}
+    
+    try:
+        feedback, created = submit_feedback(booking_id, data.get("rating"), data.get("comment"))
+    except FeedbackError as exc:
+        db.session.rollback()
+        return jsonify({"error": exc.message}), exc.status
+    
+    db.session.commit()
+    invalidate_tutor_cache(booking.tutor_id)
+    
+    return jsonify({
+        "message": "Đã gửi đánh giá" if created else "Đã cập nhật đánh giá",
+        "feedback": {
+            "id": feedback.id,
+            "booking_id": feedback.booking_id,
+            "rating": feedback.rating,
+            "comment": feedback.comment
+        }
+    }), 201 if created else 200
@@ -0,0 +1,31 @@
+# API xem trạng thái job nền (VD import gia sư chạy async)
+from flask import jsonify
+from extensions import db
+from models import Job
+from routes import api
+from utils.auth_context import auth_required, current_auth
+from utils.serializers import iso
+
+# GET /api/jobs/<id> - Trạng thái + kết quả của 1 job
+@api.route("/jobs/<int:job_id>", methods=["GET"])
+@auth_required
+def get_job(job_id):
+    """Trạng thái job (queued/running/done/failed) cho người xếp job hoặc admin; không trả payload"""
+    job = db.session.get(Job, job_id)
+    user = current_auth()
+    # id tuần tự: không phân biệt "không có" với "không phải của bạn" -> không dò được job của người khác
+    if job is None or (user.role != "admin" and job.created_by != user.user_id):
+        return jsonify({"error": "Không tìm thấy job"}), 404
+    
+    return jsonify({
+        "id": job.id,
+        "name": job.name,
+        "status": job.status.value,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "run_at": iso(job.run_at),
+        "created_at": iso(job.created_at),
+        "updated_at": iso(job.updated_at),
+        "result": job.result,
+        "last_error": job.last_error
+    })
@@ -0,0 +1,21 @@
+# Số liệu vận hành (chỉ admin): hit/miss cache, độ trễ hash mật khẩu, ...
+from flask import current_app, jsonify
+from extensions import db, cache, hasher
+from routes import api
+from services import tasks
+from utils.db_pool import pool_status
+from utils.decorators import role_required
+
+# GET /api/metrics - Số liệu các tầng cache/hạ tầng
+@api.route("/metrics", methods=["GET"])
+@role_required("admin")
+def get_metrics():
+    """Trả về số liệu để đo tải DB tiết kiệm được"""
+    return jsonify({
+        "cache": cache.stats(),
+        "password_hasher": hasher.stats(),
+        "db_pool": pool_status(db.engine),
+        "db_routing": current_app.extensions["db_routing"].stats(),
+        "jobs": tasks.stats(),
+        "startup": current_app.extensions.get("startup")
+    })
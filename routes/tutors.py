@@ -1,90 +1,396 @@
 # API endpoints cho Tutors
-from flask import request, jsonify
-from extensions import db
-from models import Tutor, Subject, TutorSubject
+from datetime import date
+from urllib.parse import urlencode
+from flask import abort, current_app, request, jsonify, url_for
+from sqlalchemy import func, select
+from extensions import db, cache
+from models import Customer, Tutor, Subject, TutorSubject
 from routes import api
+from services import availability, facets, nearby, search, tasks, tutor_import
+from utils.auth_context import AuthError, auth_required, current_auth
+from utils import geo
+from utils.db_routing import read_only
+from utils.http_cache import body_digest, conditional_json, etag_for, to_timestamp, validators_for_rows
+from utils.pagination import InvalidCursor, keyset_page, total_for
+from utils.profiling import query_budget
+from utils.serializers import InvalidFields, Schema, iso
+from utils.streaming import NDJSON_MIMETYPE
+
+# Field trả ra của gia sư; ?fields=id,full_name,... để lấy bớt
+TUTOR_SCHEMA = Schema(
+    Tutor,
+    ["id", "full_name", "email", "phone", "years_experience", "hourly_rate",
+     "bio", "city", "rating_avg", "rating_count", "created_at"],
+    formats={"created_at": iso},
+    always=["rating_avg", "id", "updated_at"],     # khóa cursor + ETag
+)
+TUTOR_SUMMARY_FIELDS = ["id", "full_name", "email", "city"]
+# số id tối đa của 1 request batch (?ids= / POST /tutors/batch)
+TUTOR_BATCH_MAX = 200
+
+# Thứ tự cho phân trang cursor: điểm cao trước, cùng điểm thì id giảm dần
+TUTOR_CURSOR_KEYS = [(Tutor.rating_avg, True), (Tutor.id, True)]
+
+def invalidate_tutor_cache(tutor_id=None):
+    """Xóa cache chi tiết của 1 gia sư và vô hiệu toàn bộ cache listing.
+
+    tutor_id="*": vô hiệu cache chi tiết của mọi gia sư (VD sau khi tính lại điểm hàng loạt).
+    """
+    if tutor_id == "*":
+        cache.bump("tutor")
+    elif tutor_id is not None:
+        cache.delete("tutor", tutor_id, versioned=True)
+    cache.bump("tutors:list")
 
 # GET /api/tutors - Lấy danh sách tất cả gia sư
 @api.route("/tutors", methods=["GET"])
+@read_only
+@query_budget(4)
 def get_tutors():
-    """Lấy danh sách gia sư với filter tùy chọn"""
+    """Lấy danh sách gia sư với filter tùy chọn.
+
+    Có `cursor` (kể cả rỗng) -> phân trang keyset, ngược lại dùng page/per_page như cũ.
+    Kết quả cache theo bộ tham số, bị vô hiệu khi có ghi vào tutors.
+    Có ETag/Last-Modified: If-None-Match khớp -> 304 (cache hit thì không query).
+    `?ids=3,1,2`: trả đúng các gia sư đó theo thứ tự (kèm môn dạy), id không có nằm trong "missing".
+    """
+    # ?ids=3,1,2 -> lấy theo danh sách id (lịch sử booking, danh sách yêu thích, ...)
+    if 'ids' in request.args:
+        return _batch_response(request.args['ids'], request.args.get('fields'))
+    
+    key = urlencode(sorted(request.args.items(multi=True)))
+    try:
+        entry = cache.get_or_set("tutors:list", key, lambda: _list_tutors(key), versioned=True)
+    except InvalidCursor:
+        return jsonify({"error": "cursor không hợp lệ"}), 400
+    except InvalidFields as exc:
+        return jsonify({"error": str(exc)}), 400
+    return conditional_json(entry["etag"], entry["modified"], lambda: entry["body"])
+
+def _list_tutors(key):
+    """Entry cache: {"body": payload, "etag": ..., "modified": epoch giây}."""
     # Lấy query parameters
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 10, type=int)
     city = request.args.get('city', '')
     subject = request.args.get('subject', '')
+    q = request.args.get('q', '')
+    min_rating = request.args.get('min_rating', type=float)
+    min_rate = request.args.get('min_rate', type=int)
+    max_rate = request.args.get('max_rate', type=int)
+    sort = request.args.get('sort', '')
+    cursor_mode = 'cursor' in request.args
+    fields = TUTOR_SCHEMA.parse_fields(request.args.get('fields'))
     
     # Build query
     query = Tutor.query
     
-    # Filter theo city
+    # Filter theo city (không dấu, tiền tố, có index)
     if city:
-        query = query.filter(Tutor.city.ilike(f'%{city}%'))
+        query = search.filter_city(query, city)
     
-    # Filter theo subject (join với TutorSubject và Subject)
+    # Filter theo subject (id môn -> tutor_subjects.subject_id, không cần join)
     if subject:
-        query = query.join(TutorSubject).join(Subject).filter(
-            Subject.name.ilike(f'%{subject}%')
+        query = search.filter_subject(query, subject)
+    
+    # Filter theo điểm đánh giá (cột rating_avg đã được duy trì sẵn, có index)
+    if min_rating is not None:
+        query = query.filter(Tutor.rating_avg >= min_rating)
+    
+    # Filter theo khoảng giá [min_rate, max_rate) - khớp các bucket của /tutors/facets
+    query = search.filter_rate(query, min_rate, max_rate)
+    
+    # Tìm kiếm toàn văn: tên, thành phố, môn, bio (xếp theo độ khớp)
+    # Ở chế độ cursor hoặc sort=rating chỉ lọc, thứ tự theo rating_avg/id
+    by_rating = cursor_mode or sort == 'rating'
+    if q:
+        query = search.apply_search(query, q, ranked=not by_rating)
+    
+    if sort == 'rating' and not cursor_mode:
+        query = query.order_by(Tutor.rating_avg.desc(), Tutor.id.desc())
+    
+    # Chỉ select các cột cần trả (Row, không tạo object Tutor)
+    rows = TUTOR_SCHEMA.select(query, fields)
+    
+    if cursor_mode:
+        per_page = max(1, min(per_page, 100))
+        tutors, next_cursor = keyset_page(
+            rows, TUTOR_CURSOR_KEYS, request.args.get('cursor'), per_page
         )
+        
+        pagination = {
+            "per_page": per_page,
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None,
+            # ?total=exact|approx mới đếm (có cache), mặc định không đếm
+            "total": total_for(query, request.args.get('total'))
+        }
+        return _list_entry(key, tutors, fields, pagination)
     
     # Pagination
-    tutors_paginated = query.paginate(
+    tutors_paginated = rows.paginate(
         page=page, per_page=per_page, error_out=False
     )
     
-    # Serialize data
-    tutors_data = []
-    for tutor in tutors_paginated.items:
-        tutors_data.append({
-            "id": tutor.id,
-            "full_name": tutor.full_name,
-            "email": tutor.email,
-            "phone": tutor.phone,
-            "years_experience": tutor.years_experience,
-            "hourly_rate": tutor.hourly_rate,
-            "bio": tutor.bio,
-            "city": tutor.city,
-            "rating_avg": tutor.rating_avg,
-            "rating_count": tutor.rating_count,
-            "created_at": tutor.created_at.isoformat() if tutor.created_at else None
-        })
+    pagination = {
+        "page": tutors_paginated.page,
+        "pages": tutors_paginated.pages,
+        "per_page": tutors_paginated.per_page,
+        "total": tutors_paginated.total
+    }
+    return _list_entry(key, tutors_paginated.items, fields, pagination)
+
+def _list_entry(key, rows, fields, pagination):
+    # ETag theo (id, updated_at) từng dòng trong trang + tham số + phân trang
+    body = {"tutors": TUTOR_SCHEMA.dump_many(rows, fields), "pagination": pagination}
+    etag, modified = validators_for_rows(rows, body, "tutors", key)
+    return {"body": body, "etag": etag, "modified": modified}
+
+# GET /api/tutors/facets - Số gia sư theo môn / thành phố / khoảng giá / mức điểm
+@api.route("/tutors/facets", methods=["GET"])
+@read_only
+@query_budget(3)
+def get_tutor_facets():
+    """Đếm cho các lựa chọn filter, nhận cùng filter với GET /api/tutors (city, subject, q, ...).
+
+    1 query UNION ALL, cache cùng namespace listing (vô hiệu khi gia sư thay đổi).
+    """
+    filters = {
+        "city": request.args.get('city', ''),
+        "subject": request.args.get('subject', ''),
+        "q": request.args.get('q', ''),
+        "min_rating": request.args.get('min_rating', type=float),
+        "min_rate": request.args.get('min_rate', type=int),
+        "max_rate": request.args.get('max_rate', type=int),
+    }
+    key = "facets:" + urlencode(sorted((k, v) for k, v in filters.items() if v not in (None, '')))
+    entry = cache.get_or_set("tutors:list", key, lambda: _facet_entry(key, filters), versioned=True)
+    return conditional_json(entry["etag"], None, lambda: entry["body"])
+
+def _facet_entry(key, filters):
+    body = facets.facet_counts(filters)
+    return {"body": body, "etag": etag_for(key, body_digest(body))}
+
+# GET /api/tutors/nearby - Gia sư trong bán kính N km, gần nhất trước
+@api.route("/tutors/nearby", methods=["GET"])
+@read_only
+@query_budget(3)
+def get_nearby_tutors():
+    """Tâm: ?lat=21.03&lon=105.85 hoặc ?customer_id=3 (tọa độ đã lưu của khách, cần token của khách/admin).
+
+    ?radius_km= (mặc định 5, tối đa 50), lọc thêm subject, ?fields=, ?limit= (tối đa 100).
+    """
+    try:
+        fields = TUTOR_SCHEMA.parse_fields(request.args.get('fields'), default=TUTOR_SUMMARY_FIELDS + ["rating_avg"])
+        radius_km = float(request.args.get('radius_km', 5))
+        if not 0 < radius_km <= nearby.MAX_RADIUS_KM:
+            raise ValueError(f"radius_km phải trong (0, {nearby.MAX_RADIUS_KM}]")
+        customer_id = request.args.get('customer_id', type=int)
+        if customer_id is None:
+            lat, lon = geo.parse_point(request.args.get('lat'), request.args.get('lon'))
+    except ValueError as exc:       # gồm cả InvalidFields
+        return jsonify({"error": str(exc)}), 400
+    
+    if customer_id is not None:
+        try:
+            user = current_auth()
+        except AuthError as exc:
+            return jsonify({"error": exc.message}), exc.status
+        if user.role != "admin" and user.customer_id != customer_id:
+            return jsonify({"error": "Forbidden"}), 403
+        customer = db.session.execute(
+            select(Customer.latitude, Customer.longitude).where(Customer.id == customer_id)
+        ).first()
+        if customer is None:
+            return jsonify({"error": "Không tìm thấy khách hàng"}), 404
+        if customer.latitude is None or customer.longitude is None:
+            return jsonify({"error": "Khách hàng chưa có tọa độ"}), 409
+        lat, lon = customer.latitude, customer.longitude
+    
+    query = nearby.filter_nearby(Tutor.query, lat, lon, radius_km)
+    if request.args.get('subject'):
+        query = search.filter_subject(query, request.args['subject'])
+    rows = query.with_entities(*TUTOR_SCHEMA.columns(fields), Tutor.latitude, Tutor.longitude).all()
+    
+    limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+    tutors = []
+    for row, distance in nearby.nearest(rows, lat, lon, radius_km, limit):
+        item = TUTOR_SCHEMA.dump(row, fields)
+        item["distance_km"] = round(distance, 2)
+        tutors.append(item)
+    
+    return jsonify({
+        "tutors": tutors,
+        "center": {"latitude": lat, "longitude": lon},
+        "radius_km": radius_km
+    })
+
+# GET /api/tutors/available - Gia sư rảnh trong 1 khung giờ
+@api.route("/tutors/available", methods=["GET"])
+@read_only
+def get_available_tutors():
+    """Tìm gia sư rảnh: ?weekday=1&start=18:00&end=20:00 (hoặc ?date=2026-10-20&...).
+
+    Lọc thêm được theo subject, city, q; phân trang cursor theo rating_avg/id.
+    """
+    try:
+        start = availability.parse_time(request.args.get('start'))
+        end = availability.parse_time(request.args.get('end'))
+        on_date = request.args.get('date')
+        on_date = date.fromisoformat(on_date) if on_date else None
+        weekday = request.args.get('weekday', type=int)
+        if on_date is None and (weekday is None or not 0 <= weekday <= 6):
+            raise ValueError("cần weekday (0-6) hoặc date")
+        
+        query = availability.filter_available(Tutor.query, weekday, start, end, on_date)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    
+    if request.args.get('city'):
+        query = search.filter_city(query, request.args['city'])
+    if request.args.get('subject'):
+        query = search.filter_subject(query, request.args['subject'])
+    if request.args.get('q'):
+        query = search.apply_search(query, request.args['q'], ranked=False)
+    
+    per_page = max(1, min(request.args.get('per_page', 20, type=int), 100))
+    try:
+        fields = TUTOR_SCHEMA.parse_fields(request.args.get('fields'))
+        tutors, next_cursor = keyset_page(
+            TUTOR_SCHEMA.select(query, fields), TUTOR_CURSOR_KEYS, request.args.get('cursor'), per_page
+        )
+    except InvalidCursor:
+        return jsonify({"error": "cursor không hợp lệ"}), 400
+    except InvalidFields as exc:
+        return jsonify({"error": str(exc)}), 400
     
     return jsonify({
-        "tutors": tutors_data,
+        "tutors": TUTOR_SCHEMA.dump_many(tutors, fields),
         "pagination": {
-            "page": tutors_paginated.page,
-            "pages": tutors_paginated.pages,
-            "per_page": tutors_paginated.per_page,
-            "total": tutors_paginated.total
+            "per_page": per_page,
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None
         }
     })
 
 # GET /api/tutors/<id> - Lấy chi tiết 1 gia sư
 @api.route("/tutors/<int:tutor_id>", methods=["GET"])
+@read_only
+@query_budget(2)
 def get_tutor(tutor_id):
-    """Lấy thông tin chi tiết của 1 gia sư"""
-    tutor = Tutor.query.get_or_404(tutor_id)
+    """Lấy thông tin chi tiết của 1 gia sư (có cache, xóa khi gia sư thay đổi).
+
+    ETag/Last-Modified theo updated_at, lưu sẵn trong cache -> 304 không cần query.
+    """
+    try:
+        fields = TUTOR_SCHEMA.parse_fields(
+            request.args.get('fields'), default=TUTOR_SCHEMA.fields + ["subjects"], extra=["subjects"]
+        )
+    except InvalidFields as exc:
+        return jsonify({"error": str(exc)}), 400
     
-    # Lấy danh sách môn dạy
-    subjects = db.session.query(Subject).join(TutorSubject).filter(
-        TutorSubject.tutor_id == tutor_id
+    entry = cache.get_or_set("tutor", tutor_id, lambda: _load_tutor(tutor_id), versioned=True)
+    etag = entry["etag"]
+    if request.args.get('fields'):
+        etag = etag_for(etag, *fields)
+    tutor = entry["tutor"]
+    return conditional_json(etag, entry["modified"], lambda: {name: tutor[name] for name in fields})
+
+def _load_tutor(tutor_id):
+    """Entry cache: {"tutor": dict, "etag": ..., "modified": epoch giây}."""
+    entry = _load_tutors([tutor_id]).get(tutor_id)
+    if entry is None:
+        abort(404)
+    return entry
+
+def _load_tutors(tutor_ids):
+    """Entry cache cho nhiều gia sư: {id: entry}, id không tồn tại thì không có trong kết quả.
+
+    Luôn 2 query dù bao nhiêu id: tutors WHERE id IN (...) + môn dạy WHERE tutor_id IN (...).
+    """
+    # Core row, chỉ các cột trong schema
+    rows = db.session.execute(
+        select(*TUTOR_SCHEMA.columns()).where(Tutor.id.in_(tutor_ids))
     ).all()
+    if not rows:
+        return {}
     
-    return jsonify({
-        "id": tutor.id,
-        "full_name": tutor.full_name,
-        "email": tutor.email,
-        "phone": tutor.phone,
-        "years_experience": tutor.years_experience,
-        "hourly_rate": tutor.hourly_rate,
-        "bio": tutor.bio,
-        "city": tutor.city,
-        "rating_avg": tutor.rating_avg,
-        "rating_count": tutor.rating_count,
-        "subjects": [{"id": s.id, "name": s.name, "code": s.code} for s in subjects],
-        "created_at": tutor.created_at.isoformat() if tutor.created_at else None
+    # Lấy danh sách môn dạy của cả lô
+    subjects = {row.id: [] for row in rows}
+    for link in db.session.execute(
+        select(TutorSubject.tutor_id, Subject.id, Subject.name, Subject.code)
+        .join(TutorSubject, TutorSubject.subject_id == Subject.id)
+        .where(TutorSubject.tutor_id.in_(list(subjects)))
+        .order_by(TutorSubject.tutor_id, Subject.id)
+    ):
+        subjects[link.tutor_id].append({"id": link.id, "name": link.name, "code": link.code})
+    
+    entries = {}
+    for row in rows:
+        tutor = TUTOR_SCHEMA.dump(row, TUTOR_SCHEMA.fields)
+        tutor["subjects"] = subjects[row.id]
+        entries[row.id] = {
+            "tutor": tutor,
+            "etag": etag_for("tutor", row.id, row.updated_at, body_digest(tutor)),
+            "modified": to_timestamp(row.updated_at),
+        }
+    return entries
+
+def _parse_ids(raw):
+    """"3,1,3" hoặc [3, 1, 3] -> [3, 1] (giữ thứ tự, bỏ trùng). Lỗi -> ValueError."""
+    if isinstance(raw, str):
+        raw = [part for part in raw.split(",") if part.strip()]
+    if not isinstance(raw, list) or not raw:
+        raise ValueError("ids phải là danh sách id gia sư")
+    # kiểm độ dài trước khi duyệt: danh sách khổng lồ bị từ chối ngay, không tốn CPU của worker
+    if len(raw) > TUTOR_BATCH_MAX:
+        raise ValueError(f"tối đa {TUTOR_BATCH_MAX} id mỗi lần")
+    ids = {}
+    for value in raw:
+        if isinstance(value, bool):
+            raise ValueError("ids chỉ gồm số nguyên dương")
+        try:
+            tutor_id = int(value)
+        except (TypeError, ValueError):
+            raise ValueError("ids chỉ gồm số nguyên dương")
+        if tutor_id <= 0:
+            raise ValueError("ids chỉ gồm số nguyên dương")
+        ids[tutor_id] = None
+    return list(ids)
+
+def _batch_response(raw_ids, raw_fields):
+    """Nhiều gia sư kèm môn dạy, đúng thứ tự ids; id không có -> "missing" thay vì 404.
+
+    Lấy từ cache chi tiết (1 lần đọc), id chưa có trong cache nạp chung 2 query.
+    """
+    try:
+        ids = _parse_ids(raw_ids)
+        fields = TUTOR_SCHEMA.parse_fields(
+            raw_fields, default=TUTOR_SCHEMA.fields + ["subjects"], extra=["subjects"]
+        )
+    except ValueError as exc:       # gồm cả InvalidFields
+        return jsonify({"error": str(exc)}), 400
+    
+    entries = cache.get_or_set_many("tutor", ids, _load_tutors, versioned=True)
+    found = [entries[tutor_id] for tutor_id in ids if tutor_id in entries]
+    missing = [tutor_id for tutor_id in ids if tutor_id not in entries]
+    
+    etag = etag_for("tutors:batch", *fields, *missing, *[entry["etag"] for entry in found])
+    modified = max((entry["modified"] for entry in found if entry["modified"] is not None), default=None)
+    return conditional_json(etag, modified, lambda: {
+        "tutors": [{name: entry["tutor"][name] for name in fields} for entry in found],
+        "missing": missing
     })
 
+# POST /api/tutors/batch - Lấy nhiều gia sư theo danh sách id (body JSON)
+@api.route("/tutors/batch", methods=["POST"])
+@read_only
+@query_budget(2)
+def get_tutors_batch():
+    """Body: {"ids": [3, 1, 2], "fields": "id,full_name,subjects"} - như GET /api/tutors?ids=3,1,2"""
+    data = request.get_json(silent=True) or {}
+    return _batch_response(data.get("ids"), data.get("fields") or request.args.get('fields'))
+
 # POST /api/tutors - Tạo gia sư mới
 @api.route("/tutors", methods=["POST"])
 def create_tutor():
@@ -98,34 +404,78 @@ def create_tutor():
             "error": f"Các trường bắt buộc: {', '.join(required_fields)}"
         }), 400
     
-    # Check email unique
-    if Tutor.query.filter_by(email=data["email"]).first():
+    # Check email unique (không phân biệt hoa thường, lưu chữ thường như import)
+    email = tutor_import.normalize_email(data["email"])
+    if _email_taken(email):
         return jsonify({"error": "Email đã được sử dụng"}), 400
     
+    # Tọa độ (tùy chọn) -> latitude/longitude + geohash
+    try:
+        location = nearby.location_from(data)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    
     # Create tutor
     tutor = Tutor(
         full_name=data["full_name"],
-        email=data["email"],
+        email=email,
         phone=data.get("phone"),
         years_experience=data["years_experience"],
         hourly_rate=data.get("hourly_rate", 0),
         bio=data.get("bio"),
         city=data["city"]
     )
+    nearby.set_location(tutor, location)
     
     db.session.add(tutor)
+    db.session.flush()
+    search.refresh_document(tutor, subject_names=[])
     db.session.commit()
+    invalidate_tutor_cache()
     
     return jsonify({
         "message": "Tạo gia sư thành công",
-        "tutor": {
-            "id": tutor.id,
-            "full_name": tutor.full_name,
-            "email": tutor.email,
-            "city": tutor.city
-        }
+        "tutor": TUTOR_SCHEMA.dump(tutor, TUTOR_SUMMARY_FIELDS)
     }), 201
 
+def _email_taken(email, exclude_id=None):
+    """Email (đã chuẩn hóa) đã thuộc gia sư khác chưa - so theo lower(email), có index."""
+    query = select(Tutor.id).where(func.lower(Tutor.email) == email)
+    if exclude_id is not None:
+        query = query.where(Tutor.id != exclude_id)
+    return db.session.scalar(query.limit(1)) is not None
+
+# POST /api/tutors/import - Import nhiều gia sư (JSON array hoặc NDJSON)
+@api.route("/tutors/import", methods=["POST"])
+@auth_required
+def import_tutors():
+    """Import hàng loạt, trả về báo cáo lỗi từng dòng.
+
+    `?async=1` hoặc nhiều hơn TUTOR_IMPORT_SYNC_LIMIT dòng -> xếp job nền, trả 202 + job_id
+    (báo cáo xem ở GET /api/jobs/<id>, chỉ người import hoặc admin).
+    """
+    if request.mimetype == NDJSON_MIMETYPE:
+        rows = list(tutor_import.read_ndjson(request.get_data(as_text=True)))
+    else:
+        rows = request.get_json(silent=True)
+        if not isinstance(rows, list):
+            return jsonify({"error": "Body phải là mảng JSON hoặc NDJSON"}), 400
+    
+    if request.args.get('async', type=int) or len(rows) > current_app.config["TUTOR_IMPORT_SYNC_LIMIT"]:
+        job = tasks.enqueue("tutors.import", {"rows": rows}, created_by=current_auth().user_id)
+        db.session.commit()
+        return jsonify({
+            "message": f"Đã xếp hàng import {len(rows)} dòng",
+            "job_id": job.id,
+            "status_url": url_for("api.get_job", job_id=job.id)
+        }), 202
+    
+    report = tutor_import.import_tutors(rows)
+    if report.created:
+        invalidate_tutor_cache()
+    
+    return jsonify(report.to_dict()), 201 if report.created else 400
+
 # PUT /api/tutors/<id> - Cập nhật gia sư
 @api.route("/tutors/<int:tutor_id>", methods=["PUT"])
 def update_tutor(tutor_id):
@@ -133,6 +483,11 @@ def update_tutor(tutor_id):
     tutor = Tutor.query.get_or_404(tutor_id)
     data = request.get_json() or {}
     
+    try:
+        nearby.set_location(tutor, nearby.location_from(data))
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    
     # Update fields
     updatable_fields = ["full_name", "phone", "years_experience", "hourly_rate", "bio", "city"]
     for field in updatable_fields:
@@ -140,21 +495,20 @@ def update_tutor(tutor_id):
             setattr(tutor, field, data[field])
     
     # Check email unique (nếu có thay đổi email)
-    if "email" in data and data["email"] != tutor.email:
-        if Tutor.query.filter_by(email=data["email"]).first():
-            return jsonify({"error": "Email đã được sử dụng"}), 400
-        tutor.email = data["email"]
+    if "email" in data:
+        email = tutor_import.normalize_email(data["email"])
+        if email != tutor.email:
+            if _email_taken(email, exclude_id=tutor.id):
+                return jsonify({"error": "Email đã được sử dụng"}), 400
+            tutor.email = email
     
+    search.refresh_document(tutor)
     db.session.commit()
+    invalidate_tutor_cache(tutor_id)
     
     return jsonify({
         "message": "Cập nhật gia sư thành công",
-        "tutor": {
-            "id": tutor.id,
-            "full_name": tutor.full_name,
-            "email": tutor.email,
-            "city": tutor.city
-        }
+        "tutor": TUTOR_SCHEMA.dump(tutor, TUTOR_SUMMARY_FIELDS)
     })
 
 # DELETE /api/tutors/<id> - Xóa gia sư
@@ -165,11 +519,14 @@ def delete_tutor(tutor_id):
     
     db.session.delete(tutor)
     db.session.commit()
+    search.forget_document(tutor_id)
+    invalidate_tutor_cache(tutor_id)
     
     return jsonify({"message": "Xóa gia sư thành công"})
 
 # POST /api/tutors/<id>/subjects - Thêm môn dạy cho gia sư
 @api.route("/tutors/<int:tutor_id>/subjects", methods=["POST"])
+@query_budget(8)
 def add_tutor_subject(tutor_id):
     """Thêm môn dạy cho gia sư"""
     tutor = Tutor.query.get_or_404(tutor_id)
@@ -192,7 +549,11 @@ def add_tutor_subject(tutor_id):
     # Add subject
     tutor_subject = TutorSubject(tutor_id=tutor_id, subject_id=subject_id)
     db.session.add(tutor_subject)
+    db.session.flush()
+    db.session.expire(tutor, ["subjects"])
+    search.refresh_document(tutor)
     db.session.commit()
+    invalidate_tutor_cache(tutor_id)
     
     return jsonify({
         "message": f"Đã thêm môn {subject.name} cho gia sư {tutor.full_name}"
@@ -0,0 +1,115 @@
+# services/archive.py
+# Chuyển booking đã kết thúc lâu (completed/canceled/rejected, end_at < now - N ngày) sang
+# bookings_archive để bảng bookings chỉ còn lịch "nóng" (pending/accepted, gần hiện tại).
+# - Mỗi lô: INSERT ... SELECT (kèm feedback) vào archive rồi DELETE khỏi bookings, cùng 1 transaction
+# - Postgres: bookings_archive partition theo tháng start_at, partition được tạo trước khi chèn
+# - Chạy bằng job "bookings.archive" (tự hẹn lần sau) hoặc CLI `flask bookings-archive`
+import logging
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, insert, select
+
+from extensions import db
+from models import Booking, BookingArchive, BookingStatus, Feedback
+from services.tasks import enqueue, task
+
+logger = logging.getLogger("archive")
+
+ARCHIVABLE_STATUSES = (BookingStatus.completed, BookingStatus.canceled, BookingStatus.rejected)
+
+
+def _month_start(value):
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(value):
+    return (value.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def ensure_partitions(months):
+    """Tạo partition tháng (Postgres) cho các tháng sắp chèn, VD bookings_archive_2026_01."""
+    if db.engine.dialect.name != "postgresql":
+        return
+    for month in sorted(set(months)):
+        db.session.execute(db.text(
+            f"CREATE TABLE IF NOT EXISTS bookings_archive_{month:%Y_%m} "
+            f"PARTITION OF bookings_archive "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{_next_month(month):%Y-%m-%d}')"
+        ))
+
+
+def archive_bookings(older_than_days=None, batch_size=1000):
+    """Lưu trữ theo lô (transaction ngắn). Trả về số booking đã chuyển."""
+    if older_than_days is None:
+        older_than_days = current_app.config["BOOKINGS_ARCHIVE_AFTER_DAYS"]
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    columns = [
+        Booking.id, Booking.start_at, Booking.student_id, Booking.tutor_id, Booking.subject_id,
+        Booking.hours, Booking.end_at, Booking.total_price, Booking.status, Booking.note,
+        Booking.created_at, Booking.updated_at,
+        Feedback.id, Feedback.rating, Feedback.comment,
+    ]
+    targets = [
+        "id", "start_at", "student_id", "tutor_id", "subject_id",
+        "hours", "end_at", "total_price", "status", "note",
+        "created_at", "updated_at",
+        "feedback_id", "rating", "comment",
+    ]
+
+    moved = 0
+    while True:
+        batch = db.session.execute(
+            select(Booking.id, Booking.start_at)
+            .where(Booking.status.in_(ARCHIVABLE_STATUSES), Booking.end_at < cutoff)
+            .order_by(Booking.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not batch:
+            break
+        ids = [row.id for row in batch]
+        ensure_partitions(_month_start(row.start_at) for row in batch)
+
+        source = (
+            select(*columns)
+            .outerjoin(Feedback, Feedback.booking_id == Booking.id)
+            .where(Booking.id.in_(ids))
+        )
+        db.session.execute(insert(BookingArchive).from_select(targets, source))
+        # SQLite không bật FK cascade -> xóa feedback tường minh trước
+        db.session.execute(delete(Feedback).where(Feedback.booking_id.in_(ids)))
+        db.session.execute(delete(Booking).where(Booking.id.in_(ids)))
+        db.session.commit()
+        moved += len(ids)
+    if moved:
+        logger.info("Đã lưu trữ %d booking kết thúc trước %s", moved, cutoff)
+    return moved
+
+
+@task("bookings.archive")
+def archive_job(older_than_days=None, repeat_hours=None):
+    """Job lưu trữ; repeat_hours -> tự xếp lần chạy tiếp theo (chạy định kỳ không cần cron)."""
+    moved = archive_bookings(older_than_days)
+    if repeat_hours:
+        schedule(repeat_hours, older_than_days)
+        db.session.commit()
+    return {"archived": moved}
+
+
+def schedule(repeat_hours=24, older_than_days=None, delay=None):
+    """Xếp job lưu trữ định kỳ (chỉ 1 job đang chờ nhờ dedupe_key). Caller commit.
+
+    delay: giây tới lần chạy đầu (mặc định repeat_hours).
+    """
+    return enqueue(
+        "bookings.archive",
+        {"older_than_days": older_than_days, "repeat_hours": repeat_hours},
+        delay=repeat_hours * 3600 if delay is None else delay,
+        dedupe_key="periodic",
+    )
+
+
+def archived_booking(booking_id):
+    """Booking đã lưu trữ (để GET /api/bookings/<id> vẫn xem được lịch sử)."""
+    return db.session.scalar(select(BookingArchive).where(BookingArchive.id == booking_id).limit(1))
@@ -0,0 +1,66 @@
+# services/availability.py
+# Tìm gia sư rảnh trong 1 khung giờ của tuần (VD thứ Ba 18:00-20:00), trong 1 câu SQL:
+# - slot rảnh phải chứa trọn khung giờ (week_start <= s AND week_end >= e)
+# - nếu có ngày cụ thể: loại gia sư đã có booking accepted chồng lấn khung giờ đó
+from datetime import datetime
+
+from sqlalchemy import exists, func
+
+from extensions import db
+from models import AvailabilitySlot, Booking, BookingStatus, Tutor, minute_of_week
+
+
+def parse_time(value):
+    """'18:00' / '18:00:00' -> time. Sai định dạng -> ValueError."""
+    for fmt in ("%H:%M", "%H:%M:%S"):
+        try:
+            return datetime.strptime(value, fmt).time()
+        except (TypeError, ValueError):
+            continue
+    raise ValueError(f"giờ không hợp lệ: {value}")
+
+
+def _covering_slot(weekday, start, end):
+    week_start = minute_of_week(weekday, start)
+    week_end = minute_of_week(weekday, end)
+    conditions = [AvailabilitySlot.tutor_id == Tutor.id]
+    if db.engine.dialect.name == "postgresql":
+        # dùng GiST index ix_availability_week_range_gist
+        conditions.append(
+            func.int4range(AvailabilitySlot.week_start, AvailabilitySlot.week_end)
+            .op("@>")(func.int4range(week_start, week_end))
+        )
+    else:
+        # slot không vắt qua ngày -> chỉ quét các slot bắt đầu trong cùng ngày, trước giờ s
+        conditions += [
+            AvailabilitySlot.week_start.between(weekday * 1440, week_start),
+            AvailabilitySlot.week_end >= week_end,
+        ]
+    return exists().where(*conditions)
+
+
+def _busy_booking(window_start, window_end):
+    return exists().where(
+        Booking.tutor_id == Tutor.id,
+        Booking.status == BookingStatus.accepted,
+        Booking.start_at < window_end,
+        Booking.end_at > window_start,
+    )
+
+
+def filter_available(query, weekday, start, end, on_date=None):
+    """Thêm điều kiện "rảnh" vào query Tutor.
+
+    weekday: 0=Mon..6=Sun; start/end: time; on_date: date (tùy chọn) để loại lịch đã nhận.
+    """
+    if start >= end:
+        raise ValueError("giờ bắt đầu phải trước giờ kết thúc")
+    if on_date is not None:
+        weekday = on_date.weekday()
+
+    query = query.filter(_covering_slot(weekday, start, end))
+    if on_date is not None:
+        query = query.filter(~_busy_booking(
+            datetime.combine(on_date, start), datetime.combine(on_date, end)
+        ))
+    return query
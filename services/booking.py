@@ -0,0 +1,166 @@
+# services/booking.py
+# Đặt lịch gia sư, không bao giờ trùng giờ kể cả khi nhiều request đồng thời:
+# 1. Khóa dòng tutors của đúng gia sư đó (SELECT ... FOR UPDATE) -> chỉ các booking
+#    của cùng 1 gia sư chạy tuần tự, gia sư khác không bị ảnh hưởng.
+# 2. Kiểm tra chồng lấn với booking pending/accepted (partial index ix_booking_active_tutor_start).
+# 3. Postgres còn có EXCLUDE constraint (btree_gist) chặn ở tầng DB nếu bước 1-2 bị bỏ qua.
+# Thông báo cho gia sư/khách (đặt mới, đổi trạng thái) gửi qua job nền "bookings.notify".
+import logging
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import exists, select, update
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models import Booking, BookingStatus, Student, Tutor, TutorSubject
+from services.tasks import enqueue, task
+
+notify_logger = logging.getLogger("notifications")
+
+# các trạng thái đang "giữ chỗ" trên lịch gia sư
+ACTIVE_STATUSES = (BookingStatus.pending, BookingStatus.accepted)
+
+# action -> (trạng thái hợp lệ hiện tại, trạng thái mới)
+TRANSITIONS = {
+    "accept": ((BookingStatus.pending,), BookingStatus.accepted),
+    "reject": ((BookingStatus.pending,), BookingStatus.rejected),
+    "cancel": ((BookingStatus.pending, BookingStatus.accepted), BookingStatus.canceled),
+    "complete": ((BookingStatus.accepted,), BookingStatus.completed),
+}
+
+MAX_HOURS = Decimal("12")
+
+
+class BookingError(Exception):
+    """Lỗi nghiệp vụ khi đặt/đổi trạng thái booking (kèm HTTP status)."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def parse_start_at(value):
+    """ISO 8601 -> datetime (naive, UTC nếu client gửi kèm múi giờ)."""
+    try:
+        start_at = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise BookingError("start_at phải có dạng ISO 8601 (VD 2026-10-20T18:00)")
+    if start_at.tzinfo is not None:
+        start_at = start_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return start_at
+
+
+def parse_hours(value):
+    try:
+        hours = Decimal(str(value)).quantize(Decimal("0.1"))
+    except (InvalidOperation, TypeError, ValueError):
+        raise BookingError("hours phải là số (VD 1.5)")
+    if not Decimal("0") < hours <= MAX_HOURS:
+        raise BookingError(f"hours phải trong khoảng (0, {MAX_HOURS}]")
+    return hours
+
+
+def _overlapping(tutor_id, start_at, end_at):
+    return db.session.scalar(select(exists().where(
+        Booking.tutor_id == tutor_id,
+        Booking.status.in_(ACTIVE_STATUSES),
+        Booking.start_at < end_at,
+        Booking.end_at > start_at,
+    )))
+
+
+def _flush_or_conflict():
+    try:
+        db.session.flush()
+    except IntegrityError:
+        # Postgres: vi phạm EXCLUDE constraint ex_booking_no_overlap
+        db.session.rollback()
+        raise BookingError("Gia sư đã có lịch trong khung giờ này", 409)
+
+
+def _lock_tutor(tutor_id):
+    if db.engine.dialect.name == "sqlite":
+        # SQLite bỏ qua FOR UPDATE: ghi "giả" để lấy write lock trước khi kiểm tra trùng lịch
+        # (gán lại chính updated_at để onupdate không đổi thời điểm sửa của gia sư)
+        db.session.execute(
+            update(Tutor).where(Tutor.id == tutor_id).values(updated_at=Tutor.updated_at)
+        )
+    return db.session.execute(
+        select(Tutor).where(Tutor.id == tutor_id).with_for_update()
+    ).scalar_one_or_none()
+
+
+def create_booking(student_id, tutor_id, subject_id, start_at, hours, note=None):
+    """Tạo booking pending (+ job thông báo). Caller commit."""
+    end_at = start_at + timedelta(hours=float(hours))
+
+    # khóa dòng gia sư: các request đặt cùng gia sư xếp hàng tại đây
+    tutor = _lock_tutor(tutor_id)
+    if tutor is None:
+        raise BookingError("Không tìm thấy gia sư", 404)
+    if db.session.get(Student, student_id) is None:
+        raise BookingError("Không tìm thấy học viên", 404)
+    if db.session.get(TutorSubject, (tutor_id, subject_id)) is None:
+        raise BookingError("Gia sư không dạy môn này")
+
+    if _overlapping(tutor_id, start_at, end_at):
+        raise BookingError("Gia sư đã có lịch trong khung giờ này", 409)
+
+    booking = Booking(
+        student_id=student_id,
+        tutor_id=tutor_id,
+        subject_id=subject_id,
+        start_at=start_at,
+        hours=hours,
+        end_at=end_at,
+        total_price=int(hours * tutor.hourly_rate) if tutor.hourly_rate is not None else None,
+        status=BookingStatus.pending,
+        note=note,
+    )
+    db.session.add(booking)
+    _flush_or_conflict()
+    notify_later(booking, "created")
+    return booking
+
+
+def get_booking_for_update(booking_id):
+    booking = db.session.execute(
+        select(Booking).where(Booking.id == booking_id).with_for_update()
+    ).scalar_one_or_none()
+    if booking is None:
+        raise BookingError("Không tìm thấy booking", 404)
+    return booking
+
+
+def transition(booking, action):
+    """Đổi trạng thái theo action (accept/reject/cancel/complete). Caller commit."""
+    allowed_from, new_status = TRANSITIONS[action]
+    if booking.status not in allowed_from:
+        raise BookingError(
+            f"Không thể {action} booking đang ở trạng thái {booking.status.value}", 409
+        )
+    booking.status = new_status
+    _flush_or_conflict()
+    notify_later(booking, action)
+    return booking
+
+
+def notify_later(booking, event):
+    """Xếp job thông báo cho booking (caller commit cùng thay đổi). event: created/accept/reject/..."""
+    return enqueue("bookings.notify", {"booking_id": booking.id, "event": event, "status": booking.status.value})
+
+
+@task("bookings.notify")
+def send_booking_notification(booking_id, event, status):
+    """Gửi thông báo booking. Chưa tích hợp email/SMS -> ghi log "notifications".
+
+    status: trạng thái lúc xếp job (booking có thể đã đổi tiếp khi worker chạy).
+    """
+    booking = db.session.get(Booking, booking_id)
+    if booking is None:
+        return {"skipped": "booking không còn tồn tại"}
+    recipients = {"tutor_id": booking.tutor_id, "student_id": booking.student_id}
+    notify_logger.info("booking %s: %s (trạng thái %s) -> %s", booking.id, event, status, recipients)
+    return {"event": event, "status": status, **recipients}
@@ -0,0 +1,63 @@
+# services/dashboard.py
+# Dashboard của khách: customer -> học viên -> N booking gần nhất của mỗi học viên
+# -> gia sư, môn, đánh giá của từng booking. Số query cố định (tối đa 4), không phụ thuộc
+# số học viên / booking:
+# 1. customer                     2. students (selectinload)
+# 3. bookings: N dòng mới nhất mỗi học viên (row_number() OVER PARTITION BY student_id),
+#    JOIN luôn subject + feedback (quan hệ 1-1, cột ít -> joinedload)
+# 4. tutors WHERE id IN (...) (selectinload: nhiều booking chung 1 gia sư, không lặp cột)
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload, selectinload
+
+from extensions import db
+from models import Booking, Customer, Tutor
+
+RECENT_BOOKINGS_DEFAULT = 5
+RECENT_BOOKINGS_MAX = 20
+
+
+def load_dashboard(customer_id, recent=RECENT_BOOKINGS_DEFAULT):
+    """(customer, {student_id: (bookings mới nhất trước, tổng số booking)}). Không có khách -> (None, {})."""
+    customer = db.session.scalar(
+        select(Customer)
+        .where(Customer.id == customer_id)
+        .options(selectinload(Customer.students))
+    )
+    if customer is None:
+        return None, {}
+
+    student_ids = [student.id for student in customer.students]
+    bookings = {student_id: ([], 0) for student_id in student_ids}
+    if not student_ids:
+        return customer, bookings
+
+    ranked = (
+        select(
+            Booking.id,
+            func.row_number().over(
+                partition_by=Booking.student_id, order_by=(Booking.start_at.desc(), Booking.id.desc())
+            ).label("position"),
+            func.count(Booking.id).over(partition_by=Booking.student_id).label("total"),
+        )
+        .where(Booking.student_id.in_(student_ids))
+        .subquery()
+    )
+    rows = db.session.execute(
+        select(Booking, ranked.c.total)
+        .join(ranked, ranked.c.id == Booking.id)
+        .where(ranked.c.position <= recent)
+        .order_by(Booking.student_id, ranked.c.position)
+        .options(
+            joinedload(Booking.subject),
+            joinedload(Booking.feedback),
+            selectinload(Booking.tutor).load_only(
+                Tutor.id, Tutor.full_name, Tutor.hourly_rate, Tutor.rating_avg, Tutor.rating_count
+            ),
+        )
+    ).all()
+    for booking, total in rows:
+        items, _ = bookings[booking.student_id]
+        items.append(booking)
+        bookings[booking.student_id] = (items, total)
+    return customer, bookings
+
@@ -0,0 +1,145 @@
+# services/facets.py
+# Đếm số gia sư theo từng lựa chọn filter (môn, thành phố, khoảng giá, mức điểm) cho trang tìm kiếm.
+# - 1 query duy nhất: các nhánh GROUP BY nối bằng UNION ALL
+# - Đếm kiểu "disjunctive": nhánh của facet nào thì bỏ filter của chính facet đó
+#   (đang chọn city=Hà Nội vẫn thấy số lượng của các thành phố khác)
+# - Nhánh môn học đếm trên tutor_subjects (PK tutor_id, subject_id -> mỗi gia sư 1 lần/môn)
+# Kết quả cache cùng namespace listing (tutors:list) nên tự hết hiệu lực khi gia sư thay đổi.
+from sqlalchemy import case, cast, func, literal, union_all
+
+from extensions import db
+from models import Subject, Tutor, TutorSubject
+from services import search
+
+# (từ, đến) đồng/giờ; None = không giới hạn. Khớp filter min_rate/max_rate của listing.
+PRICE_BUCKETS = [
+    (None, 100000),
+    (100000, 200000),
+    (200000, 300000),
+    (300000, 500000),
+    (500000, None),
+]
+# "từ N sao trở lên" (cộng dồn), khớp filter min_rating
+RATING_THRESHOLDS = [4.5, 4.0, 3.0]
+
+FACETS = ("subjects", "cities", "hourly_rate", "rating")
+
+
+def _filtered(filters, skip=None):
+    """Query Tutor đã áp các filter (trừ filter của facet `skip`)."""
+    query = Tutor.query
+    if filters.get("city") and skip != "cities":
+        query = search.filter_city(query, filters["city"])
+    if filters.get("subject_ids") is not None and skip != "subjects":
+        query = search.filter_subject_ids(query, filters["subject_ids"])
+    if skip != "hourly_rate":
+        query = search.filter_rate(query, filters.get("min_rate"), filters.get("max_rate"))
+    if filters.get("min_rating") is not None and skip != "rating":
+        query = query.filter(Tutor.rating_avg >= filters["min_rating"])
+    if filters.get("q"):
+        query = search.apply_search(query, filters["q"], ranked=False)
+    return query
+
+
+def _price_bucket():
+    whens = []
+    for index, (low, high) in enumerate(PRICE_BUCKETS):
+        if high is not None:
+            whens.append((Tutor.hourly_rate < high, index))
+        else:
+            whens.append((Tutor.hourly_rate >= low, index))
+    return case(*whens, else_=None)
+
+
+def _rating_bucket():
+    # bucket không cộng dồn (>= 4.5, >= 4.0, ...), cộng dồn lại ở Python
+    return case(
+        *[(Tutor.rating_avg >= threshold, index) for index, threshold in enumerate(RATING_THRESHOLDS)],
+        else_=None,
+    )
+
+
+def _branch(query, facet, key, label):
+    """SELECT facet, key, label, count(*) ... GROUP BY key - các nhánh cùng kiểu cột để UNION."""
+    key = cast(key, db.String).label("key")
+    return (
+        query.with_entities(
+            literal(facet).label("facet"),
+            key,
+            cast(label, db.String).label("label"),
+            func.count(Tutor.id).label("count"),
+        )
+        .group_by(key)
+        .statement
+    )
+
+
+def facet_counts(filters):
+    """Trả về {"total": n, "subjects": [...], "cities": [...], "hourly_rate": [...], "rating": [...]}.
+
+    filters: city, subject, q, min_rating, min_rate, max_rate (giống query string của GET /api/tutors).
+    """
+    filters = dict(filters)
+    if filters.get("subject"):
+        filters["subject_ids"] = search.match_subject_ids(filters["subject"])  # tra 1 lần cho mọi nhánh
+    price = _price_bucket()
+    rating = _rating_bucket()
+    branches = [
+        _filtered(filters).with_entities(
+            literal("total").label("facet"),
+            cast(None, db.String).label("key"),
+            cast(None, db.String).label("label"),
+            func.count(Tutor.id).label("count"),
+        ).statement,
+        _branch(
+            _filtered(filters, skip="subjects")
+            .join(TutorSubject, TutorSubject.tutor_id == Tutor.id)
+            .join(Subject, Subject.id == TutorSubject.subject_id),
+            "subjects", Subject.id, func.min(Subject.name),
+        ),
+        _branch(
+            _filtered(filters, skip="cities").filter(Tutor.city_norm.isnot(None)),
+            "cities", Tutor.city_norm, func.min(Tutor.city),
+        ),
+        _branch(
+            _filtered(filters, skip="hourly_rate").filter(Tutor.hourly_rate.isnot(None)),
+            "hourly_rate", price, None,
+        ),
+        _branch(_filtered(filters, skip="rating"), "rating", rating, None),
+    ]
+    rows = db.session.execute(union_all(*branches)).all()
+    return _assemble(rows)
+
+
+def _assemble(rows):
+    result = {"total": 0, **{facet: {} for facet in FACETS}}
+    for facet, key, label, count in rows:
+        if facet == "total":
+            result["total"] = count
+        elif key is not None:
+            result[facet][key] = (label, count)
+
+    price = result["hourly_rate"]
+    rating = result["rating"]
+    running = 0
+    rating_counts = []
+    for index, threshold in enumerate(RATING_THRESHOLDS):
+        running += rating.get(str(index), (None, 0))[1]
+        rating_counts.append({"min_rating": threshold, "count": running})
+
+    return {
+        "total": result["total"],
+        "subjects": sorted(
+            ({"id": int(key), "name": label, "count": count} for key, (label, count) in result["subjects"].items()),
+            key=lambda item: (-item["count"], item["name"]),
+        ),
+        "cities": sorted(
+            ({"city": label, "count": count} for label, count in result["cities"].values()),
+            key=lambda item: (-item["count"], item["city"]),
+        ),
+        "hourly_rate": [
+            {"min_rate": low, "max_rate": high, "count": price.get(str(index), (None, 0))[1]}
+            for index, (low, high) in enumerate(PRICE_BUCKETS)
+        ],
+        "rating": rating_counts,
+    }
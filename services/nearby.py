@@ -0,0 +1,53 @@
+# services/nearby.py
+# Gia sư trong bán kính N km quanh 1 điểm (tọa độ khách hàng hoặc lat/lon gửi lên), gần nhất trước.
+# 1. Chỉ đọc gia sư thuộc 9 ô geohash quanh tâm (index ix_tutor_geohash) + lọc khung lat/lon
+# 2. Tính haversine cho các ứng viên đó (không phải cả bảng), bỏ ngoài bán kính, sắp xếp
+from sqlalchemy import or_
+
+from models import Tutor
+from utils import geo
+
+MAX_RADIUS_KM = 50
+
+
+def location_from(data):
+    """Đọc latitude/longitude từ body create/update.
+
+    Không gửi -> None (giữ nguyên); gửi cả 2 là null -> (None, None) (xóa vị trí); sai -> ValueError.
+    """
+    if "latitude" not in data and "longitude" not in data:
+        return None
+    if data.get("latitude") is None and data.get("longitude") is None:
+        return None, None
+    return geo.parse_point(data.get("latitude"), data.get("longitude"))
+
+
+def set_location(obj, location):
+    """Gán tọa độ cho Tutor/Customer; Tutor được tính lại geohash."""
+    if location is None:
+        return
+    obj.latitude, obj.longitude = location
+    if hasattr(obj, "geohash"):
+        obj.geohash = geo.encode(*location) if location[0] is not None else None
+
+
+def filter_nearby(query, lat, lon, radius_km):
+    """Lọc thô query Tutor: 9 ô geohash phủ hình tròn + khung bao lat/lon (chưa tính khoảng cách)."""
+    cells = geo.covering_cells(lat, lon, radius_km)
+    min_lat, max_lat, min_lon, max_lon = geo.bounding_box(lat, lon, radius_km)
+    return query.filter(
+        or_(*[Tutor.geohash.like(f"{cell}%") for cell in cells]),
+        Tutor.latitude.between(min_lat, max_lat),
+        Tutor.longitude.between(min_lon, max_lon),
+    )
+
+
+def nearest(rows, lat, lon, radius_km, limit):
+    """[(row, distance_km)] trong bán kính, gần nhất trước. rows phải có latitude/longitude."""
+    found = []
+    for row in rows:
+        distance = geo.distance_km(lat, lon, row.latitude, row.longitude)
+        if distance <= radius_km:
+            found.append((row, distance))
+    found.sort(key=lambda item: (item[1], item[0].id))
+    return found[:limit]
@@ -0,0 +1,116 @@
+# services/ratings.py
+# Giữ tutors.rating_avg / rating_count / rating_sum đồng bộ với bảng feedbacks.
+# - Mỗi lần gửi/sửa đánh giá: 1 câu UPDATE cộng dồn (O(1), atomic nhờ khóa dòng của UPDATE)
+# - Job tính lại toàn bộ từ feedbacks để sửa lệch (CLI: flask ratings-recompute)
+from sqlalchemy import case, cast, func, select, update
+
+from extensions import db
+from models import Booking, BookingArchive, BookingStatus, Feedback, Tutor
+
+
+class FeedbackError(Exception):
+    """Lỗi nghiệp vụ khi gửi đánh giá (kèm HTTP status)."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def _avg(total, count):
+    return case((count > 0, cast(total, db.Float) / count), else_=0.0)
+
+
+def apply_rating(tutor_id, new_rating, old_rating=None):
+    """Cộng dồn 1 đánh giá mới (old_rating=None) hoặc đổi điểm đánh giá cũ.
+
+    Dùng biểu thức trên chính cột (rating_sum + delta) nên 2 request đồng thời không ghi đè nhau.
+    """
+    delta = new_rating - (old_rating or 0)
+    added = 0 if old_rating is not None else 1
+    new_sum = Tutor.rating_sum + delta
+    new_count = Tutor.rating_count + added
+    db.session.execute(
+        update(Tutor)
+        .where(Tutor.id == tutor_id)
+        .values(rating_sum=new_sum, rating_count=new_count, rating_avg=_avg(new_sum, new_count))
+    )
+
+
+def submit_feedback(booking_id, rating, comment=None):
+    """Tạo hoặc sửa feedback của 1 booking đã hoàn thành + cập nhật điểm gia sư.
+
+    Trả về (feedback, created). Caller chịu trách nhiệm commit.
+    """
+    if not isinstance(rating, int) or isinstance(rating, bool) or not 1 <= rating <= 5:
+        raise FeedbackError("rating phải là số nguyên từ 1 đến 5")
+
+    # khóa dòng booking: 2 lần gửi đồng thời cho cùng booking sẽ chạy tuần tự
+    # (populate_existing: caller có thể đã nạp booking để kiểm quyền -> đọc lại status sau khi khóa)
+    booking = db.session.execute(
+        select(Booking).where(Booking.id == booking_id).with_for_update()
+        .execution_options(populate_existing=True)
+    ).scalar_one_or_none()
+    if booking is None:
+        raise FeedbackError("Không tìm thấy booking", 404)
+    if booking.status != BookingStatus.completed:
+        raise FeedbackError("Chỉ đánh giá được buổi học đã hoàn thành", 409)
+
+    feedback = booking.feedback
+    if feedback is None:
+        feedback = Feedback(booking_id=booking.id, rating=rating, comment=comment)
+        db.session.add(feedback)
+        apply_rating(booking.tutor_id, rating)
+        created = True
+    else:
+        old_rating = feedback.rating
+        feedback.rating = rating
+        if comment is not None:
+            feedback.comment = comment
+        if old_rating != rating:
+            apply_rating(booking.tutor_id, rating, old_rating)
+        created = False
+    return feedback, created
+
+
+def recompute_ratings(tutor_ids=None, batch_size=5000):
+    """Tính lại rating_* từ feedbacks (+ booking đã lưu trữ). Chạy theo khoảng id để transaction ngắn.
+
+    Trả về số gia sư đã xử lý.
+    """
+    def aggregate(fn):
+        return (
+            select(fn)
+            .select_from(Feedback)
+            .join(Booking, Booking.id == Feedback.booking_id)
+            .where(Booking.tutor_id == Tutor.id)
+            .scalar_subquery()
+        )
+
+    def archived(fn):
+        # đánh giá của các booking đã chuyển sang bookings_archive (services/archive.py)
+        return select(fn).where(BookingArchive.tutor_id == Tutor.id).scalar_subquery()
+
+    total = (
+        aggregate(func.coalesce(func.sum(Feedback.rating), 0))
+        + archived(func.coalesce(func.sum(BookingArchive.rating), 0))
+    )
+    count = aggregate(func.count(Feedback.id)) + archived(func.count(BookingArchive.rating))
+    values = {"rating_sum": total, "rating_count": count, "rating_avg": _avg(total, count)}
+
+    if tutor_ids is not None:
+        result = db.session.execute(update(Tutor).where(Tutor.id.in_(tutor_ids)).values(**values))
+        db.session.commit()
+        return result.rowcount
+
+    processed = 0
+    max_id = db.session.scalar(select(func.max(Tutor.id))) or 0
+    for start in range(0, max_id, batch_size):
+        result = db.session.execute(
+            update(Tutor)
+            .where(Tutor.id > start, Tutor.id <= start + batch_size)
+            .values(**values)
+        )
+        db.session.commit()
+        processed += result.rowcount
+    return processed
@@ -0,0 +1,259 @@
+# services/search.py
+# Tìm kiếm gia sư: chuẩn hóa không dấu + trigram.
+# - Postgres: cột tutors.search_text có GIN index (pg_trgm), xếp hạng bằng word_similarity.
+# - SQLite (chạy test): index trigram trong bộ nhớ, cùng cách chấm điểm.
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+
+from flask import current_app
+from sqlalchemy import case, func, literal, select
+
+from extensions import db
+from models import Subject, Tutor, TutorSubject
+
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text):
+    """Bỏ dấu tiếng Việt, chữ thường, gộp khoảng trắng ("Đà Nẵng" -> "da nang")."""
+    if not text:
+        return ""
+    text = text.replace("đ", "d").replace("Đ", "D")
+    text = unicodedata.normalize("NFD", text)
+    text = "".join(ch for ch in text if unicodedata.category(ch) != "Mn")
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+def trigrams(text):
+    """Tập trigram theo từng từ, giống cách pg_trgm tách ("  ab c" ...)."""
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+def build_document(tutor, subject_names=None):
+    """Gộp các cột cần tìm (tên, thành phố, bio, tên môn) thành 1 chuỗi đã chuẩn hóa."""
+    if subject_names is None:
+        subject_names = [s.name for s in tutor.subjects]
+    parts = [tutor.full_name, tutor.city, *subject_names, tutor.bio]
+    return normalize(" ".join(p for p in parts if p))
+
+
+def refresh_document(tutor, subject_names=None):
+    """Cập nhật search_text/city_norm trước khi commit (gọi ở các route ghi)."""
+    tutor.search_text = build_document(tutor, subject_names)
+    tutor.city_norm = normalize(tutor.city) or None
+    index = _memory_index(create=False)
+    if index is not None and tutor.id is not None:
+        index.add(tutor.id, tutor.search_text)
+
+
+def add_documents(pairs):
+    """Thêm nhiều (tutor_id, search_text) vào index trong bộ nhớ (sau import hàng loạt)."""
+    index = _memory_index(create=False)
+    if index is not None:
+        for tutor_id, text in pairs:
+            index.add(tutor_id, text)
+
+
+def forget_document(tutor_id):
+    """Bỏ gia sư khỏi index trong bộ nhớ (khi xóa)."""
+    index = _memory_index(create=False)
+    if index is not None:
+        index.remove(tutor_id)
+
+
+# =========================
+#  Index trong bộ nhớ (fallback cho SQLite)
+# =========================
+
+class MemoryTrigramIndex:
+    """Inverted index trigram -> tập tutor_id, chấm điểm giống word_similarity."""
+
+    def __init__(self):
+        self._postings = defaultdict(set)
+        self._docs = {}
+        self._lock = threading.Lock()
+
+    def add(self, doc_id, text):
+        with self._lock:
+            self._remove(doc_id)
+            grams = trigrams(text or "")
+            self._docs[doc_id] = grams
+            for gram in grams:
+                self._postings[gram].add(doc_id)
+
+    def remove(self, doc_id):
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id):
+        for gram in self._docs.pop(doc_id, ()):
+            ids = self._postings.get(gram)
+            if ids is not None:
+                ids.discard(doc_id)
+                if not ids:
+                    del self._postings[gram]
+
+    def search(self, query, threshold, limit):
+        """Trả về [(tutor_id, score)] giảm dần theo score."""
+        grams = trigrams(query)
+        if not grams:
+            return []
+        hits = defaultdict(int)
+        with self._lock:
+            for gram in grams:
+                for doc_id in self._postings.get(gram, ()):
+                    hits[doc_id] += 1
+        total = len(grams)
+        scored = [(doc_id, n / total) for doc_id, n in hits.items() if n / total >= threshold]
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:limit]
+
+    def __len__(self):
+        return len(self._docs)
+
+
+def _memory_index(create=True):
+    index = current_app.extensions.get("tutor_search_index")
+    if index is None and create:
+        index = MemoryTrigramIndex()
+        rows = db.session.execute(select(Tutor.id, Tutor.search_text))
+        for tutor_id, text in rows:
+            index.add(tutor_id, text)
+        current_app.extensions["tutor_search_index"] = index
+    return index
+
+
+def _use_postgres():
+    backend = current_app.config.get("SEARCH_BACKEND", "auto")
+    if backend == "auto":
+        return db.engine.dialect.name == "postgresql"
+    return backend == "postgres"
+
+
+# =========================
+#  API truy vấn
+# =========================
+
+def apply_search(query, q, ranked=True):
+    """Lọc + xếp hạng query Tutor theo chuỗi tìm kiếm q (có sai chính tả, không dấu).
+
+    ranked=False: chỉ lọc, để caller tự sắp xếp (VD phân trang cursor).
+    """
+    term = normalize(q)
+    if not term:
+        return query
+
+    if _use_postgres():
+        # toán tử <% dùng được GIN index gin_trgm_ops trên search_text
+        query = query.filter(literal(term).op("<%")(Tutor.search_text))
+        if ranked:
+            rank = func.word_similarity(term, Tutor.search_text)
+            query = query.order_by(rank.desc(), Tutor.id)
+        return query
+
+    matches = search_tutors(q)
+    if not matches:
+        return query.filter(db.false())
+    ids = [tutor_id for tutor_id, _ in matches]
+    if not ranked:
+        return query.filter(Tutor.id.in_(ids))
+    order = case({tutor_id: pos for pos, tutor_id in enumerate(ids)}, value=Tutor.id)
+    return query.filter(Tutor.id.in_(ids)).order_by(order)
+
+
+def search_tutors(q, limit=None):
+    """Trả về [(tutor_id, score)] đã xếp hạng cho chuỗi q."""
+    term = normalize(q)
+    if not term:
+        return []
+    limit = limit or current_app.config.get("SEARCH_MAX_RESULTS", 1000)
+    threshold = current_app.config.get("SEARCH_THRESHOLD", 0.5)
+
+    if _use_postgres():
+        rank = func.word_similarity(term, Tutor.search_text).label("score")
+        stmt = (
+            select(Tutor.id, rank)
+            .where(literal(term).op("<%")(Tutor.search_text))
+            .order_by(rank.desc(), Tutor.id)
+            .limit(limit)
+        )
+        return [(row.id, row.score) for row in db.session.execute(stmt)]
+
+    return _memory_index().search(term, threshold, limit)
+
+
+def filter_city(query, city):
+    """Lọc theo thành phố: so khớp tiền tố trên city_norm (B-tree, không dấu)."""
+    term = normalize(city)
+    if not term:
+        return query
+    return query.filter(Tutor.city_norm.like(f"{term}%"))
+
+
+def filter_rate(query, min_rate=None, max_rate=None):
+    """Lọc theo đơn giá/giờ trong [min_rate, max_rate) (đồng)."""
+    if min_rate is not None:
+        query = query.filter(Tutor.hourly_rate >= min_rate)
+    if max_rate is not None:
+        query = query.filter(Tutor.hourly_rate < max_rate)
+    return query
+
+
+def match_subject_ids(subject):
+    """Tìm id các môn khớp (không dấu) theo tên hoặc mã. Bảng subjects rất nhỏ."""
+    term = normalize(subject)
+    if not term:
+        return []
+    rows = db.session.execute(select(Subject.id, Subject.name, Subject.code))
+    return [
+        row.id for row in rows
+        if term in normalize(row.name) or term == normalize(row.code)
+    ]
+
+
+def filter_subject(query, subject):
+    """Lọc gia sư dạy môn khớp subject (dùng index tutor_subjects.subject_id)."""
+    return filter_subject_ids(query, match_subject_ids(subject))
+
+
+def filter_subject_ids(query, subject_ids):
+    """Như filter_subject khi đã có sẵn id môn (tránh tra bảng subjects nhiều lần)."""
+    if not subject_ids:
+        return query.filter(db.false())
+    tutor_ids = select(TutorSubject.tutor_id).where(TutorSubject.subject_id.in_(subject_ids))
+    return query.filter(Tutor.id.in_(tutor_ids))
+
+
+def reindex_all(batch_size=1000):
+    """Tính lại search_text/city_norm cho toàn bộ gia sư (dùng cho CLI)."""
+    names = defaultdict(list)
+    rows = db.session.execute(
+        select(TutorSubject.tutor_id, Subject.name).join(Subject, Subject.id == TutorSubject.subject_id)
+    )
+    for tutor_id, name in rows:
+        names[tutor_id].append(name)
+
+    count = 0
+    last_id = 0
+    while True:
+        tutors = (
+            Tutor.query.filter(Tutor.id > last_id).order_by(Tutor.id).limit(batch_size).all()
+        )
+        if not tutors:
+            break
+        for tutor in tutors:
+            tutor.search_text = build_document(tutor, names.get(tutor.id, []))
+            tutor.city_norm = normalize(tutor.city) or None
+        db.session.commit()
+        count += len(tutors)
+        last_id = tutors[-1].id
+
+    current_app.extensions.pop("tutor_search_index", None)
+    return count
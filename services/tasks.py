@@ -0,0 +1,239 @@
+# services/tasks.py
+# Hàng đợi job nền lưu trong DB (bảng jobs), không cần broker riêng.
+# - enqueue() chỉ add vào session hiện tại -> job được commit CÙNG transaction với dữ liệu
+#   (không có chuyện dữ liệu đã lưu mà job bị mất, hoặc job chạy khi dữ liệu chưa commit)
+# - Worker (`flask worker`) lấy job bằng SELECT ... FOR UPDATE SKIP LOCKED (Postgres),
+#   nhiều worker/process chạy song song không tranh nhau
+# - Lỗi -> thử lại với backoff lũy thừa tới max_attempts rồi đánh dấu failed
+# - Job "running" quá JOBS_LOCK_TIMEOUT (worker chết giữa chừng) được trả lại hàng đợi
+# Task nên idempotent: 1 job có thể chạy lại sau khi worker chết.
+import importlib
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func, select, update
+
+from extensions import db
+from models import Job, JobStatus
+
+logger = logging.getLogger("jobs")
+
+# các module khai báo task (@task), worker import để đăng ký
+TASK_MODULES = ["services.booking", "services.tutor_import", "services.archive"]
+
+_registry = {}
+
+
+def task(name, max_attempts=None):
+    """Đăng ký hàm làm task: @task("bookings.notify"). Hàm nhận payload dạng kwargs."""
+    def decorator(fn):
+        fn.task_name = name
+        fn.max_attempts = max_attempts
+        _registry[name] = fn
+        return fn
+    return decorator
+
+
+def load_tasks():
+    for module in TASK_MODULES:
+        importlib.import_module(module)
+    return dict(_registry)
+
+
+def enqueue(name, payload=None, delay=0, run_at=None, max_attempts=None, dedupe_key=None, created_by=None):
+    """Thêm job vào session hiện tại (caller commit).
+
+    dedupe_key: đã có job cùng tên + key đang chờ -> không thêm nữa (VD tính lại điểm 1 gia sư).
+    created_by: user_id xếp job từ API (người được xem kết quả job).
+    """
+    if dedupe_key is not None:
+        existing = db.session.scalar(
+            select(Job).where(
+                Job.name == name, Job.dedupe_key == dedupe_key, Job.status == JobStatus.queued
+            ).limit(1)
+        )
+        if existing is not None:
+            return existing
+
+    fn = _registry.get(name)
+    job = Job(
+        name=name,
+        payload=payload or {},
+        run_at=run_at or datetime.utcnow() + timedelta(seconds=delay),
+        max_attempts=max_attempts
+        or getattr(fn, "max_attempts", None)
+        or current_app.config.get("JOBS_MAX_ATTEMPTS", 5),
+        dedupe_key=dedupe_key,
+        created_by=created_by,
+    )
+    db.session.add(job)
+    return job
+
+
+def _retry_delay(attempts):
+    base = current_app.config.get("JOBS_RETRY_BASE_DELAY", 5)
+    return min(current_app.config.get("JOBS_RETRY_MAX_DELAY", 600), base * 2 ** (attempts - 1))
+
+
+def recover_stale():
+    """Job running quá lâu (worker chết) -> queued lại. Trả về số job."""
+    timeout = current_app.config.get("JOBS_LOCK_TIMEOUT", 300)
+    result = db.session.execute(
+        update(Job)
+        .where(Job.status == JobStatus.running, Job.locked_at < datetime.utcnow() - timedelta(seconds=timeout))
+        .values(status=JobStatus.queued, locked_at=None, locked_by=None)
+    )
+    db.session.commit()
+    if result.rowcount:
+        logger.warning("Trả lại %d job bị kẹt ở trạng thái running", result.rowcount)
+    return result.rowcount
+
+
+def claim(worker_id, limit=1):
+    """Lấy tối đa `limit` job đến hạn, đánh dấu running. Trả về list id."""
+    now = datetime.utcnow()
+    candidates = (
+        select(Job.id)
+        .where(Job.status == JobStatus.queued, Job.run_at <= now)
+        .order_by(Job.run_at, Job.id)
+        .limit(limit)
+    )
+    if db.engine.dialect.name == "postgresql":
+        candidates = candidates.with_for_update(skip_locked=True)
+    ids = db.session.scalars(candidates).all()
+    if not ids:
+        db.session.rollback()
+        return []
+
+    # điều kiện status='queued' lần nữa: SQLite không có SKIP LOCKED, 2 worker có thể cùng thấy 1 job
+    claimed = db.session.scalars(
+        update(Job)
+        .where(Job.id.in_(ids), Job.status == JobStatus.queued)
+        .values(status=JobStatus.running, locked_at=now, locked_by=worker_id, attempts=Job.attempts + 1)
+        .returning(Job.id)
+    ).all()
+    db.session.commit()
+    return sorted(claimed)
+
+
+def run_job(job_id):
+    """Chạy 1 job đã claim. Thành công -> done; lỗi -> queued lại (backoff) hoặc failed."""
+    job = db.session.get(Job, job_id)
+    fn = _registry.get(job.name)
+    started = time.perf_counter()
+    try:
+        if fn is None:
+            raise LookupError(f"task chưa đăng ký: {job.name}")
+        result = fn(**(job.payload or {}))
+    except Exception as exc:
+        db.session.rollback()
+        job = db.session.get(Job, job_id)
+        job.last_error = "".join(traceback.format_exception_only(type(exc), exc)).strip()[:2000]
+        job.locked_at = None
+        job.locked_by = None
+        if job.attempts >= job.max_attempts:
+            job.status = JobStatus.failed
+            logger.error("Job %s (%s) thất bại hẳn sau %d lần: %s", job.id, job.name, job.attempts, job.last_error)
+        else:
+            job.status = JobStatus.queued
+            job.run_at = datetime.utcnow() + timedelta(seconds=_retry_delay(job.attempts))
+            logger.warning("Job %s (%s) lỗi lần %d, thử lại lúc %s: %s",
+                           job.id, job.name, job.attempts, job.run_at, job.last_error)
+        db.session.commit()
+        return False
+
+    job = db.session.get(Job, job_id)
+    job.status = JobStatus.done
+    job.result = result
+    job.last_error = None
+    job.locked_at = None
+    job.locked_by = None
+    db.session.commit()
+    logger.info("Job %s (%s) xong trong %.0f ms", job.id, job.name, (time.perf_counter() - started) * 1000)
+    return True
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def work(worker_id=None, once=False, batch=10, poll_interval=None, stop_event=None):
+    """Vòng lặp worker (cần app context). once=True: chạy hết job đến hạn rồi dừng.
+
+    Trả về số job đã chạy.
+    """
+    load_tasks()
+    worker_id = worker_id or default_worker_id()
+    poll_interval = poll_interval or current_app.config.get("JOBS_POLL_INTERVAL", 1.0)
+    stop_event = stop_event or threading.Event()
+    processed = 0
+    last_recover = 0.0
+
+    while not stop_event.is_set():
+        try:
+            if time.monotonic() - last_recover > 30:
+                recover_stale()
+                last_recover = time.monotonic()
+
+            ids = claim(worker_id, batch)
+            for job_id in ids:
+                run_job(job_id)
+                processed += 1
+        except Exception:
+            # mất kết nối DB, ... -> không để worker chết, chờ rồi thử lại
+            logger.exception("Worker %s gặp lỗi, thử lại sau %.1fs", worker_id, poll_interval)
+            db.session.rollback()
+            ids = []
+            if once:
+                raise
+        finally:
+            db.session.remove()
+
+        if not ids:
+            if once:
+                break
+            stop_event.wait(poll_interval)
+    return processed
+
+
+def stats():
+    """Số job theo trạng thái (cho /api/metrics)."""
+    rows = db.session.execute(select(Job.status, func.count()).group_by(Job.status))
+    return {status.value: count for status, count in rows}
+
+
+# =========================
+#  Worker chạy kèm web process (dev): JOBS_EMBEDDED_WORKER=1
+# =========================
+
+_embedded = {"pid": None}
+_embedded_lock = threading.Lock()
+
+
+def init_app(app):
+    app.config.setdefault("JOBS_EMBEDDED_WORKER", False)
+    if app.config["JOBS_EMBEDDED_WORKER"]:
+        # khởi động lười ở request đầu tiên của mỗi process (an toàn với fork/reloader)
+        app.before_request(_ensure_embedded_worker)
+
+
+def _ensure_embedded_worker():
+    if _embedded["pid"] == os.getpid():
+        return
+    with _embedded_lock:
+        if _embedded["pid"] == os.getpid():
+            return
+        _embedded["pid"] = os.getpid()
+        app = current_app._get_current_object()
+
+        def run():
+            with app.app_context():
+                work(worker_id=f"embedded:{default_worker_id()}")
+
+        threading.Thread(target=run, name="jobs-embedded", daemon=True).start()
@@ -0,0 +1,273 @@
+# services/tutor_import.py
+# Import gia sư hàng loạt (JSON/NDJSON qua API, CSV qua CLI).
+# - Validate trong bộ nhớ
+# - Kiểm tra trùng email/sđt bằng 1 query IN cho cả lô
+# - INSERT nhiều dòng 1 lần (executemany / insertmanyvalues) + gắn môn trong cùng lô
+# - Dòng lỗi được ghi vào báo cáo, không làm hỏng cả lần import
+# - File lớn (hoặc ?async=1) chạy bằng job nền "tutors.import", báo cáo nằm trong job.result
+import csv
+import json
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import DataError, IntegrityError
+
+from extensions import db
+from models import Subject, Tutor, TutorSubject
+from services import search
+from services.tasks import task
+from utils import geo
+
+REQUIRED_FIELDS = ("full_name", "email", "years_experience", "city")
+INT_MAX = 2**31 - 1          # cột Integer (Postgres int4)
+PHONE_MAX = 20               # tutors.phone String(20)
+
+
+class ImportReport:
+    def __init__(self):
+        self.total = 0
+        self.created = 0
+        self.errors = []
+
+    def error(self, row_number, email, message):
+        self.errors.append({"row": row_number, "email": email, "error": message})
+
+    def to_dict(self):
+        return {
+            "total": self.total,
+            "created": self.created,
+            "failed": len(self.errors),
+            "errors": sorted(self.errors, key=lambda e: e["row"]),
+        }
+
+
+def _to_int(value, field, required=False):
+    if value is None or value == "":
+        if required:
+            raise ValueError(f"thiếu {field}")
+        return None
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} phải là số nguyên")
+    if number < 0:
+        raise ValueError(f"{field} không được âm")
+    if number > INT_MAX:
+        raise ValueError(f"{field} quá lớn")
+    return number
+
+
+def _to_phone(value):
+    if value in (None, ""):
+        return None
+    phone = str(value).strip()
+    if len(phone) > PHONE_MAX:
+        raise ValueError(f"phone tối đa {PHONE_MAX} ký tự")
+    return phone or None
+
+
+def _to_text(value, field):
+    if value in (None, ""):
+        return None
+    if not isinstance(value, str):
+        raise ValueError(f"{field} phải là chuỗi")
+    return value
+
+
+def normalize_email(value):
+    """Email lưu và so sánh dạng chữ thường (A@x.com và a@x.com là 1 tài khoản)."""
+    return str(value).strip().lower()
+
+
+def validate_row(raw):
+    """Chuẩn hóa 1 dòng input thành dict cột của Tutor + list môn. Lỗi -> ValueError."""
+    if not isinstance(raw, dict):
+        raise ValueError("mỗi dòng phải là object")
+    missing = [f for f in REQUIRED_FIELDS if raw.get(f) in (None, "")]
+    if missing:
+        raise ValueError(f"thiếu trường: {', '.join(missing)}")
+
+    email = normalize_email(raw["email"])
+    if "@" not in email or len(email) > 120:
+        raise ValueError("email không hợp lệ")
+
+    subjects = raw.get("subjects") or []
+    if isinstance(subjects, str):
+        subjects = [s for s in subjects.split(";")]
+    subjects = [str(s).strip() for s in subjects if str(s).strip()]
+
+    row = {
+        "full_name": str(raw["full_name"]).strip()[:120],
+        "email": email,
+        "phone": _to_phone(raw.get("phone")),
+        "years_experience": _to_int(raw["years_experience"], "years_experience", required=True),
+        "hourly_rate": _to_int(raw.get("hourly_rate"), "hourly_rate") or 0,
+        "bio": _to_text(raw.get("bio"), "bio"),
+        "city": str(raw["city"]).strip()[:100],
+        # executemany cần mọi dòng cùng bộ cột -> luôn có 3 cột vị trí
+        "latitude": None,
+        "longitude": None,
+        "geohash": None,
+    }
+    if raw.get("latitude") not in (None, "") or raw.get("longitude") not in (None, ""):
+        row["latitude"], row["longitude"] = geo.parse_point(raw.get("latitude"), raw.get("longitude"))
+        row["geohash"] = geo.encode(row["latitude"], row["longitude"])
+    return row, subjects
+
+
+def _subject_lookup():
+    """Map tên/mã môn (đã chuẩn hóa) -> (id, tên). Bảng subjects nhỏ, đọc 1 lần."""
+    lookup = {}
+    for subject_id, code, name in db.session.execute(select(Subject.id, Subject.code, Subject.name)):
+        lookup[search.normalize(code)] = (subject_id, name)
+        lookup[search.normalize(name)] = (subject_id, name)
+    return lookup
+
+
+def import_tutors(rows, batch_size=1000):
+    """Import iterable các dict. Trả về ImportReport."""
+    report = ImportReport()
+    subjects_by_key = _subject_lookup()
+    seen_emails = set()
+    seen_phones = set()
+    batch = []
+
+    for row_number, raw in enumerate(rows, start=1):
+        report.total += 1
+        email = raw.get("email") if isinstance(raw, dict) else None
+        try:
+            row, subject_keys = validate_row(raw)
+            subjects = []
+            for key in subject_keys:
+                match = subjects_by_key.get(search.normalize(key))
+                if match is None:
+                    raise ValueError(f"không tìm thấy môn '{key}'")
+                if match not in subjects:
+                    subjects.append(match)
+        except ValueError as exc:
+            report.error(row_number, email, str(exc))
+            continue
+
+        # trùng ngay trong file import
+        if row["email"] in seen_emails:
+            report.error(row_number, row["email"], "email bị lặp trong dữ liệu import")
+            continue
+        if row["phone"] and row["phone"] in seen_phones:
+            report.error(row_number, row["email"], "số điện thoại bị lặp trong dữ liệu import")
+            continue
+        seen_emails.add(row["email"])
+        if row["phone"]:
+            seen_phones.add(row["phone"])
+
+        batch.append((row_number, row, subjects))
+        if len(batch) >= batch_size:
+            _flush_batch(batch, report)
+            batch = []
+
+    if batch:
+        _flush_batch(batch, report)
+    return report
+
+
+# không tự thử lại: lần chạy lại sẽ báo "email đã được sử dụng" cho các dòng đã import
+@task("tutors.import", max_attempts=1)
+def import_tutors_job(rows, batch_size=1000):
+    """Chạy import trong worker; trả về báo cáo (lưu vào job.result)."""
+    from routes.tutors import invalidate_tutor_cache  # tránh import vòng services <-> routes
+
+    report = import_tutors(rows, batch_size=batch_size)
+    if report.created:
+        invalidate_tutor_cache()
+    return report.to_dict()
+
+
+def _flush_batch(batch, report):
+    # 1 query cho toàn bộ email + 1 query cho sđt đã tồn tại trong DB
+    # (email so theo lower(): dòng cũ có thể còn chữ hoa, dùng index ix_tutor_email_lower)
+    emails = [row["email"] for _, row, _ in batch]
+    phones = [row["phone"] for _, row, _ in batch if row["phone"]]
+    email_key = func.lower(Tutor.email)
+    taken_emails = set(db.session.scalars(select(email_key).where(email_key.in_(emails))))
+    taken_phones = set()
+    if phones:
+        taken_phones = set(db.session.scalars(select(Tutor.phone).where(Tutor.phone.in_(phones))))
+
+    ready = []
+    for row_number, row, subjects in batch:
+        if row["email"] in taken_emails:
+            report.error(row_number, row["email"], "email đã được sử dụng")
+        elif row["phone"] in taken_phones:
+            report.error(row_number, row["email"], "số điện thoại đã được sử dụng")
+        else:
+            row["city_norm"] = search.normalize(row["city"]) or None
+            row["search_text"] = search.build_document(
+                _DocumentRow(row), [name for _, name in subjects]
+            )
+            ready.append((row_number, row, subjects))
+    if not ready:
+        return
+
+    try:
+        _insert(ready)
+        db.session.commit()
+    except (IntegrityError, DataError):
+        # có request khác chèn cùng email/sđt giữa lúc kiểm tra và insert, hoặc DB từ chối giá trị
+        # của 1 dòng -> thử từng dòng, dòng lỗi vào báo cáo thay vì làm hỏng cả lô
+        db.session.rollback()
+        ready = _insert_one_by_one(ready, report)
+        db.session.commit()
+
+    report.created += len(ready)
+    search.add_documents((row["id"], row["search_text"]) for _, row, _ in ready)
+
+
+def _insert(ready):
+    stmt = insert(Tutor).returning(Tutor.id, Tutor.email, sort_by_parameter_order=True)
+    result = db.session.execute(stmt, [row for _, row, _ in ready])
+    links = []
+    for (_, row, subjects), inserted in zip(ready, result):
+        row["id"] = inserted.id
+        links.extend({"tutor_id": inserted.id, "subject_id": subject_id} for subject_id, _ in subjects)
+    if links:
+        db.session.execute(insert(TutorSubject), links)
+
+
+def _insert_one_by_one(ready, report):
+    inserted = []
+    for item in ready:
+        row_number, row, _ = item
+        row.pop("id", None)
+        try:
+            with db.session.begin_nested():
+                _insert([item])
+            inserted.append(item)
+        except IntegrityError:
+            report.error(row_number, row["email"], "email hoặc số điện thoại đã được sử dụng")
+        except DataError:
+            report.error(row_number, row["email"], "giá trị không hợp lệ với kiểu cột")
+    return inserted
+
+
+class _DocumentRow:
+    """Bọc dict để dùng lại search.build_document (đọc thuộc tính như object Tutor)."""
+
+    def __init__(self, row):
+        self.full_name = row["full_name"]
+        self.city = row["city"]
+        self.bio = row["bio"]
+
+
+def read_ndjson(text):
+    """Đọc body NDJSON: mỗi dòng 1 object, bỏ qua dòng trống."""
+    for line in text.splitlines():
+        line = line.strip()
+        if line:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None  # validate_row sẽ báo lỗi cho đúng số dòng
+
+
+def read_csv(path):
+    """Đọc file CSV (header: full_name,email,phone,years_experience,hourly_rate,bio,city,subjects[,latitude,longitude])."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        yield from csv.DictReader(f)
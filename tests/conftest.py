@@ -0,0 +1,35 @@
+# tests/conftest.py
+# Chạy: python -m pytest (từ thư mục gốc repo). Dùng TestingConfig: SQLite in-memory,
+# SQL_PROFILING + SQL_QUERY_BUDGET_STRICT bật -> route vượt @query_budget làm test fail.
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import create_app
+from extensions import db
+from utils.auth_context import auth_claims
+
+
+@pytest.fixture
+def app():
+    app = create_app("testing")
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers(app):
+    """auth_headers(user) -> header Authorization với token mang claims như lúc login."""
+    def make(user):
+        with app.app_context():
+            token = create_access_token(identity=str(user.id), additional_claims=auth_claims(user))
+        return {"Authorization": f"Bearer {token}"}
+    return make
@@ -0,0 +1,62 @@
+# tests/test_dashboard.py
+# GET /api/customers/<id>/dashboard: số query không đổi khi số học viên / booking tăng.
+from datetime import datetime, timedelta
+
+from extensions import db
+from models import Booking, BookingStatus, Customer, Feedback, Student, Subject, Tutor, User
+
+
+def _seed_customer(email, students, bookings_each):
+    """Khách có `students` học viên, mỗi học viên `bookings_each` booking (xen kẽ gia sư, có đánh giá)."""
+    subject = Subject(code=f"S-{email}", name=f"Toán {email}")
+    tutors = [Tutor(full_name=f"Gia sư {i}", email=f"t{i}-{email}", hourly_rate=100000) for i in range(3)]
+    customer = Customer(full_name="Khách", email=email)
+    db.session.add_all([subject, customer, *tutors])
+    db.session.flush()
+
+    start = datetime(2026, 1, 1, 8)
+    for s in range(students):
+        student = Student(customer_id=customer.id, full_name=f"Học viên {s}")
+        db.session.add(student)
+        db.session.flush()
+        for b in range(bookings_each):
+            booking = Booking(
+                student_id=student.id, tutor_id=tutors[(s + b) % len(tutors)].id, subject_id=subject.id,
+                start_at=start + timedelta(days=b, hours=s), end_at=start + timedelta(days=b, hours=s + 1),
+                hours=1, total_price=100000, status=BookingStatus.completed,
+            )
+            db.session.add(booking)
+            db.session.flush()
+            if b % 2:
+                db.session.add(Feedback(booking_id=booking.id, rating=4))
+
+    user = User(email=f"user-{email}", password_hash="x", role="customer", customer_id=customer.id)
+    db.session.add(user)
+    db.session.commit()
+    return customer.id, user
+
+
+def _dashboard(client, headers, customer_id):
+    response = client.get(f"/api/customers/{customer_id}/dashboard", headers=headers)
+    assert response.status_code == 200
+    return response
+
+
+def test_dashboard_query_count_is_constant(app, client, auth_headers):
+    with app.app_context():
+        small_id, small_user = _seed_customer("small@x", students=1, bookings_each=1)
+        large_id, large_user = _seed_customer("large@x", students=12, bookings_each=15)
+        small, large = auth_headers(small_user), auth_headers(large_user)
+
+    # request đầu làm mới bảng thu hồi token (+1 query) -> đo từ request thứ 2
+    _dashboard(client, small, small_id)
+
+    small_response = _dashboard(client, small, small_id)
+    large_response = _dashboard(client, large, large_id)
+
+    assert len(small_response.json["students"]) == 1
+    assert len(large_response.json["students"]) == 12
+    assert all(len(student["bookings"]) == 5 for student in large_response.json["students"])
+    assert all(student["bookings_total"] == 15 for student in large_response.json["students"])
+    assert small_response.headers["X-DB-Queries"] == large_response.headers["X-DB-Queries"]
+    assert int(large_response.headers["X-DB-Queries"]) <= 4
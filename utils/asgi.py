@@ -0,0 +1,262 @@
+# utils/asgi.py
+# Chế độ ASGI (asgi.py): cùng Flask app, cùng models, nhưng route đọc nhiều không giữ 1 thread/request.
+# - Route trong ASYNC_ENDPOINTS: cả pipeline Flask (before/after_request, cache, ETag, nén, ...) chạy
+#   trong greenlet của AsyncSession.run_sync trên engine asyncio (asyncpg / aiosqlite). Mỗi lần chờ DB,
+#   greenlet nhường event loop -> 1 thread phục vụ hàng nghìn request đang chờ Postgres.
+# - Route khác (bcrypt, ghi, stream, ...) là code đồng bộ: chạy trong thread pool ASGI_THREADS
+#   với engine đồng bộ như WSGI.
+# Là ASGI app thuần (không cần Starlette), chạy bằng uvicorn/hypercorn.
+# Lưu ý: route async đọc thẳng DATABASE_URL (không qua replica); CACHE_BACKEND=redis vẫn là lời gọi
+# đồng bộ (nhanh, nhưng chặn event loop trong lúc chờ Redis).
+import asyncio
+import io
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+from sqlalchemy.engine import make_url
+from werkzeug.exceptions import HTTPException
+
+from extensions import db
+from utils import profiling
+
+# route chỉ đọc DB (+ cache trong process) -> chạy trên engine asyncio
+ASYNC_ENDPOINTS = {"api.get_tutors", "api.get_tutor", "api.get_customers", "api.get_current_user"}
+
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(uri):
+    """postgresql://... -> postgresql+asyncpg://... (sqlite -> aiosqlite). Không có driver -> ValueError."""
+    url = make_url(uri)
+    if url.drivername in _ASYNC_DRIVERS.values():
+        return url
+    driver = _ASYNC_DRIVERS.get(url.drivername)
+    if driver is None:
+        raise ValueError(f"Không có driver asyncio cho {url.drivername}, hãy đặt ASYNC_DATABASE_URL")
+    return url.set(drivername=driver)
+
+
+def _wants_stream(query_string):
+    """?stream=1 / ?format=ndjson: route đọc DB theo từng phần trong lúc gửi -> để thread pool chạy."""
+    args = parse_qs(query_string)
+    return "stream" in args or args.get("format") == ["ndjson"]
+
+
+async def read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            break
+    return b"".join(chunks)
+
+
+def build_environ(scope, body):
+    """WSGI environ từ ASGI scope + body đã đọc."""
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1] or 80),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "REMOTE_PORT": str(client[1]),
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope.get("headers", []):
+        name = name.decode("latin-1").upper().replace("-", "_")
+        if name == "CONTENT_LENGTH":
+            continue
+        key = name if name == "CONTENT_TYPE" else f"HTTP_{name}"
+        value = value.decode("latin-1")
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+def call_wsgi(app, environ, on_start, on_chunk):
+    """Chạy WSGI app; on_start(status, headers) trước chunk đầu tiên, on_chunk(bytes) cho từng chunk."""
+    started = []
+
+    def start_response(status, headers, exc_info=None):
+        if exc_info and started:
+            raise exc_info[1].with_traceback(exc_info[2])
+        started[:] = [
+            int(status.split(" ", 1)[0]),
+            [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers],
+        ]
+        return on_chunk
+
+    iterable = app(environ, start_response)
+    try:
+        sent = False
+        for chunk in iterable:
+            if not chunk:
+                continue
+            if not sent:
+                on_start(*started)
+                sent = True
+            on_chunk(chunk)
+        if not sent:
+            on_start(*started)
+    finally:
+        close = getattr(iterable, "close", None)
+        if close is not None:
+            close()
+
+
+class _Disconnected(Exception):
+    pass
+
+
+class AsgiApp:
+    """ASGI callable bọc Flask app: AsgiApp(create_app())."""
+
+    def __init__(self, app, engine_options=None):
+        self.app = app
+        app.config.setdefault("ASGI_THREADS", 16)
+        app.config.setdefault("ASYNC_DATABASE_URL", None)
+        app.config.setdefault("ASYNC_ENGINE_OPTIONS", {})
+        self.engine_options = {**app.config["ASYNC_ENGINE_OPTIONS"], **(engine_options or {})}
+        self.threads = ThreadPoolExecutor(app.config["ASGI_THREADS"], thread_name_prefix="asgi-sync")
+        self._engine = None
+
+    @property
+    def engine(self):
+        """Engine asyncio (tạo lười, gắn với event loop đầu tiên dùng nó)."""
+        if self._engine is None:
+            from sqlalchemy.ext.asyncio import create_async_engine
+
+            config = self.app.config
+            url = config["ASYNC_DATABASE_URL"] or async_database_url(config["SQLALCHEMY_DATABASE_URI"])
+            self._engine = create_async_engine(url, **self.engine_options)
+            if config.get("SQL_PROFILING"):
+                profiling.instrument(self._engine.sync_engine)
+        return self._engine
+
+    async def aclose(self):
+        """Đóng các connection asyncio (trước khi event loop đóng)."""
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+
+    def runs_async(self, environ):
+        adapter = self.app.url_map.bind_to_environ(environ)
+        try:
+            endpoint, _ = adapter.match()
+        except HTTPException:
+            return False
+        return endpoint in ASYNC_ENDPOINTS and not _wants_stream(environ["QUERY_STRING"])
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            raise RuntimeError(f"Không hỗ trợ ASGI scope {scope['type']}")
+
+        environ = build_environ(scope, await read_body(receive))
+        if self.runs_async(environ):
+            await self._run_async(environ, send)
+        else:
+            await self._run_threaded(environ, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.aclose()
+                self.threads.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    # ---- route async: Flask chạy trong greenlet, chờ DB = nhường event loop ----
+
+    def _call_flask(self, sync_session, environ):
+        response = {"body": []}
+
+        def on_start(status, headers):
+            response.update(status=status, headers=headers)
+
+        # app context đẩy trước để db.session (scoped theo app context) trỏ vào session asyncio;
+        # request context của Flask dùng lại context này, teardown đóng session như thường lệ
+        with self.app.app_context():
+            db.session.registry.set(sync_session)
+            call_wsgi(self.app, environ, on_start, response["body"].append)
+        return response
+
+    async def _run_async(self, environ, send):
+        from sqlalchemy.ext.asyncio import AsyncSession
+
+        async with AsyncSession(self.engine) as session:
+            response = await session.run_sync(self._call_flask, environ)
+        await send({"type": "http.response.start", "status": response["status"], "headers": response["headers"]})
+        await send({"type": "http.response.body", "body": b"".join(response["body"])})
+
+    # ---- route đồng bộ: thread pool, stream từng chunk (có backpressure) ----
+
+    async def _run_threaded(self, environ, send):
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=8)
+        stop = threading.Event()
+
+        def put(message):
+            if stop.is_set():
+                raise _Disconnected
+            asyncio.run_coroutine_threadsafe(queue.put(message), loop).result()
+
+        def run():
+            try:
+                call_wsgi(
+                    self.app, environ,
+                    lambda status, headers: put({"type": "http.response.start", "status": status, "headers": headers}),
+                    lambda chunk: put({"type": "http.response.body", "body": chunk, "more_body": True}),
+                )
+                put({"type": "http.response.body", "body": b"", "more_body": False})
+            except _Disconnected:
+                pass
+            except BaseException as exc:
+                try:
+                    put(exc)
+                except _Disconnected:
+                    pass
+
+        future = loop.run_in_executor(self.threads, run)
+        try:
+            while True:
+                message = await queue.get()
+                if isinstance(message, BaseException):
+                    raise message
+                await send(message)
+                if message["type"] == "http.response.body" and not message["more_body"]:
+                    break
+        finally:
+            # client ngắt giữa chừng / lỗi: báo thread dừng, đọc bỏ phần đang chờ để nó không kẹt ở put()
+            stop.set()
+            while not future.done():
+                getter = asyncio.ensure_future(queue.get())
+                await asyncio.wait({getter, future}, return_when=asyncio.FIRST_COMPLETED)
+                getter.cancel()
+        await future
@@ -0,0 +1,168 @@
+# utils/auth_context.py
+# Xác thực JWT không cần DB:
+# - Token mang sẵn role, email, customer_id, tutor_id, ver (token_version) trong claims
+# - Token đã verify chữ ký được cache (LRU nhỏ) -> mỗi token chỉ verify 1 lần
+# - Thu hồi: bảng users.token_version; process giữ bản nhỏ gọn (chỉ user có version > 0)
+#   và làm mới định kỳ, token có ver cũ hơn bị từ chối
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from functools import wraps
+
+from flask import current_app, g, jsonify, request
+from flask_jwt_extended import decode_token
+from jwt.exceptions import PyJWTError
+from flask_jwt_extended.exceptions import JWTExtendedException
+from sqlalchemy import select
+
+AuthContext = namedtuple("AuthContext", "user_id email role customer_id tutor_id version")
+
+
+class AuthError(Exception):
+    def __init__(self, message, status=401):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def auth_claims(user):
+    """Claims thêm vào access token lúc login."""
+    return {
+        "role": user.role,
+        "email": user.email,
+        "customer_id": user.customer_id,
+        "tutor_id": user.tutor_id,
+        "ver": user.token_version or 0,
+    }
+
+
+class VerifiedTokenCache:
+    """LRU: token -> claims đã verify. Hết hạn (exp) thì coi như không có."""
+
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token):
+        with self._lock:
+            claims = self._data.get(token)
+            if claims is None:
+                return None
+            if claims.get("exp") is not None and claims["exp"] <= time.time():
+                del self._data[token]
+                return None
+            self._data.move_to_end(token)
+            return claims
+
+    def set(self, token, claims):
+        with self._lock:
+            self._data[token] = claims
+            self._data.move_to_end(token)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+
+class RevocationTable:
+    """user_id -> token_version tối thiểu còn hợp lệ (chỉ lưu user từng thu hồi token)."""
+
+    def __init__(self, refresh_seconds=30):
+        self.refresh_seconds = refresh_seconds
+        self._versions = {}
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        from extensions import db
+        from models import User
+
+        rows = db.session.execute(select(User.id, User.token_version).where(User.token_version > 0))
+        versions = {user_id: version for user_id, version in rows}
+        with self._lock:
+            self._versions = versions
+            self._loaded_at = time.monotonic()
+
+    def min_version(self, user_id):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.refresh_seconds:
+            self._refresh()
+        return self._versions.get(user_id, 0)
+
+    def bump(self, user_id, version):
+        with self._lock:
+            self._versions[user_id] = max(version, self._versions.get(user_id, 0))
+
+
+def _state():
+    state = current_app.extensions.get("auth_context")
+    if state is None:
+        state = {
+            "tokens": VerifiedTokenCache(current_app.config.get("AUTH_TOKEN_CACHE_SIZE", 4096)),
+            "revocations": RevocationTable(current_app.config.get("AUTH_REVOCATION_REFRESH", 30)),
+        }
+        current_app.extensions["auth_context"] = state
+    return state
+
+
+def is_revoked(claims):
+    """Token có ver nhỏ hơn version tối thiểu của user -> đã bị thu hồi."""
+    try:
+        user_id = int(claims["sub"])
+    except (KeyError, TypeError, ValueError):
+        return True
+    return claims.get("ver", 0) < _state()["revocations"].min_version(user_id)
+
+
+def revoke_user_tokens(user):
+    """Thu hồi mọi token đã cấp cho user (VD logout, đổi mật khẩu). Caller commit."""
+    user.token_version = (user.token_version or 0) + 1
+    _state()["revocations"].bump(user.id, user.token_version)
+
+
+def _verify(token):
+    state = _state()
+    claims = state["tokens"].get(token)
+    if claims is None:
+        try:
+            claims = decode_token(token)   # verify chữ ký + exp
+        except (PyJWTError, JWTExtendedException) as exc:
+            raise AuthError(f"Token không hợp lệ: {exc}")
+        if claims.get("type") != "access":
+            raise AuthError("Cần access token")
+        state["tokens"].set(token, claims)
+    if is_revoked(claims):
+        raise AuthError("Token đã bị thu hồi")
+    return claims
+
+
+def current_auth():
+    """AuthContext của request hiện tại (verify 1 lần/request, lưu ở g)."""
+    if "auth_context" in g:
+        return g.auth_context
+
+    header = request.headers.get("Authorization", "")
+    scheme, _, token = header.partition(" ")
+    if scheme != "Bearer" or not token:
+        raise AuthError("Thiếu Authorization: Bearer <token>")
+
+    claims = _verify(token.strip())
+    g.auth_context = AuthContext(
+        user_id=int(claims["sub"]),
+        email=claims.get("email"),
+        role=claims.get("role"),
+        customer_id=claims.get("customer_id"),
+        tutor_id=claims.get("tutor_id"),
+        version=claims.get("ver", 0),
+    )
+    return g.auth_context
+
+
+def auth_required(fn):
+    """Giống @jwt_required() nhưng dùng cache token + claims, không query DB."""
+    @wraps(fn)
+    def decorated(*args, **kwargs):
+        try:
+            current_auth()
+        except AuthError as exc:
+            return jsonify({"error": exc.message}), exc.status
+        return fn(*args, **kwargs)
+    return decorated
@@ -0,0 +1,266 @@
+# utils/cache.py
+# Cache read-through cho response/entity.
+# - Mặc định: LRU trong bộ nhớ process, có TTL.
+# - Tùy chọn: backend dùng chung (Redis) qua cùng interface CacheBackend.
+# Listing dùng "generation" theo namespace: ghi dữ liệu -> tăng generation -> key cũ tự hết hiệu lực.
+# Có read replica: vừa xóa/bump namespace thì trong CACHE_PRIMARY_FILL_SECONDS giây, cache miss
+# của namespace đó nạp từ primary (replica đang trễ không được ghi lại bản cũ vào cache).
+import json
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from contextlib import nullcontext
+
+
+class CacheBackend:
+    """Interface cho backend cache. Giá trị phải serialize được sang JSON."""
+
+    def get(self, key):
+        """Trả về giá trị hoặc None nếu không có / hết hạn."""
+        raise NotImplementedError
+
+    def get_many(self, keys):
+        """{key: value} cho các key đang có; backend mạng nên ghi đè để lấy trong 1 round trip."""
+        values = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                values[key] = value
+        return values
+
+    def set(self, key, value, ttl):
+        raise NotImplementedError
+
+    def delete(self, *keys):
+        raise NotImplementedError
+
+    def get_counter(self, key):
+        """Đọc bộ đếm (không bị LRU đẩy ra, không hết hạn)."""
+        raise NotImplementedError
+
+    def incr(self, key):
+        raise NotImplementedError
+
+    def size(self):
+        return None
+
+
+class NullCache(CacheBackend):
+    """Tắt cache (CACHE_BACKEND = "null")."""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl):
+        pass
+
+    def delete(self, *keys):
+        pass
+
+    def get_counter(self, key):
+        return 0
+
+    def incr(self, key):
+        return 0
+
+    def size(self):
+        return 0
+
+
+class LRUCache(CacheBackend):
+    """LRU + TTL trong bộ nhớ, an toàn đa luồng."""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._data = OrderedDict()      # key -> (expires_at, value)
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def get_counter(self, key):
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def size(self):
+        return len(self._data)
+
+
+class RedisCache(CacheBackend):
+    """Backend dùng chung giữa các worker/máy (cần cài `redis`)."""
+
+    def __init__(self, url, prefix="baitap:"):
+        import redis  # chỉ import khi thật sự dùng
+
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def get(self, key):
+        raw = self._client.get(self._prefix + key)
+        return None if raw is None else json.loads(raw)
+
+    def get_many(self, keys):
+        keys = list(keys)
+        if not keys:
+            return {}
+        raws = self._client.mget([self._prefix + k for k in keys])
+        return {key: json.loads(raw) for key, raw in zip(keys, raws) if raw is not None}
+
+    def set(self, key, value, ttl):
+        self._client.set(self._prefix + key, json.dumps(value, default=str), ex=max(1, int(ttl)))
+
+    def delete(self, *keys):
+        if keys:
+            self._client.delete(*[self._prefix + k for k in keys])
+
+    def get_counter(self, key):
+        return int(self._client.get(self._prefix + "ctr:" + key) or 0)
+
+    def incr(self, key):
+        return self._client.incr(self._prefix + "ctr:" + key)
+
+
+class ResponseCache:
+    """Extension cache dùng trong route (khởi tạo trong extensions.py)."""
+
+    def __init__(self, app=None):
+        self.backend = NullCache()
+        self.default_ttl = 60
+        self.primary_fill_seconds = 0
+        self._stats = defaultdict(lambda: {"hits": 0, "misses": 0, "invalidations": 0})
+        self._stats_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("CACHE_BACKEND", "memory")     # memory | redis | null
+        app.config.setdefault("CACHE_DEFAULT_TTL", 60)
+        app.config.setdefault("CACHE_MAX_ENTRIES", 10000)
+        app.config.setdefault("CACHE_REDIS_URL", "redis://localhost:6379/0")
+        # mặc định = thời gian sticky của replica (db_routing.init_app chạy trước); không có replica -> 0
+        app.config.setdefault(
+            "CACHE_PRIMARY_FILL_SECONDS",
+            app.config.get("DB_REPLICA_STICKY_SECONDS", 5) if app.config.get("SQLALCHEMY_REPLICA_URIS") else 0,
+        )
+
+        kind = app.config["CACHE_BACKEND"]
+        if kind == "redis":
+            self.backend = RedisCache(app.config["CACHE_REDIS_URL"])
+        elif kind == "memory":
+            self.backend = LRUCache(app.config["CACHE_MAX_ENTRIES"])
+        else:
+            self.backend = NullCache()
+        self.default_ttl = app.config["CACHE_DEFAULT_TTL"]
+        self.primary_fill_seconds = app.config["CACHE_PRIMARY_FILL_SECONDS"]
+        app.extensions["response_cache"] = self
+
+    def _count(self, namespace, field, n=1):
+        with self._stats_lock:
+            self._stats[namespace][field] += n
+
+    def _full_key(self, namespace, key, versioned):
+        if versioned:
+            return f"{namespace}:v{self.backend.get_counter(namespace)}:{key}"
+        return f"{namespace}:{key}"
+
+    def _mark_written(self, namespace):
+        if self.primary_fill_seconds:
+            self.backend.set(f"{namespace}:written", time.time(), self.primary_fill_seconds)
+
+    def _filling(self, namespace):
+        """Namespace vừa bị vô hiệu -> loader đọc primary, ngược lại đọc như route (có thể là replica)."""
+        if self.primary_fill_seconds and self.backend.get(f"{namespace}:written") is not None:
+            from utils.db_routing import primary  # tránh import vòng cache <-> extensions
+            return primary()
+        return nullcontext()
+
+    def get_or_set(self, namespace, key, loader, ttl=None, versioned=False):
+        """Read-through: có trong cache thì trả luôn, không thì gọi loader() rồi lưu lại.
+
+        versioned=True: key gắn generation của namespace (dùng cho listing).
+        """
+        full_key = self._full_key(namespace, key, versioned)
+        value = self.backend.get(full_key)
+        if value is not None:
+            self._count(namespace, "hits")
+            return value
+
+        self._count(namespace, "misses")
+        with self._filling(namespace):
+            value = loader()
+        if value is not None:
+            self.backend.set(full_key, value, ttl or self.default_ttl)
+        return value
+
+    def get_or_set_many(self, namespace, keys, loader, ttl=None, versioned=False):
+        """Như get_or_set cho nhiều key: 1 lần đọc cache, loader(các key thiếu) -> {key: value}.
+
+        Key loader không trả về (VD không tồn tại) thì không có trong kết quả.
+        """
+        keys = list(keys)
+        full_keys = {key: self._full_key(namespace, key, versioned) for key in keys}
+        cached = self.backend.get_many(full_keys.values())
+        values = {key: cached[full] for key, full in full_keys.items() if full in cached}
+        self._count(namespace, "hits", len(values))
+
+        missing = [key for key in keys if key not in values]
+        if missing:
+            self._count(namespace, "misses", len(missing))
+            with self._filling(namespace):
+                loaded = loader(missing)
+            for key, value in loaded.items():
+                if value is not None:
+                    self.backend.set(full_keys[key], value, ttl or self.default_ttl)
+                    values[key] = value
+        return values
+
+    def delete(self, namespace, *keys, versioned=False):
+        """Xóa entry cụ thể (VD tutor:5 sau khi sửa gia sư 5)."""
+        self.backend.delete(*[self._full_key(namespace, k, versioned) for k in keys])
+        self._mark_written(namespace)
+        self._count(namespace, "invalidations", len(keys))
+
+    def bump(self, namespace):
+        """Vô hiệu toàn bộ key versioned của namespace (listing) trong O(1)."""
+        self.backend.incr(namespace)
+        self._mark_written(namespace)
+        self._count(namespace, "invalidations")
+
+    def stats(self):
+        with self._stats_lock:
+            namespaces = {ns: dict(v) for ns, v in self._stats.items()}
+        for counters in namespaces.values():
+            lookups = counters["hits"] + counters["misses"]
+            counters["hit_ratio"] = round(counters["hits"] / lookups, 4) if lookups else None
+        return {
+            "backend": type(self.backend).__name__,
+            "size": self.backend.size(),
+            "namespaces": namespaces,
+        }
@@ -0,0 +1,56 @@
+# utils/compression.py
+# Nén response (gzip, hoặc brotli nếu có cài) theo header Accept-Encoding của client.
+# Chỉ nén body đủ lớn (COMPRESS_MIN_SIZE) và kiểu text/JSON; response stream để nguyên.
+import gzip
+
+from flask import current_app, request
+
+try:
+    import brotli  # tùy chọn: pip install brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = ("application/json", "application/x-ndjson", "text/html", "text/plain")
+
+
+def _choose_encoding(accept):
+    if brotli is not None and accept["br"]:
+        return "br"
+    if accept["gzip"]:
+        return "gzip"
+    return None
+
+
+def init_app(app):
+    app.config.setdefault("COMPRESS_MIN_SIZE", 1024)    # byte, body nhỏ hơn thì nén không đáng
+    app.config.setdefault("COMPRESS_GZIP_LEVEL", 6)
+    app.config.setdefault("COMPRESS_BROTLI_QUALITY", 4)  # 4-5: nhanh, nén tốt hơn gzip 6
+    app.after_request(compress_response)
+
+
+def compress_response(response):
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or response.is_streamed
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = _choose_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+
+    body = response.get_data()
+    if len(body) < current_app.config["COMPRESS_MIN_SIZE"]:
+        return response
+
+    if encoding == "br":
+        data = brotli.compress(body, quality=current_app.config["COMPRESS_BROTLI_QUALITY"])
+    else:
+        data = gzip.compress(body, compresslevel=current_app.config["COMPRESS_GZIP_LEVEL"])
+    response.set_data(data)
+    response.headers["Content-Encoding"] = encoding
+    return response
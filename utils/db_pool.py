@@ -0,0 +1,97 @@
+# utils/db_pool.py
+# Đo thời gian chờ lấy connection từ pool của SQLAlchemy.
+# Pool cạn khi tải cao -> request chờ ở pool.connect(); trước đây chỉ thấy timeout khó hiểu,
+# giờ có số liệu (GET /api/metrics -> db_pool) và log cảnh báo kèm trạng thái pool.
+import logging
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger("db.pool")
+
+
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=2048)     # ms, các lần checkout gần nhất
+        self.checkouts = 0
+        self.timeouts = 0
+        self.slow_checkouts = 0
+        self.max_wait_ms = 0.0
+        self.warn_ms = 100
+
+    def record(self, wait_ms):
+        with self._lock:
+            self.checkouts += 1
+            self._waits.append(wait_ms)
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            if wait_ms >= self.warn_ms:
+                self.slow_checkouts += 1
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self):
+        with self._lock:
+            samples = sorted(self._waits)
+            data = {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "slow_checkouts": self.slow_checkouts,
+                "max_wait_ms": round(self.max_wait_ms, 2),
+            }
+
+        def pct(p):
+            return round(samples[min(len(samples) - 1, int(p * len(samples)))], 2) if samples else None
+
+        data["wait_ms"] = {"p50": pct(0.5), "p95": pct(0.95), "p99": pct(0.99)}
+        return data
+
+
+pool_stats = PoolStats()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool ghi lại thời gian chờ mỗi lần checkout (dùng qua SQLALCHEMY_ENGINE_OPTIONS)."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeout:
+            pool_stats.record_timeout()
+            logger.error("DB pool timeout sau %.0f ms: %s", (time.perf_counter() - started) * 1000, self.status())
+            raise
+        wait_ms = (time.perf_counter() - started) * 1000
+        pool_stats.record(wait_ms)
+        if wait_ms >= pool_stats.warn_ms:
+            logger.warning("Chờ DB pool %.0f ms: %s", wait_ms, self.status())
+        return conn
+
+
+def install(app, engine):
+    """Gắn các thiết lập runtime cho engine sau khi Flask-SQLAlchemy tạo xong."""
+    pool_stats.warn_ms = app.config.get("DB_POOL_WAIT_WARN_MS", 100)
+
+    timeout_ms = app.config.get("DB_STATEMENT_TIMEOUT_MS")
+    if timeout_ms and engine.dialect.name == "postgresql" and app.config.get("DB_PGBOUNCER"):
+        # PgBouncer (transaction pooling) không nhận startup option "-c statement_timeout"
+        # và SET cấp session sẽ rò sang client khác -> SET LOCAL đầu mỗi transaction
+        @event.listens_for(engine, "begin")
+        def _statement_timeout(conn):
+            conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+
+
+def pool_status(engine):
+    """Số liệu pool hiện tại + thống kê thời gian chờ."""
+    pool = engine.pool
+    data = {"class": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, QueuePool):
+        data.update(size=pool.size(), checked_out=pool.checkedout(), overflow=pool.overflow())
+    data.update(pool_stats.snapshot())
+    return data
@@ -0,0 +1,164 @@
+# utils/db_routing.py
+# Đọc từ replica cho các route chỉ đọc (@read_only), ghi luôn vào primary.
+# - Replica cấu hình bằng SQLALCHEMY_REPLICA_URIS -> thêm vào SQLALCHEMY_BINDS ("replica_0", ...)
+# - Mỗi request @read_only chọn 1 replica theo vòng (round-robin), cả request dùng chung replica đó
+# - Read-your-writes: request có ghi -> cookie + map theo user_id, các lần đọc sau của
+#   cùng client/user trong DB_REPLICA_STICKY_SECONDS giây đi thẳng vào primary
+# - primary(): đọc primary trong 1 khối (cache nạp lại ngay sau khi ghi, xem utils/cache.py)
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+
+STICKY_COOKIE = "db_primary_until"
+REPLICA_PREFIX = "replica_"
+
+
+class RoutingSession(Session):
+    """Session chọn engine replica khi request đang ở chế độ chỉ đọc (khai báo trong extensions.py)."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is not None or not has_request_context():
+            return engine
+
+        if self._flushing or getattr(clause, "is_dml", False):
+            # có ghi -> primary, và các lần đọc sau trong request cũng về primary
+            g.db_wrote = True
+            return engine
+
+        replica = g.get("db_replica")
+        if replica is None or g.get("db_wrote") or engine is not self._db.engines.get(None):
+            return engine
+        return replica
+
+
+class ReplicaRouter:
+    """Danh sách replica + map sticky theo user, lưu ở app.extensions["db_routing"]."""
+
+    def __init__(self, keys, sticky_seconds):
+        self.keys = keys
+        self.sticky_seconds = sticky_seconds
+        self._next = itertools.count()
+        self._sticky = {}        # user_id -> monotonic hết hạn
+        self._lock = threading.Lock()
+        self._counters = {"replica_reads": 0, "primary_reads": 0, "sticky_reads": 0, "primary_fills": 0}
+
+    def pick(self):
+        """Replica kế tiếp theo vòng; không cấu hình replica -> None (đọc primary)."""
+        if not self.keys:
+            return None
+        from extensions import db
+        return db.engines[self.keys[next(self._next) % len(self.keys)]]
+
+    def mark_user(self, user_id):
+        until = time.monotonic() + self.sticky_seconds
+        with self._lock:
+            self._sticky[user_id] = until
+            if len(self._sticky) > 10000:
+                now = time.monotonic()
+                self._sticky = {k: v for k, v in self._sticky.items() if v > now}
+
+    def user_is_sticky(self, user_id):
+        with self._lock:
+            until = self._sticky.get(user_id)
+        return until is not None and until > time.monotonic()
+
+    def count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+        return {**counters, "replicas": list(self.keys), "sticky_seconds": self.sticky_seconds}
+
+
+def init_app(app):
+    """Gọi TRƯỚC db.init_app: thêm replica vào SQLALCHEMY_BINDS và gắn after_request."""
+    app.config.setdefault("SQLALCHEMY_REPLICA_URIS", [])
+    app.config.setdefault("DB_REPLICA_STICKY_SECONDS", 5)
+
+    binds = dict(app.config.get("SQLALCHEMY_BINDS") or {})
+    keys = []
+    for i, uri in enumerate(app.config["SQLALCHEMY_REPLICA_URIS"]):
+        key = f"{REPLICA_PREFIX}{i}"
+        binds[key] = uri
+        keys.append(key)
+    app.config["SQLALCHEMY_BINDS"] = binds
+
+    router = ReplicaRouter(keys, app.config["DB_REPLICA_STICKY_SECONDS"])
+    app.extensions["db_routing"] = router
+    app.after_request(_remember_write)
+    return router
+
+
+def _router():
+    return current_app.extensions["db_routing"]
+
+
+def _auth_user_id():
+    """user_id từ Bearer token nếu có (không có/không hợp lệ -> None)."""
+    if not request.headers.get("Authorization"):
+        return None
+    from utils.auth_context import AuthError, current_auth
+    try:
+        return current_auth().user_id
+    except AuthError:
+        return None
+
+
+def _is_sticky(router):
+    until = request.cookies.get(STICKY_COOKIE, type=float)
+    if until is not None and until > time.time():
+        return True
+    user_id = _auth_user_id()
+    return user_id is not None and router.user_is_sticky(user_id)
+
+
+def _remember_write(response):
+    if g.get("db_wrote") and response.status_code < 400:
+        router = _router()
+        if router.keys:
+            until = time.time() + router.sticky_seconds
+            response.set_cookie(
+                STICKY_COOKIE, f"{until:.3f}", max_age=int(router.sticky_seconds) + 1, httponly=True
+            )
+            user_id = _auth_user_id()
+            if user_id is not None:
+                router.mark_user(user_id)
+    return response
+
+
+@contextmanager
+def primary():
+    """Query trong khối này đọc primary dù request đang dùng replica."""
+    replica = g.pop("db_replica", None) if has_request_context() else None
+    if replica is None:
+        yield
+        return
+    _router().count("primary_fills")
+    try:
+        yield
+    finally:
+        g.db_replica = replica
+
+
+def read_only(fn):
+    """Route chỉ đọc -> chạy trên replica (trừ khi client/user vừa ghi)."""
+    @wraps(fn)
+    def decorated(*args, **kwargs):
+        router = _router()
+        if not router.keys:
+            router.count("primary_reads")
+        elif _is_sticky(router):
+            router.count("sticky_reads")
+        else:
+            g.db_replica = router.pick()
+            router.count("replica_reads")
+        return fn(*args, **kwargs)
+    return decorated
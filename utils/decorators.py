@@ -1,18 +1,19 @@
 # utils/decorators.py
 from functools import wraps
 from flask import jsonify
-from flask_jwt_extended import verify_jwt_in_request, get_jwt
+from utils.auth_context import AuthError, current_auth
 
 def role_required(*roles):
     """Decorator: chỉ cho phép các user có role trong roles."""
     def wrapper(fn):
         @wraps(fn)
         def decorated(*args, **kwargs):
-            # Bắt buộc phải có token
-            verify_jwt_in_request()
-            claims = get_jwt()
-            user_role = claims.get("role")
-            if user_role not in roles:
+            # Bắt buộc phải có token (verify 1 lần, role đọc từ claims - không query DB)
+            try:
+                auth = current_auth()
+            except AuthError as exc:
+                return jsonify({"error": exc.message}), exc.status
+            if auth.role not in roles:
                 return jsonify({"error": "Forbidden: insufficient role"}), 403
             return fn(*args, **kwargs)
         return decorated
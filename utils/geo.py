@@ -0,0 +1,92 @@
+# utils/geo.py
+# Tìm theo khoảng cách không cần PostGIS: geohash (chuỗi base32, tiền tố chung = ô lưới chứa nhau).
+# - Mỗi gia sư lưu geohash độ chính xác GEOHASH_PRECISION, có B-tree index (LIKE 'tiền_tố%')
+# - Tìm bán kính R: chọn độ dài tiền tố sao cho 1 ô >= R, lấy ô chứa tâm + 8 ô xung quanh
+#   -> chỉ đọc gia sư trong 9 ô đó, rồi mới tính khoảng cách chính xác (haversine)
+import math
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 9            # ô ~4.8m x 4.8m
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+
+def parse_point(lat, lon):
+    """(lat, lon) từ input API -> (float, float). Sai kiểu / ngoài phạm vi -> ValueError."""
+    try:
+        lat, lon = float(lat), float(lon)
+    except (TypeError, ValueError):
+        raise ValueError("latitude/longitude phải là số")
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError("latitude phải trong [-90, 90], longitude trong [-180, 180]")
+    return lat, lon
+
+
+def encode(lat, lon, precision=GEOHASH_PRECISION):
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars = []
+    bits, value, even = 0, 0, True
+    while len(chars) < precision:
+        rng, coord = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        value <<= 1
+        if coord >= mid:
+            value |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+def cell_size(precision):
+    """Kích thước 1 ô (độ lat, độ lon) ở độ dài tiền tố `precision`."""
+    total = 5 * precision
+    lon_bits = (total + 1) // 2
+    lat_bits = total // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def precision_for_radius(radius_km, lat):
+    """Tiền tố dài nhất mà 1 ô vẫn rộng >= bán kính (tính ở vĩ độ xa xích đạo nhất của vùng tìm)."""
+    edge_lat = min(89.0, abs(lat) + radius_km / KM_PER_DEGREE)
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        dlat, dlon = cell_size(precision)
+        height = dlat * KM_PER_DEGREE
+        width = dlon * KM_PER_DEGREE * math.cos(math.radians(edge_lat))
+        if min(height, width) >= radius_km:
+            return precision
+    return 1
+
+
+def covering_cells(lat, lon, radius_km):
+    """Các tiền tố geohash (ô chứa tâm + 8 ô kề) phủ kín hình tròn bán kính radius_km."""
+    precision = precision_for_radius(radius_km, lat)
+    dlat, dlon = cell_size(precision)
+    cells = set()
+    for i in (-1, 0, 1):
+        for j in (-1, 0, 1):
+            cell_lat = max(-90.0, min(90.0, lat + i * dlat))
+            cell_lon = (lon + j * dlon + 180.0) % 360.0 - 180.0
+            cells.add(encode(cell_lat, cell_lon, precision))
+    return sorted(cells)
+
+
+def bounding_box(lat, lon, radius_km):
+    """(min_lat, max_lat, min_lon, max_lon) bao hình tròn - lọc thô trước khi tính haversine."""
+    dlat = radius_km / KM_PER_DEGREE
+    dlon = radius_km / (KM_PER_DEGREE * max(0.01, math.cos(math.radians(min(89.0, abs(lat) + dlat)))))
+    return lat - dlat, lat + dlat, lon - dlon, lon + dlon
+
+
+def distance_km(lat1, lon1, lat2, lon2):
+    """Khoảng cách đường tròn lớn (haversine)."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
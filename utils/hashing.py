@@ -0,0 +1,133 @@
+# utils/hashing.py
+# Chạy bcrypt trên 1 thread pool riêng, giới hạn số việc đang chờ.
+# - bcrypt nhả GIL khi hash -> thread pool tận dụng được nhiều core
+# - Pool đầy -> HasherSaturated (route trả 429) thay vì để login burst chiếm hết worker
+# - PASSWORD_HASH_WORKERS (mặc định nửa số core): số core tối đa bcrypt được dùng cùng lúc, phần còn
+#   lại dành cho route khác (tìm kiếm, ...). Thread của request vẫn chờ kết quả, nhưng số thread
+#   chờ bị chặn bởi PASSWORD_HASH_QUEUE nên login burst không giữ hết thread của server
+# - Cost factor cấu hình được (BCRYPT_LOG_ROUNDS); hash cũ có cost thấp hơn được hash lại khi login
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+
+class HasherSaturated(Exception):
+    """Hàng đợi hash đã đầy (hoặc chờ quá lâu) -> trả 429 cho client."""
+
+    def __init__(self, retry_after=1):
+        super().__init__("password hasher saturated")
+        self.retry_after = retry_after
+
+
+def hash_cost(password_hash):
+    """Đọc cost factor từ hash bcrypt ("$2b$12$..." -> 12). Không đọc được -> None."""
+    try:
+        return int(password_hash.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    """Extension: hash/check mật khẩu qua pool có giới hạn (khởi tạo trong extensions.py)."""
+
+    def __init__(self, bcrypt, app=None):
+        self._bcrypt = bcrypt
+        self._executor = None
+        self._executor_pid = None
+        self._slots = None
+        self._lock = threading.Lock()
+        self.rounds = 12
+        self.timeout = 5.0
+        self._latencies = deque(maxlen=1024)   # ms, các lần gần nhất để tính p50/p95
+        self._counters = {"hashed": 0, "checked": 0, "rejected": 0, "timeouts": 0, "rehashed": 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("BCRYPT_LOG_ROUNDS", 12)
+        # 0/None -> nửa số core: login burst không chiếm hết CPU của process
+        workers = app.config.get("PASSWORD_HASH_WORKERS") or max(1, (os.cpu_count() or 2) // 2)
+        app.config["PASSWORD_HASH_WORKERS"] = workers
+        app.config.setdefault("PASSWORD_HASH_QUEUE", workers * 4)    # số việc được chờ thêm
+        app.config.setdefault("PASSWORD_HASH_TIMEOUT", 5.0)          # giây chờ kết quả tối đa
+
+        self.rounds = app.config["BCRYPT_LOG_ROUNDS"]
+        self.timeout = app.config["PASSWORD_HASH_TIMEOUT"]
+        self.workers = app.config["PASSWORD_HASH_WORKERS"]
+        self._slots = threading.BoundedSemaphore(self.workers + app.config["PASSWORD_HASH_QUEUE"])
+        app.extensions["password_hasher"] = self
+
+    def _pool(self):
+        # tạo lười + tạo lại sau fork (thread không sống sót qua fork)
+        pid = os.getpid()
+        if self._executor is None or self._executor_pid != pid:
+            with self._lock:
+                if self._executor is None or self._executor_pid != pid:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix="bcrypt"
+                    )
+                    self._executor_pid = pid
+        return self._executor
+
+    def _run(self, counter, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            self._count("rejected")
+            raise HasherSaturated()
+
+        started = time.perf_counter()
+
+        def task():
+            try:
+                return fn(*args)
+            finally:
+                self._slots.release()
+
+        future = self._pool().submit(task)
+        try:
+            result = future.result(timeout=self.timeout)
+        except FutureTimeout:
+            self._count("timeouts")
+            raise HasherSaturated(retry_after=int(self.timeout))
+
+        self._count(counter)
+        with self._lock:
+            self._latencies.append((time.perf_counter() - started) * 1000)
+        return result
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def hash(self, raw_password):
+        """bcrypt hash với cost hiện tại -> str."""
+        return self._run(
+            "hashed", lambda: self._bcrypt.generate_password_hash(raw_password, self.rounds).decode("utf-8")
+        )
+
+    def check(self, password_hash, raw_password):
+        return self._run("checked", self._bcrypt.check_password_hash, password_hash, raw_password)
+
+    def needs_rehash(self, password_hash):
+        """Hash được tạo với cost thấp hơn cấu hình hiện tại."""
+        cost = hash_cost(password_hash)
+        return cost is not None and cost < self.rounds
+
+    def record_rehash(self):
+        self._count("rehashed")
+
+    def stats(self):
+        with self._lock:
+            samples = sorted(self._latencies)
+            counters = dict(self._counters)
+
+        def pct(p):
+            return round(samples[min(len(samples) - 1, int(p * len(samples)))], 2) if samples else None
+
+        return {
+            **counters,
+            "rounds": self.rounds,
+            "workers": self.workers,
+            "latency_ms": {"p50": pct(0.5), "p95": pct(0.95), "max": round(samples[-1], 2) if samples else None},
+        }
@@ -0,0 +1,70 @@
+# utils/http_cache.py
+# Conditional GET: ETag/Last-Modified lấy từ updated_at.
+# - Client gửi If-None-Match (hoặc If-Modified-Since) khớp -> 304, không serialize body
+# - Chi tiết: validator nằm sẵn trong entry cache -> 304 không cần query
+# - Listing: validator từ (id, updated_at) của các dòng trong trang, hoặc max(updated_at) + count
+import hashlib
+import json
+from datetime import datetime, timezone
+
+from flask import current_app, jsonify, request
+
+
+def etag_for(*parts):
+    """Giá trị ETag ngắn từ các thành phần (id, updated_at, tham số query, ...)."""
+    raw = "|".join(str(p) for p in parts).encode()
+    return hashlib.blake2b(raw, digest_size=12).hexdigest()
+
+
+def body_digest(payload):
+    """Hash nội dung (tính 1 lần lúc nạp cache): 2 lần sửa trong cùng 1 giây vẫn đổi ETag
+    (updated_at của SQLite chỉ chính xác tới giây)."""
+    raw = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":")).encode()
+    return hashlib.blake2b(raw, digest_size=12).hexdigest()
+
+
+def to_timestamp(value):
+    """updated_at (naive, UTC) -> epoch giây; lưu được trong cache JSON/Redis."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def is_not_modified(etag, modified=None):
+    """If-None-Match ưu tiên hơn If-Modified-Since (RFC 9110)."""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    since = request.if_modified_since
+    return modified is not None and since is not None and modified <= int(since.timestamp())
+
+
+def _set_validators(response, etag, modified):
+    response.set_etag(etag, weak=True)
+    if modified is not None:
+        response.last_modified = modified
+    # client luôn hỏi lại (rẻ vì có 304), không dùng bản cũ khi chưa xác thực
+    response.cache_control.no_cache = True
+    return response
+
+
+def conditional_json(etag, modified, payload):
+    """304 nếu client đã có bản mới nhất, ngược lại jsonify(payload()) kèm ETag/Last-Modified.
+
+    payload: hàm trả dict/list - chỉ được gọi khi thật sự cần gửi body.
+    """
+    if is_not_modified(etag, modified):
+        response = current_app.response_class(status=304)
+    else:
+        response = jsonify(payload())
+    return _set_validators(response, etag, modified)
+
+
+def validators_for_rows(rows, body, *parts):
+    """(etag, modified) cho 1 trang listing từ (id, updated_at) của từng dòng + nội dung trang."""
+    etag = etag_for(*parts, body_digest(body), *[(row.id, row.updated_at) for row in rows])
+    stamps = [to_timestamp(row.updated_at) for row in rows]
+    return etag, max((s for s in stamps if s is not None), default=None)
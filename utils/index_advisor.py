@@ -0,0 +1,229 @@
+# utils/index_advisor.py
+# Gợi ý index (CLI: flask db-advise):
+# - Khóa ngoại chưa có index nào bắt đầu bằng cột đó (xóa cascade / join theo FK sẽ quét cả bảng)
+# - Cột lọc/sắp xếp trong các câu SQL ghi lại được (chạy kịch bản benchmark) mà chưa có index
+#   -> gợi ý index ghép: các cột so sánh bằng trước, cột khoảng/ORDER BY sau
+# - EXPLAIN câu mẫu cho từng gợi ý, sinh file migration Alembic tạo các index đó
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from sqlalchemy import event, select
+
+from utils.profiling import statement_pattern
+
+_EQUALITY = r"=|\bIN\b|\bIS\b"
+_RANGE = r"<=|>=|<>|!=|<|>|\bLIKE\b|\bBETWEEN\b"
+_PREDICATE = re.compile(rf"\b(\w+)\.(\w+)\s*({_EQUALITY}|{_RANGE})", re.IGNORECASE)
+_ORDER_BY = re.compile(r"\bORDER BY\b(.*?)(?:\bLIMIT\b|\bOFFSET\b|\bFOR UPDATE\b|$)", re.IGNORECASE | re.DOTALL)
+_COLUMN_REF = re.compile(r"\b(\w+)\.(\w+)\b")
+
+
+@dataclass
+class Recommendation:
+    table: str
+    columns: list
+    reasons: list = field(default_factory=list)
+    hits: int = 0                     # số lần các câu liên quan chạy trong lúc ghi
+    sample: tuple = None              # (statement, parameters) để EXPLAIN
+
+    @property
+    def name(self):
+        return f"ix_{self.table}_{'_'.join(self.columns)}"
+
+
+class QueryRecorder:
+    """Ghi lại mẫu câu SQL (kèm 1 bộ tham số thật) chạy trên các engine trong lúc `with`."""
+
+    def __init__(self, engines):
+        self.engines = list(engines)
+        self.patterns = {}            # pattern -> [count, statement, parameters]
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if executemany or not statement.lstrip().upper().startswith("SELECT"):
+            return
+        entry = self.patterns.setdefault(statement_pattern(statement), [0, statement, parameters])
+        entry[0] += 1
+
+    def __enter__(self):
+        for engine in self.engines:
+            event.listen(engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc):
+        for engine in self.engines:
+            event.remove(engine, "before_cursor_execute", self._record)
+
+
+def index_prefixes(table):
+    """Danh sách bộ cột có index (PK, unique, Index) của 1 bảng, theo đúng thứ tự cột."""
+    prefixes = []
+    if table.primary_key.columns:
+        prefixes.append([c.name for c in table.primary_key.columns])
+    for index in table.indexes:
+        prefixes.append([c.name for c in index.columns])
+    for constraint in table.constraints:
+        if constraint.__class__.__name__ == "UniqueConstraint":
+            prefixes.append([c.name for c in constraint.columns])
+    for column in table.columns:
+        if column.unique:
+            prefixes.append([column.name])
+    return [p for p in prefixes if p]
+
+
+def is_covered(table, equality, then=None):
+    """Có index mà các cột đầu là `equality` (thứ tự tùy ý), tiếp theo là `then` (nếu có)?"""
+    size = len(equality)
+    for prefix in index_prefixes(table):
+        if set(prefix[:size]) != set(equality):
+            continue
+        if then is None or (len(prefix) > size and prefix[size] == then):
+            return True
+    return False
+
+
+def unindexed_foreign_keys(metadata):
+    found = []
+    for table in metadata.sorted_tables:
+        for fk in table.foreign_key_constraints:
+            columns = [c.name for c in fk.columns]
+            if not is_covered(table, columns):
+                found.append(Recommendation(
+                    table.name, columns,
+                    [f"khóa ngoại -> {fk.referred_table.name} (join/xóa cascade quét cả bảng)"],
+                ))
+    return found
+
+
+def _predicates(statement, tables):
+    """{bảng: (cột so sánh bằng, cột khoảng, cột ORDER BY)} từ phần sau FROM của câu SQL."""
+    _, _, body = statement.partition(" FROM ")
+    result = {}
+
+    def slot(table):
+        return result.setdefault(table, ([], [], []))
+
+    order = _ORDER_BY.search(body)
+    where = body[:order.start()] if order else body
+    for table, column, op in _PREDICATE.findall(where):
+        if table not in tables or column not in tables[table].columns:
+            continue
+        kind = 0 if re.fullmatch(_EQUALITY, op.strip(), re.IGNORECASE) else 1
+        if column not in slot(table)[kind]:
+            slot(table)[kind].append(column)
+    if order:
+        for table, column in _COLUMN_REF.findall(order.group(1)):
+            if table in tables and column in tables[table].columns and column not in slot(table)[2]:
+                slot(table)[2].append(column)
+    return result
+
+
+def pattern_recommendations(patterns, metadata):
+    """Gợi ý từ các câu đã ghi: (cột bằng..., cột khoảng/sắp xếp đầu tiên) chưa có index phủ."""
+    tables = metadata.tables
+    found = {}
+    for count, statement, parameters in patterns.values():
+        normalized = re.sub(r"\s+", " ", statement)
+        for table_name, (equality, ranges, order) in _predicates(normalized, tables).items():
+            table = tables[table_name]
+            then = next((c for c in ranges + order if c not in equality), None)
+            if equality and is_covered(table, equality):
+                if then is None or is_covered(table, equality, then):
+                    continue
+                # đã có index cho phần bằng: chỉ gợi ý ghép khi cột sau là sắp xếp (tránh sort)
+                if then not in order:
+                    continue
+            if not equality and (then is None or is_covered(table, [then])):
+                continue
+            columns = equality + ([then] if then else [])
+            key = (table_name, tuple(columns))
+            rec = found.get(key)
+            if rec is None:
+                rec = found[key] = Recommendation(table_name, columns, sample=(statement, parameters))
+                rec.reasons.append(f"lọc/sắp xếp trong: {statement_pattern(normalized)[:160]}")
+            rec.hits += count
+    return list(found.values())
+
+
+def merge(recommendations):
+    """Gộp gợi ý: index (a, b) đã phủ gợi ý (a) -> bỏ (a), cộng lý do + số lần."""
+    merged = []
+    for rec in sorted(recommendations, key=lambda r: -len(r.columns)):
+        target = next(
+            (m for m in merged
+             if m.table == rec.table and set(m.columns[:len(rec.columns)]) == set(rec.columns)),
+            None,
+        )
+        if target is None:
+            merged.append(rec)
+            continue
+        target.reasons.extend(r for r in rec.reasons if r not in target.reasons)
+        target.hits += rec.hits
+        target.sample = target.sample or rec.sample
+    return sorted(merged, key=lambda r: (r.table, r.columns))
+
+
+def explain(session, metadata, rec):
+    """Kế hoạch thực thi của câu mẫu (hoặc câu tra theo FK) - xem có Seq Scan / SCAN không."""
+    bind = session.get_bind()
+    dialect = bind.dialect.name
+    prefix = "EXPLAIN " if dialect == "postgresql" else "EXPLAIN QUERY PLAN "
+    if rec.sample is not None:
+        statement, parameters = rec.sample
+    else:
+        table = rec.table
+        where = " AND ".join(f"{c} = {_placeholder(dialect, c)}" for c in rec.columns)
+        statement = f"SELECT * FROM {table} WHERE {where}"
+        # giá trị thật lấy từ bảng để kế hoạch giống lúc chạy
+        row = session.execute(select(*[metadata.tables[table].c[c] for c in rec.columns]).limit(1)).first()
+        values = list(row) if row is not None else [1] * len(rec.columns)
+        parameters = dict(zip(rec.columns, values)) if dialect == "postgresql" else tuple(values)
+    with bind.connect() as conn:
+        rows = conn.exec_driver_sql(prefix + statement, parameters).all()
+    if dialect == "postgresql":
+        return [row[0] for row in rows]
+    return [str(row[-1]) for row in rows]
+
+
+def _placeholder(dialect, column):
+    return f"%({column})s" if dialect == "postgresql" else "?"
+
+
+def render_migration(recommendations, revision, down_revision):
+    """Nội dung file migration Alembic tạo các index được gợi ý."""
+    creates = "\n".join(
+        f"        op.create_index('{r.name}', '{r.table}', {r.columns!r}, postgresql_concurrently=True)"
+        for r in recommendations
+    )
+    drops = "\n".join(
+        f"        op.drop_index('{r.name}', table_name='{r.table}', postgresql_concurrently=True)"
+        for r in reversed(recommendations)
+    )
+    return f'''"""advised indexes (flask db-advise)
+
+Revision ID: {revision}
+Revises: {down_revision or ''}
+Create Date: {datetime.now():%Y-%m-%d %H:%M:%S.%f}
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = {revision!r}
+down_revision = {down_revision!r}
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Postgres: CREATE INDEX CONCURRENTLY không khóa ghi bảng đang chạy (phải ngoài transaction)
+    with op.get_context().autocommit_block():
+{creates}
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+{drops}
+'''
@@ -0,0 +1,147 @@
+# utils/pagination.py
+# Phân trang keyset (cursor): WHERE (cột sắp xếp) "sau" giá trị của dòng cuối trang trước.
+# Không OFFSET, không COUNT(*) -> trang sâu vẫn nhanh như trang đầu.
+import base64
+import json
+import threading
+import time
+from datetime import date, datetime
+
+from sqlalchemy import and_, or_, select, func
+
+from extensions import db
+
+
+class InvalidCursor(ValueError):
+    """Cursor client gửi lên không giải mã được."""
+
+
+def encode_cursor(values):
+    """Mã hóa giá trị khóa của dòng cuối thành chuỗi mờ (opaque) cho client."""
+    raw = json.dumps(
+        [v.isoformat() if isinstance(v, (datetime, date)) else v for v in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, keys):
+    """Giải mã cursor thành list giá trị đúng kiểu theo từng cột khóa."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor(str(exc)) from exc
+    if not isinstance(values, list) or len(values) != len(keys):
+        raise InvalidCursor("số phần tử cursor không khớp")
+
+    decoded = []
+    for (column, _), value in zip(keys, values):
+        python_type = column.type.python_type
+        try:
+            if value is None:
+                decoded.append(None)
+            elif python_type is datetime:
+                decoded.append(datetime.fromisoformat(value))
+            else:
+                decoded.append(python_type(value))
+        except (ValueError, TypeError) as exc:
+            raise InvalidCursor(str(exc)) from exc
+    return decoded
+
+
+def _sqlite_datetime(value):
+    # SQLite lưu server_default CURRENT_TIMESTAMP dạng 'YYYY-MM-DD HH:MM:SS' (không micro giây),
+    # còn tham số datetime bind dạng '... .000000' -> so sánh chuỗi sai, nên bind đúng định dạng
+    if isinstance(value, datetime) and db.engine.dialect.name == "sqlite" and not value.microsecond:
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return value
+
+
+def _after(keys, values):
+    """(a, b) > (va, vb) theo chiều sắp xếp từng cột, viết dạng OR để hỗ trợ trộn ASC/DESC."""
+    values = [_sqlite_datetime(v) for v in values]
+    clauses = []
+    for i, (column, descending) in enumerate(keys):
+        equal_prefix = [keys[j][0] == values[j] for j in range(i)]
+        compare = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*equal_prefix, compare))
+    return or_(*clauses)
+
+
+def keyset_page(query, keys, cursor=None, limit=20):
+    """Lấy 1 trang theo keyset.
+
+    keys: list (column, descending) - cột cuối phải là khóa duy nhất (thường là id).
+    Trả về (items, next_cursor); next_cursor = None khi hết dữ liệu.
+    """
+    if cursor:
+        query = query.filter(_after(keys, decode_cursor(cursor, keys)))
+    query = query.order_by(None).order_by(
+        *[column.desc() if descending else column.asc() for column, descending in keys]
+    )
+    rows = query.limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column, _ in keys])
+    return rows, next_cursor
+
+
+# =========================
+#  Tổng số dòng (opt-in)
+# =========================
+
+_count_cache = {}
+_count_lock = threading.Lock()
+
+
+def cached_count(query, ttl=60):
+    """COUNT(*) chính xác nhưng cache theo câu SQL + tham số trong ttl giây."""
+    stmt = query.order_by(None).statement
+    compiled = stmt.compile(dialect=db.engine.dialect)
+    key = (str(compiled), tuple(sorted((k, repr(v)) for k, v in compiled.params.items())))
+
+    now = time.monotonic()
+    with _count_lock:
+        hit = _count_cache.get(key)
+        if hit and hit[1] > now:
+            return hit[0]
+
+    total = db.session.execute(
+        select(func.count()).select_from(stmt.subquery())
+    ).scalar_one()
+    with _count_lock:
+        if len(_count_cache) >= 1024:  # giữ cache nhỏ, tránh phình theo số tổ hợp filter
+            _count_cache.clear()
+        _count_cache[key] = (total, now + ttl)
+    return total
+
+
+def estimated_count(query, ttl=60):
+    """Ước lượng số dòng: Postgres đọc số 'Plan Rows' từ EXPLAIN (không quét bảng).
+
+    Các DB khác dùng cached_count.
+    """
+    if db.engine.dialect.name != "postgresql":
+        return cached_count(query, ttl=ttl)
+
+    stmt = query.order_by(None).statement
+    compiled = stmt.compile(dialect=db.engine.dialect, compile_kwargs={"render_postcompile": True})
+    plan = db.session.connection().exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled.string}", compiled.params
+    ).scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def total_for(query, mode, ttl=60):
+    """mode: 'exact' | 'approx' | khác -> None (không đếm)."""
+    if mode == "exact":
+        return cached_count(query, ttl=ttl)
+    if mode == "approx":
+        return estimated_count(query, ttl=ttl)
+    return None
@@ -0,0 +1,147 @@
+# utils/profiling.py
+# Đo SQL theo từng request (bật bằng SQL_PROFILING=1):
+# - Số query, tổng thời gian DB, câu chậm nhất, các câu lặp lại (dấu hiệu N+1)
+# - Trả về qua header Server-Timing / X-DB-Queries và 1 dòng log JSON (logger "db.profile")
+# - Vượt ngân sách query (SQL_QUERY_BUDGET hoặc @query_budget(n)) -> log cảnh báo;
+#   SQL_QUERY_BUDGET_STRICT=1 (mặc định khi testing) -> raise QueryBudgetExceeded để test fail
+import json
+import logging
+import re
+import time
+from collections import Counter
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger("db.profile")
+
+# gộp danh sách tham số "IN (?, ?, ?)" / "(%(a)s, %(b)s)" để câu khác số phần tử vẫn cùng mẫu
+_PARAM_LIST = re.compile(r"\(\s*(?:\?|%\(\w+\)s|%s|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|%s|:\w+))*\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Route chạy nhiều query hơn ngân sách (chỉ raise khi SQL_QUERY_BUDGET_STRICT)."""
+
+
+def query_budget(limit):
+    """Ngân sách query riêng cho 1 route: @query_budget(3) (đặt dưới @api.route)."""
+    def decorator(fn):
+        fn._query_budget = limit
+        return fn
+    return decorator
+
+
+def statement_pattern(statement):
+    return _PARAM_LIST.sub("(?)", _SPACES.sub(" ", statement).strip())
+
+
+class RequestProfile:
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest_sql = None
+        self.patterns = Counter()
+
+    def record(self, statement, elapsed_ms):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if elapsed_ms >= self.slowest_ms:
+            self.slowest_ms = elapsed_ms
+            self.slowest_sql = statement
+        self.patterns[statement_pattern(statement)] += 1
+
+    def repeated(self, threshold):
+        return [
+            {"sql": sql[:300], "count": n}
+            for sql, n in self.patterns.most_common()
+            if n >= threshold
+        ]
+
+    def to_dict(self, threshold):
+        return {
+            "queries": self.count,
+            "db_ms": round(self.total_ms, 2),
+            "slowest": {
+                "ms": round(self.slowest_ms, 2),
+                "sql": self.slowest_sql[:300] if self.slowest_sql else None,
+            },
+            "repeated": self.repeated(threshold),
+        }
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["profile_started"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop("profile_started", None)
+    if started is not None and has_request_context() and "sql_profile" in g:
+        g.sql_profile.record(statement, (time.perf_counter() - started) * 1000)
+
+
+def init_app(app, engines):
+    """Gắn listener vào các engine (primary + replica). Tắt -> không gắn gì, không tốn chi phí."""
+    app.config.setdefault("SQL_PROFILING", False)
+    app.config.setdefault("SQL_QUERY_BUDGET", 20)
+    app.config.setdefault("SQL_QUERY_BUDGET_STRICT", False)
+    app.config.setdefault("SQL_REPEAT_THRESHOLD", 3)     # cùng 1 mẫu câu >= N lần -> nghi N+1
+    if not app.config["SQL_PROFILING"]:
+        return
+
+    for engine in engines:
+        instrument(engine)
+
+    app.before_request(_start_profile)
+    app.after_request(_finish_profile)
+
+
+def instrument(engine):
+    """Gắn listener đo SQL vào 1 engine (VD engine asyncio của utils/asgi.py: truyền engine.sync_engine)."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _start_profile():
+    g.sql_profile = RequestProfile()
+
+
+def _route_budget():
+    view = current_app.view_functions.get(request.endpoint)
+    return getattr(view, "_query_budget", current_app.config["SQL_QUERY_BUDGET"])
+
+
+def _finish_profile(response):
+    profile = g.pop("sql_profile", None)
+    if profile is None:
+        return response
+
+    config = current_app.config
+    data = profile.to_dict(config["SQL_REPEAT_THRESHOLD"])
+    budget = _route_budget()
+
+    response.headers["X-DB-Queries"] = str(profile.count)
+    response.headers.add(
+        "Server-Timing", f'db;dur={data["db_ms"]};desc="{profile.count} queries"'
+    )
+
+    log = {
+        "method": request.method,
+        "path": request.path,
+        "endpoint": request.endpoint,
+        "status": response.status_code,
+        "budget": budget,
+        **data,
+    }
+    over_budget = profile.count > budget
+    if over_budget or data["repeated"]:
+        logger.warning(json.dumps(log, ensure_ascii=False))
+    else:
+        logger.info(json.dumps(log, ensure_ascii=False))
+
+    if over_budget and config["SQL_QUERY_BUDGET_STRICT"]:
+        raise QueryBudgetExceeded(
+            f"{request.endpoint}: {profile.count} query > ngân sách {budget}"
+        )
+    return response
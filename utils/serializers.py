@@ -0,0 +1,111 @@
+# utils/serializers.py
+# Lớp serialize chung thay cho các dict dựng tay trong route:
+# - Schema: khai báo 1 lần các field được trả ra; select đúng các cột đó (Core row, không tạo object ORM)
+# - ?fields=id,full_name,rating_avg -> chỉ select + trả các field này (payload nhỏ hơn)
+# - FastJSONProvider: jsonify dùng orjson nếu có cài (nhanh hơn nhiều), không thì json chuẩn
+#   nhưng giữ UTF-8 (không \uXXXX) và không sort key
+import json
+from datetime import date, datetime
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson  # tùy chọn: pip install orjson
+except ImportError:
+    orjson = None
+
+
+class InvalidFields(ValueError):
+    """?fields= có field không thuộc schema."""
+
+
+def iso(value):
+    return value.isoformat() if value is not None else None
+
+
+class Schema:
+    """Danh sách field của 1 model + cách format từng field.
+
+    fields: tên thuộc tính (trùng tên cột của model); formats: {field: hàm format}
+    default: field trả về khi không có ?fields= (mặc định: tất cả)
+    always: cột luôn select thêm (VD khóa cursor) nhưng không trả ra nếu không được yêu cầu.
+    """
+
+    def __init__(self, model, fields, formats=None, default=None, always=()):
+        self.model = model
+        self.fields = list(fields)
+        self.formats = formats or {}
+        self.default = list(default or fields)
+        self.always = list(always)
+
+    def parse_fields(self, raw, default=None, extra=()):
+        """"id,full_name" -> ["id", "full_name"]; rỗng -> default.
+
+        extra: field ngoài schema mà route tự thêm (VD "subjects" ở trang chi tiết).
+        """
+        if not raw:
+            return list(default or self.default)
+        allowed = self.fields + list(extra)
+        wanted = [name.strip() for name in raw.split(",") if name.strip()]
+        unknown = [name for name in wanted if name not in allowed]
+        if unknown:
+            raise InvalidFields(f"fields không hợp lệ: {', '.join(unknown)}")
+        return [name for name in allowed if name in wanted]
+
+    def columns(self, fields=None, with_always=True):
+        names = [name for name in (fields or self.fields) if name in self.fields]
+        if with_always:
+            names += [name for name in self.always if name not in names]
+        return [getattr(self.model, name) for name in names]
+
+    def select(self, query, fields=None):
+        """Query ORM -> chỉ lấy các cột cần (kết quả là Row, không hydrate object)."""
+        return query.with_entities(*self.columns(fields))
+
+    def dump(self, row, fields=None):
+        """Row (Core) hoặc object ORM -> dict, theo thứ tự field của schema."""
+        formats = self.formats
+        data = {}
+        for name in fields or self.default:
+            value = getattr(row, name)
+            fmt = formats.get(name)
+            data[name] = fmt(value) if fmt is not None else value
+        return data
+
+    def dump_many(self, rows, fields=None):
+        fields = fields or self.default
+        return [self.dump(row, fields) for row in rows]
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, "value"):        # Enum
+        return value.value
+    return str(value)                   # Decimal, ...
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider cho app.json (jsonify, request.get_json)."""
+
+    ensure_ascii = False
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and "indent" not in kwargs:
+            return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS).decode()
+        kwargs.setdefault("default", _default)
+        return super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if orjson is not None and not (self.compact is None and self._app.debug) and self.compact is not False:
+            # orjson trả bytes -> đưa thẳng vào response, không decode/encode lại
+            body = orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+            return self._app.response_class(body, mimetype=self.mimetype)
+        return super().response(*args, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
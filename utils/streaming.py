@@ -0,0 +1,50 @@
+# utils/streaming.py
+# Trả JSON dạng stream: đọc theo lô bằng server-side cursor (yield_per),
+# chỉ select cột cần (không tạo object ORM) và ghi từng chunk ra response.
+import json
+
+from flask import Response, stream_with_context
+
+from extensions import db
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+
+def _dumps(row):
+    return json.dumps(row, ensure_ascii=False, separators=(",", ":"), default=_default)
+
+
+def _default(value):
+    # datetime/date -> ISO 8601, còn lại (Decimal, Enum...) -> str
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(getattr(value, "value", value))
+
+
+def stream_rows(stmt, fmt="json", batch_size=1000):
+    """Stream kết quả của 1 câu select Core.
+
+    fmt="ndjson": mỗi dòng 1 object; fmt="json": 1 mảng JSON ghi dần.
+    Bộ nhớ chỉ phụ thuộc batch_size, không phụ thuộc số dòng.
+    """
+    ndjson = fmt == "ndjson"
+
+    def generate():
+        result = db.session.execute(stmt.execution_options(yield_per=batch_size))
+        first = True
+        if not ndjson:
+            yield "["
+        for partition in result.partitions():
+            lines = [_dumps(row._asdict()) for row in partition]
+            if ndjson:
+                yield "\n".join(lines) + "\n"
+            else:
+                yield ("" if first else ",") + ",".join(lines)
+            first = False
+        if not ndjson:
+            yield "]"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype=NDJSON_MIMETYPE if ndjson else "application/json",
+    )
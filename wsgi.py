@@ -0,0 +1,13 @@
+# Entry point production (pre-fork): gunicorn -c gunicorn.conf.py wsgi:app
+# Import module này = tạo app + warm-up. gunicorn preload_app -> làm 1 lần ở master trước khi fork,
+# worker dùng chung bộ nhớ đó (copy-on-write); gunicorn.conf.py bỏ pool DB kế thừa sau fork.
+import os
+import time
+
+_began = time.perf_counter()
+
+from app import create_app, warm_up  # noqa: E402
+
+app = warm_up(create_app(os.getenv("FLASK_CONFIG", "production")))
+# tổng thời gian gồm cả import (GET /api/metrics -> startup, log của gunicorn khi sẵn sàng)
+app.extensions["startup"]["total_ms"] = round((time.perf_counter() - _began) * 1000, 1)